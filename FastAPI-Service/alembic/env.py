@@ -37,6 +37,7 @@ from app.models.auth_models import (
     User, UserIdentity, UserContact, OtpCode, LoginActivity,
     Role
 )
+from app.models.grading_models import GradingJob
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -0,0 +1,55 @@
+"""create grading_jobs table
+
+Revision ID: k4l5m6n7o8p9
+Revises: f129b2aa3191
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'k4l5m6n7o8p9'
+down_revision: Union[str, Sequence[str], None] = 'f129b2aa3191'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'grading_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('skill_type', sa.String(length=20), nullable=False),  # 'writing' or 'speaking'
+        sa.Column('question_id', sa.Integer(), nullable=True),
+        sa.Column(
+            'status',
+            sa.Enum('QUEUED', 'RUNNING', 'RETRYING', 'SUCCEEDED', 'DEAD_LETTER', name='gradingjobstatus'),
+            nullable=False,
+        ),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cost', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_index(op.f('ix_grading_jobs_status'), 'grading_jobs', ['status'], unique=False)
+    op.create_index('ix_grading_jobs_user_id_created_at', 'grading_jobs', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_grading_jobs_user_id_created_at', table_name='grading_jobs')
+    op.drop_index(op.f('ix_grading_jobs_status'), table_name='grading_jobs')
+    op.drop_table('grading_jobs')
@@ -0,0 +1,33 @@
+"""add content_version to exams and exam_skills
+
+Revision ID: l5m6n7o8p9q0
+Revises: k4l5m6n7o8p9
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'l5m6n7o8p9q0'
+down_revision: Union[str, Sequence[str], None] = 'k4l5m6n7o8p9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Content version counters used for ETags and versioned caches
+    op.add_column('exams',
+        sa.Column('content_version', sa.Integer(), nullable=False, server_default='1')
+    )
+    op.add_column('exam_skills',
+        sa.Column('content_version', sa.Integer(), nullable=False, server_default='1')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('exam_skills', 'content_version')
+    op.drop_column('exams', 'content_version')
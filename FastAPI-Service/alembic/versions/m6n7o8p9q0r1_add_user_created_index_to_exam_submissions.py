@@ -0,0 +1,31 @@
+"""add (user_id, created_at) index to exam_submissions
+
+Revision ID: m6n7o8p9q0r1
+Revises: l5m6n7o8p9q0
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'm6n7o8p9q0r1'
+down_revision: Union[str, Sequence[str], None] = 'l5m6n7o8p9q0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Submission history per user, newest first (keyset pagination on created_at, id)
+    op.create_index(
+        'ix_exam_submissions_user_id_created_at',
+        'exam_submissions',
+        ['user_id', 'created_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_exam_submissions_user_id_created_at', table_name='exam_submissions')
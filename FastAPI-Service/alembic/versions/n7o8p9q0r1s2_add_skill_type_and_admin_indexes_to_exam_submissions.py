@@ -0,0 +1,59 @@
+"""add skill_type and admin listing indexes to exam_submissions
+
+Revision ID: n7o8p9q0r1s2
+Revises: m6n7o8p9q0r1
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'n7o8p9q0r1s2'
+down_revision: Union[str, Sequence[str], None] = 'm6n7o8p9q0r1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Copy of exam_skills.skill_type so admin filters don't need the join
+    op.add_column(
+        'exam_submissions',
+        sa.Column('skill_type', sa.Enum('READING', 'WRITING', 'SPEAKING', 'LISTENING', name='skilltype'), nullable=True),
+    )
+    op.execute(
+        """
+        UPDATE exam_submissions s
+        JOIN exam_skills k ON k.id = s.exam_skill_id
+        SET s.skill_type = k.skill_type
+        """
+    )
+
+    # Admin listing: filters + newest first (keyset pagination on created_at, id)
+    op.create_index(
+        'ix_exam_submissions_skill_type_user_id_created_at',
+        'exam_submissions',
+        ['skill_type', 'user_id', 'created_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_exam_submissions_skill_type_created_at',
+        'exam_submissions',
+        ['skill_type', 'created_at'],
+        unique=False,
+    )
+    op.create_index('ix_exam_submissions_created_at', 'exam_submissions', ['created_at'], unique=False)
+
+    # Admin search by name prefix (email is already indexed)
+    op.create_index('ix_users_name', 'users', ['name'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_name', table_name='users')
+    op.drop_index('ix_exam_submissions_created_at', table_name='exam_submissions')
+    op.drop_index('ix_exam_submissions_skill_type_created_at', table_name='exam_submissions')
+    op.drop_index('ix_exam_submissions_skill_type_user_id_created_at', table_name='exam_submissions')
+    op.drop_column('exam_submissions', 'skill_type')
@@ -0,0 +1,38 @@
+"""add FULLTEXT indexes for content search
+
+Revision ID: o8p9q0r1s2t3
+Revises: n7o8p9q0r1s2
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o8p9q0r1s2t3'
+down_revision: Union[str, Sequence[str], None] = 'n7o8p9q0r1s2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FULLTEXT_INDEXES = [
+    ('ft_exams_name', 'exams', ['name']),
+    ('ft_exam_tests_name', 'exam_tests', ['name']),
+    ('ft_exam_skills_name', 'exam_skills', ['name']),
+    ('ft_exam_sections_name_content', 'exam_sections', ['name', 'content']),
+    ('ft_exam_question_groups_name_content', 'exam_question_groups', ['name', 'content']),
+    ('ft_exam_questions_question_text', 'exam_questions', ['question_text']),
+]
+
+
+def upgrade() -> None:
+    # InnoDB FULLTEXT (MATCH ... AGAINST in boolean mode, see services/content_search.py)
+    for name, table, columns in FULLTEXT_INDEXES:
+        op.create_index(name, table, columns, unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(FULLTEXT_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, exams, users, questions, generation, grading, upload, skills, sections, groups, otp, oauth, submissions, payments, admin_payment_packages, admin_payments, admin_ai_config
+from app.api.v1.endpoints import auth, exams, users, questions, generation, grading, upload, skills, sections, groups, otp, oauth, submissions, payments, admin_payment_packages, admin_payments, admin_ai_config, search
 
 api_router = APIRouter()
 
@@ -51,5 +51,8 @@ api_router.include_router(grading.router, prefix="/grading", tags=["AI Grading"]
 # Exam Submissions (✅ Ready!)
 api_router.include_router(submissions.router, prefix="/submissions", tags=["submissions"])
 
+# Content search (✅ Ready!)
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+
 # File upload (✅ Ready!)
 api_router.include_router(upload.router, prefix="/upload", tags=["upload"])
@@ -5,19 +5,22 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
-from app.models.auth_models import User
 from app.models.payment_models import AIGradingConfig
-from app.auth import get_current_user
+from app.auth import get_current_user, Principal
 from app.database import get_db
+from app.services.email_service import email_service
+from app.services.llm_cache import llm_cache
+from app.services.singleflight import llm_singleflight
+from app.services.rate_governor import rate_governor
 
 router = APIRouter()
 
 
 # ==================== Helper Functions ====================
 
-async def verify_admin(current_user: User):
+async def verify_admin(current_user: Principal):
     """Verify user is admin"""
-    if current_user.role.name != "admin":
+    if current_user.role_name != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Chỉ admin mới có quyền thực hiện thao tác này"
@@ -57,7 +60,7 @@ class AIGradingConfigResponse(AIGradingConfigBase):
 @router.get("/", response_model=List[AIGradingConfigResponse])
 async def get_ai_grading_configs(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get all AI grading configurations (Admin only)
@@ -70,11 +73,39 @@ async def get_ai_grading_configs(
     return configs
 
 
+@router.get("/stats/llm")
+async def get_llm_stats(
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get ChatGPT cache / coalescing / rate limiter counters for this worker (Admin only)
+    """
+    await verify_admin(current_user)
+    
+    return {
+        "cache": llm_cache.get_stats(),
+        "singleflight": llm_singleflight.get_stats(),
+        "rate_governor": rate_governor.get_stats(),
+    }
+
+
+@router.get("/stats/email")
+async def get_email_stats(
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get outbound email queue / delivery time counters for this worker (Admin only)
+    """
+    await verify_admin(current_user)
+    
+    return email_service.get_stats()
+
+
 @router.get("/{skill_type}", response_model=AIGradingConfigResponse)
 async def get_ai_grading_config(
     skill_type: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get AI grading config by skill type (Admin only)
@@ -99,7 +130,7 @@ async def get_ai_grading_config(
 async def create_ai_grading_config(
     config_data: AIGradingConfigCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Create a new AI grading config (Admin only)
@@ -146,7 +177,7 @@ async def update_ai_grading_config(
     skill_type: str,
     config_data: AIGradingConfigUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Update AI grading config (Admin only)
@@ -190,7 +221,7 @@ async def update_ai_grading_config(
 async def delete_ai_grading_config(
     skill_type: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Delete AI grading config (Admin only)
@@ -5,9 +5,8 @@ from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 
-from app.models.auth_models import User
 from app.models.payment_models import PaymentPackage
-from app.auth import get_current_user
+from app.auth import get_current_user, Principal
 from app.database import get_db
 
 router = APIRouter()
@@ -50,7 +49,7 @@ class PaymentPackageResponse(PaymentPackageBase):
 
 # ==================== Helper Functions ====================
 
-async def verify_admin(current_user: User):
+async def verify_admin(current_user: Principal):
     """Verify that current user is admin"""
     # Assuming role_id = 1 is admin, adjust based on your roles
     if not current_user.role_id or current_user.role_id != 1:
@@ -67,7 +66,7 @@ async def verify_admin(current_user: User):
 async def list_payment_packages(
     include_inactive: bool = False,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     List all payment packages (Admin only)
@@ -91,7 +90,7 @@ async def list_payment_packages(
 async def get_payment_package(
     package_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get a specific payment package (Admin only)
@@ -116,7 +115,7 @@ async def get_payment_package(
 async def create_payment_package(
     package_data: PaymentPackageCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Create a new payment package (Admin only)
@@ -150,7 +149,7 @@ async def update_payment_package(
     package_id: int,
     package_data: PaymentPackageUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Update a payment package (Admin only)
@@ -198,7 +197,7 @@ async def update_payment_package(
 async def delete_payment_package(
     package_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Delete a payment package (Admin only)
@@ -9,8 +9,9 @@ from loguru import logger
 
 from app.models.auth_models import User
 from app.models.payment_models import Payment, UserWallet, PaymentStatus
-from app.auth import get_current_user
+from app.auth import get_current_user, Principal
 from app.database import get_db
+from app.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -60,7 +61,7 @@ class UserWalletInfo(BaseModel):
 
 # ==================== Helper Functions ====================
 
-async def verify_admin(current_user: User):
+async def verify_admin(current_user: Principal):
     """Verify that current user is admin"""
     if not current_user.role_id or current_user.role_id != 1:
         raise HTTPException(
@@ -79,7 +80,7 @@ async def get_all_payment_history(
     status_filter: Optional[str] = Query(None, description="Filter by status: PENDING, PAID, CANCELLED, EXPIRED"),
     search: Optional[str] = Query(None, description="Search by email, order code, or name"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get all payment history (Admin only)
@@ -155,7 +156,8 @@ async def get_all_payment_history(
             ))
         
         logger.info(f"Returning {len(history)} payment records")
-        return history
+        # Rows were validated when built; skip response_model re-validation
+        return FastJSONResponse([item.model_dump() for item in history])
         
     except HTTPException:
         raise
@@ -171,7 +173,7 @@ async def get_all_payment_history(
 @router.get("/statistics", response_model=PaymentStatisticsResponse)
 async def get_payment_statistics(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get payment statistics (Admin only)
@@ -247,7 +249,7 @@ async def get_all_user_wallets(
     limit: int = Query(50, ge=1, le=100),
     search: Optional[str] = Query(None, description="Search by email or name"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get all user wallets (Admin only)
@@ -9,8 +9,10 @@ from datetime import timedelta, datetime
 from loguru import logger
 
 from app.models.auth_models import User, LoginActivity
-from app.auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES, Principal
 from app.database import get_db
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
 
 router = APIRouter()
 
@@ -46,6 +48,27 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+async def _check_password(user: User, password: str) -> bool:
+    """
+    Verify a login password off the event loop, under the per-worker login cap
+    
+    An outdated hash (other bcrypt cost) is replaced on the user and saved with
+    the login activity.
+    """
+    try:
+        async with password_hasher.login_slot():
+            ok, new_hash = await password_hasher.verify(password, user.password)
+    except TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress, please try again",
+            headers={"Retry-After": "1"},
+        )
+    if new_hash:
+        user.password = new_hash
+    return ok
+
+
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserRegister,
@@ -71,7 +94,7 @@ async def register(
         name=user_data.name,
         email=user_data.email,
         phone=user_data.phone,
-        password=User.hash_password(user_data.password),
+        password=await password_hasher.hash(user_data.password),
         is_active=True,
         role_id=2,  # Student role
         created_at=datetime.utcnow(),
@@ -124,7 +147,7 @@ async def login(
     user = result.scalar_one_or_none()
     
     # Verify password
-    if not user or not user.verify_password(form_data.password):
+    if not user or not await _check_password(user, form_data.password):
         # Log failed login
         if user:
             failed_activity = LoginActivity(
@@ -220,7 +243,7 @@ async def login_json(
         )
     
     # Verify password
-    if not user.verify_password(login_data.password):
+    if not await _check_password(user, login_data.password):
         failed_activity = LoginActivity(
             user_id=user.id,
             provider="email",
@@ -280,7 +303,7 @@ async def login_json(
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     """
     Get current user info
     """
@@ -289,7 +312,7 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -302,7 +325,7 @@ async def logout(
 
 
 @router.post("/refresh-token", response_model=Token)
-async def refresh_token(current_user: User = Depends(get_current_user)):
+async def refresh_token(current_user: Principal = Depends(get_current_user)):
     """
     Refresh access token
     """
@@ -329,7 +352,7 @@ class SetPasswordRequest(BaseModel):
 @router.post("/set-password")
 async def set_password(
     request: SetPasswordRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -349,11 +372,13 @@ async def set_password(
             detail="Password must be at least 6 characters long"
         )
     
-    # Update password
-    current_user.password = User.hash_password(request.password)
-    current_user.updated_at = datetime.utcnow()
+    # Update password (current_user is a read-only snapshot)
+    user = await db.get(User, current_user.id)
+    user.password = await password_hasher.hash(request.password)
+    user.updated_at = datetime.utcnow()
     
     await db.commit()
+    await principal_cache.invalidate(user.id)
     
     logger.info(f"Password set for user: {current_user.email}")
     
@@ -367,7 +392,7 @@ async def set_password(
 async def get_login_history(
     skip: int = 0,
     limit: int = 10,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
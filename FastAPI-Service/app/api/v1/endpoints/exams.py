@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from pydantic import BaseModel
@@ -7,8 +7,12 @@ from datetime import datetime
 
 from app.models.exam_models import Exam, ExamTest, ExamType
 from app.database import get_db
-from app.auth import get_current_user
-from app.models.auth_models import User
+from app.auth import get_current_user, Principal
+from app.services.exam_content import (
+    EXAM, get_content_version, invalidate_exam_content, invalidate_skill_content,
+    skill_ids_for_exam, skill_ids_for_test
+)
+from app.services.http_cache import is_not_modified, make_etag, not_modified, set_cache_headers
 
 router = APIRouter()
 
@@ -69,7 +73,7 @@ async def list_exams(
 async def create_exam(
     exam_data: ExamCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create new exam"""
     exam = Exam(
@@ -92,9 +96,17 @@ async def create_exam(
 @router.get("/{exam_id}")
 async def get_exam(
     exam_id: int,
+    request: Request,
+    response: Response,
+    v: Optional[int] = Query(None, description="Content version (immutable caching)"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get exam by ID with nested tests and skills"""
+    """Get exam by ID with nested tests and skills (304 if If-None-Match is current)"""
+    version = await get_content_version(EXAM, exam_id, db)
+    etag = make_etag(f"exam-{exam_id}", version)
+    if is_not_modified(request, etag):
+        return not_modified(etag, version, v)
+    
     result = await db.execute(
         select(Exam).where(Exam.id == exam_id, Exam.deleted_at.is_(None))
     )
@@ -142,6 +154,7 @@ async def get_exam(
             "skills": skills_data
         })
     
+    set_cache_headers(response, etag, version, v)
     return {
         "id": exam.id,
         "name": exam.name,
@@ -161,7 +174,7 @@ async def update_exam(
     exam_id: int,
     exam_data: ExamCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update exam"""
     result = await db.execute(
@@ -182,6 +195,11 @@ async def update_exam(
     await db.commit()
     await db.refresh(exam)
     
+    await invalidate_exam_content(db, exam.id)
+    # Exam name / type are embedded in the cached skill payloads
+    for skill_id in await skill_ids_for_exam(db, exam.id):
+        await invalidate_skill_content(db, skill_id)
+    
     return exam
 
 
@@ -189,7 +207,7 @@ async def update_exam(
 async def delete_exam(
     exam_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete exam (soft delete)"""
     result = await db.execute(
@@ -203,6 +221,8 @@ async def delete_exam(
     exam.deleted_at = datetime.utcnow()
     await db.commit()
     
+    await invalidate_exam_content(db, exam.id)
+    
     return None
 
 
@@ -259,7 +279,7 @@ async def create_exam_test(
     exam_id: int,
     test_data: ExamTestCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create new test in exam"""
     # Verify exam exists
@@ -286,6 +306,8 @@ async def create_exam_test(
     await db.commit()
     await db.refresh(test)
     
+    await invalidate_exam_content(db, exam_id)
+    
     return test
 
 
@@ -295,7 +317,7 @@ async def update_exam_test(
     test_id: int,
     test_data: ExamTestCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update exam test"""
     result = await db.execute(
@@ -319,6 +341,10 @@ async def update_exam_test(
     await db.commit()
     await db.refresh(test)
     
+    await invalidate_exam_content(db, test.exam_id)
+    for skill_id in await skill_ids_for_test(db, test.id):
+        await invalidate_skill_content(db, skill_id)
+    
     return test
 
 
@@ -327,7 +353,7 @@ async def delete_exam_test(
     exam_id: int,
     test_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete exam test (soft delete)"""
     result = await db.execute(
@@ -345,4 +371,6 @@ async def delete_exam_test(
     test.deleted_at = datetime.utcnow()
     await db.commit()
     
+    await invalidate_exam_content(db, test.exam_id)
+    
     return None
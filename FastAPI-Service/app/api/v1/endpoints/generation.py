@@ -1,15 +1,17 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+import json
 
 from app.services.chatgpt_service import chatgpt_service
-from app.models.exam_models import Exam, ExamTest, ExamSkill, ExamSection, ExamQuestionGroup, ExamQuestion
+from app.services.exam_content import invalidate_exam_content, invalidate_skill_content
+from app.services.exam_tree_writer import ExamTree, write_exam_tree
+from app.models.exam_models import Exam, ExamTest
 from app.database import get_db
-from app.auth import get_current_user
-from app.models.auth_models import User
+from app.auth import get_current_user, Principal
 from loguru import logger
 
 router = APIRouter()
@@ -37,18 +39,191 @@ class ExamGenerationResponse(BaseModel):
     exam_id: Optional[int] = None
 
 
+def _answers_options(q: Dict[str, Any]) -> Optional[str]:
+    """options JSON for an answers array, with locate if present"""
+    answers_data = q.get("answers")
+    # If there's a locate field, store it with the answers
+    if q.get("locate"):
+        return json.dumps({
+            "answers": answers_data,
+            "locate": q.get("locate")
+        }, ensure_ascii=False)
+    return json.dumps(answers_data, ensure_ascii=False)
+
+
+def _stage_listening_parts(tree: ExamTree, parts_data: List[Dict[str, Any]]) -> None:
+    """Listening: one section per part"""
+    logger.info(f"Processing Listening format with {len(parts_data)} parts")
+    
+    for part_idx, part in enumerate(parts_data, 1):
+        part_question_groups = part.get("question_groups", [])
+        logger.info(f"Staging section for Part {part_idx}: {part.get('title', 'N/A')} - {len(part_question_groups)} question groups")
+        
+        part_section = tree.add_section(
+            name=f"{part.get('title', f'Part {part_idx}')} - {part.get('subtitle', '')}",
+            content=part.get('context', ''),  # Store context as content
+            audio=part.get('audio_url', '')  # Store audio path with /uploads/audio/
+        )
+        
+        for group_data in part_question_groups:
+            group_questions = group_data.get("questions", [])
+            
+            # Create question group name
+            group_name = group_data.get('section_title', group_data.get('group_instruction', 'Questions'))
+            
+            # Only store group-specific data (instruction and section_title)
+            # Don't duplicate context/audio_script (already in ExamSection)
+            group = tree.add_group(
+                part_section,
+                name=group_name[:255],  # Limit length
+                question_type=group_questions[0].get("question_type", "multiple_choice") if group_questions else "multiple_choice",
+                content=json.dumps({
+                    "group_instruction": group_data.get("group_instruction"),
+                    "section_title": group_data.get("section_title")
+                }, ensure_ascii=False)
+            )
+            
+            for q in group_questions:
+                options_json = None
+                
+                # Listening questions may have answers array
+                if q.get("answers"):
+                    options_json = _answers_options(q)
+                # Store locate even if no answers array
+                elif q.get("locate"):
+                    options_json = json.dumps({"locate": q.get("locate")}, ensure_ascii=False)
+                
+                tree.add_question(
+                    group,
+                    question_text=q.get("content", ""),
+                    question_type=q.get("question_type", "short_answer"),
+                    options=options_json,
+                    correct_answer=q.get("correct_answer", ""),
+                    explanation=q.get("explanation", ""),
+                    points=q.get("points", 1)
+                )
+
+
+def _stage_question_group(tree: ExamTree, section: Dict[str, Any], group_data: Dict[str, Any]) -> None:
+    """Reading/Writing: one question group with its questions"""
+    group_questions = group_data.get("questions", [])
+    total_questions = tree.question_count
+    question_type = group_data.get("question_type", "multiple_choice")
+    
+    group = tree.add_group(
+        section,
+        name=group_data.get("group_name", f"Questions {total_questions + 1}-{total_questions + len(group_questions)}"),
+        question_type=question_type,
+        content=group_data.get("instruction", "")
+    )
+    
+    for q in group_questions:
+        options_json = None
+        
+        # Check for new format: answers array (multiple_choice with is_correct, feedback)
+        if q.get("answers"):
+            options_json = _answers_options(q)
+        # Fallback: old format with simple options array
+        elif q.get("options"):
+            options_json = json.dumps(q.get("options"), ensure_ascii=False)
+        
+        # Xử lý metadata cho Writing Task 1 (chart_data, time_minutes, word_count)
+        metadata_fields = {}
+        if q.get("chart_data"):
+            metadata_fields["chart_data"] = q.get("chart_data")
+        if q.get("time_minutes"):
+            metadata_fields["time_minutes"] = q.get("time_minutes")
+        if q.get("word_count"):
+            metadata_fields["word_count"] = q.get("word_count")
+        # Also include locate in metadata if not already stored with answers
+        if q.get("locate") and not q.get("answers"):
+            metadata_fields["locate"] = q.get("locate")
+        
+        # Nếu có metadata, lưu vào options (dùng options để lưu vì Text field rộng)
+        # Nếu đã có options (multiple choice), merge vào
+        if metadata_fields:
+            if options_json:
+                # Đã có options (multiple choice), thêm metadata
+                existing_data = json.loads(options_json) if options_json else []
+                if isinstance(existing_data, dict):
+                    # Already has structure like {"answers": [...], "locate": "..."}
+                    existing_data["metadata"] = metadata_fields
+                    options_json = json.dumps(existing_data, ensure_ascii=False)
+                else:
+                    # Simple list, wrap it
+                    combined = {
+                        "answers": existing_data,
+                        "metadata": metadata_fields
+                    }
+                    options_json = json.dumps(combined, ensure_ascii=False)
+            else:
+                # Không có options, lưu metadata trực tiếp
+                options_json = json.dumps({"metadata": metadata_fields}, ensure_ascii=False)
+        
+        tree.add_question(
+            group,
+            question_text=q.get("content", q.get("question_text", "")),
+            question_type=q.get("question_type", question_type),
+            options=options_json,
+            correct_answer=q.get("correct_answer", ""),
+            explanation=q.get("explanation", ""),
+            points=q.get("points", 1)
+        )
+
+
+def _stage_flat_questions(
+    tree: ExamTree,
+    section: Dict[str, Any],
+    questions_data: List[Dict[str, Any]],
+    passage_content: str,
+) -> None:
+    """Old format: a flat question list in a single group"""
+    total_questions = tree.question_count
+    question_type = questions_data[0].get("question_type", "multiple_choice") if questions_data else "multiple_choice"
+    
+    group = tree.add_group(
+        section,
+        name=f"Questions {total_questions + 1}-{total_questions + len(questions_data)}",
+        question_type=question_type,
+        content=passage_content
+    )
+    
+    for q in questions_data:
+        options_json = None
+        
+        # Check for new format: answers array (multiple_choice with is_correct, feedback)
+        if q.get("answers"):
+            options_json = _answers_options(q)
+        # Fallback: old format with simple options array
+        elif q.get("options"):
+            options_json = json.dumps(q.get("options"), ensure_ascii=False)
+        # Store locate even if no answers/options
+        elif q.get("locate"):
+            options_json = json.dumps({"locate": q.get("locate")}, ensure_ascii=False)
+        
+        tree.add_question(
+            group,
+            question_text=q.get("content", q.get("question_text", "")),
+            question_type=q.get("question_type", "multiple_choice"),
+            options=options_json,
+            correct_answer=q.get("correct_answer", ""),
+            explanation=q.get("explanation", ""),
+            points=q.get("points", 1)
+        )
+
+
 @router.post("/generate-exam", response_model=ExamGenerationResponse)
 async def generate_complete_exam(
     request: ExamGenerationRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Sinh đề thi (ExamSkill) tự động với AI
     
     Endpoint này tạo một skill mới (Reading/Writing/...) trong ExamTest có sẵn
     với sections, question groups và questions.
-    Lưu toàn bộ vào DB ngay lập tức.
+    Lưu toàn bộ vào DB trong một transaction (exam_tree_writer).
     """
     try:
         # Kiểm tra exam và exam_test có tồn tại không
@@ -72,37 +247,22 @@ async def generate_complete_exam(
         
         logger.info(f"Creating skill '{request.skill_name}' for test '{exam_test.name}'")
         
-        # Create exam skill (đây chính là "đề thi")
-        exam_skill = ExamSkill(
+        # Stage the whole skill (đây chính là "đề thi") in memory, AI calls included,
+        # then write it in one transaction
+        tree = ExamTree(
             exam_test_id=exam_test.id,
             skill_type=request.skill_type.lower(),
             name=request.skill_name,
             time_limit=request.time_limit,
-            is_active=False,  # Sẽ activate sau khi tạo xong
+            is_active=True,
             is_online=True
         )
-        db.add(exam_skill)
-        await db.commit()
-        await db.refresh(exam_skill)
-        logger.info(f"Created skill with ID: {exam_skill.id}")
-        
-        # Tạo sections, question groups và questions
-        total_questions = 0
-        import json
         
         for section_idx, section_config in enumerate(request.sections, 1):
             logger.info(f"Processing section {section_idx}: {section_config.get('name', 'Section ' + str(section_idx))}")
             
-            # Create section trong skill
-            section = ExamSection(
-                exam_skill_id=exam_skill.id,
-                name=section_config.get("name", f"Section {section_idx}"),
-                content=section_config.get("content", "")
-            )
-            db.add(section)
-            await db.commit()
-            await db.refresh(section)
-            logger.info(f"Created section: {section.name} (ID: {section.id})")
+            section_name = section_config.get("name", f"Section {section_idx}")
+            section_content = section_config.get("content", "")
             
             # Check format: Listening (parts) or Reading/Writing (question_groups) or old (questions)
             parts_data = section_config.get("parts", [])  # Listening format
@@ -130,20 +290,14 @@ async def generate_complete_exam(
                 # Check if AI returned Listening format (parts + test_title)
                 if isinstance(ai_result, dict) and "parts" in ai_result:
                     parts_data = ai_result["parts"]
-                    test_title = ai_result.get("test_title", "LISTENING TEST")
-                    # Update section content with test title
-                    section.content = test_title
-                    await db.commit()
                     logger.info(f"AI generated Listening test with {len(parts_data)} parts")
                 # Check if AI returned Reading/Writing format (question_groups)
                 elif isinstance(ai_result, dict) and "question_groups" in ai_result:
                     question_groups_data = ai_result["question_groups"]
-                    # Update section content with passage if available
+                    # Section content = passage if available
                     if "passage" in ai_result:
-                        passage = ai_result["passage"]
                         # Store as JSON object for better formatting in frontend
-                        section.content = json.dumps(passage, ensure_ascii=False)
-                        await db.commit()
+                        section_content = json.dumps(ai_result["passage"], ensure_ascii=False)
                     logger.info(f"AI generated {len(question_groups_data)} question groups")
                 else:
                     # Old format: just questions list
@@ -152,253 +306,47 @@ async def generate_complete_exam(
             else:
                 logger.info(f"Using pre-generated data: {len(parts_data)} parts, {len(question_groups_data)} groups, {len(questions_data)} questions")
                 
-                # If test_title provided (Listening), update section content
+                # If test_title provided (Listening), use it as section content
                 if test_title:
-                    section.content = test_title
-                    await db.commit()
-                    logger.info("Updated section content with test title")
-                # If passage data is provided separately (Reading), update section content
+                    section_content = test_title
+                # If passage data is provided separately (Reading), use it as section content
                 elif passage_data and isinstance(passage_data, dict):
                     # Store as JSON object for better formatting in frontend
-                    section.content = json.dumps(passage_data, ensure_ascii=False)
-                    await db.commit()
-                    logger.info("Updated section content with provided passage")
-                elif not section.content or section.content.strip() == "":
+                    section_content = json.dumps(passage_data, ensure_ascii=False)
+                elif not parts_data and (not section_content or section_content.strip() == ""):
                     # If content is empty and no passage provided, log warning
-                    logger.warning(f"Section '{section.name}' has empty content and no passage provided")
+                    logger.warning(f"Section '{section_name}' has empty content and no passage provided")
             
-            # Process LISTENING format: Each part = 1 section
+            # LISTENING format: one section per part (instead of this section)
             if parts_data:
-                logger.info(f"Processing Listening format with {len(parts_data)} parts")
-                
-                # DELETE the current section (was created for whole test)
-                await db.delete(section)
-                await db.commit()
-                logger.info(f"Deleted temporary section, will create one section per part")
-                
-                # Create ONE SECTION per PART
-                for part_idx, part in enumerate(parts_data, 1):
-                    part_question_groups = part.get("question_groups", [])
-                    
-                    logger.info(f"Creating section for Part {part_idx}: {part.get('title', 'N/A')} - {len(part_question_groups)} question groups")
-                    
-                    # Create new section for this part
-                    part_section = ExamSection(
-                        exam_skill_id=exam_skill.id,
-                        name=f"{part.get('title', f'Part {part_idx}')} - {part.get('subtitle', '')}",
-                        content=part.get('context', ''),  # Store context as content
-                        audio=part.get('audio_url', '')  # Store audio path with /uploads/audio/
-                    )
-                    db.add(part_section)
-                    await db.commit()
-                    await db.refresh(part_section)
-                    logger.info(f"Created section for Part {part_idx}: {part_section.name} (ID: {part_section.id})")
-                    logger.info(f"Audio URL: {part.get('audio_url', 'No audio')}")
-                    
-                    # Now create question groups for THIS part's section
-                    for group_data in part_question_groups:
-                        group_questions = group_data.get("questions", [])
-                        
-                        # Create question group name
-                        group_name = group_data.get('section_title', group_data.get('group_instruction', 'Questions'))
-                        
-                        # Only store group-specific data (instruction and section_title)
-                        # Don't duplicate context/audio_script (already in ExamSection)
-                        group = ExamQuestionGroup(
-                            exam_section_id=part_section.id,  # Use part_section.id instead of section.id
-                            name=group_name[:255],  # Limit length
-                            question_type=group_questions[0].get("question_type", "multiple_choice") if group_questions else "multiple_choice",
-                            content=json.dumps({
-                                "group_instruction": group_data.get("group_instruction"),
-                                "section_title": group_data.get("section_title")
-                            }, ensure_ascii=False)
-                        )
-                        db.add(group)
-                        await db.commit()
-                        await db.refresh(group)
-                        logger.info(f"Created question group: {group.name} (ID: {group.id})")
-                        
-                        # Save questions in this group
-                        for q in group_questions:
-                            options_json = None
-                            
-                            # Listening questions may have answers array
-                            if q.get("answers"):
-                                answers_data = q.get("answers")
-                                # If there's a locate field, store it with the answers
-                                if q.get("locate"):
-                                    options_json = json.dumps({
-                                        "answers": answers_data,
-                                        "locate": q.get("locate")
-                                    }, ensure_ascii=False)
-                                else:
-                                    options_json = json.dumps(answers_data, ensure_ascii=False)
-                            # Store locate even if no answers array
-                            elif q.get("locate"):
-                                options_json = json.dumps({"locate": q.get("locate")}, ensure_ascii=False)
-                            
-                            question = ExamQuestion(
-                                question_group_id=group.id,
-                                question_text=q.get("content", ""),
-                                question_type=q.get("question_type", "short_answer"),
-                                options=options_json,
-                                correct_answer=q.get("correct_answer", ""),
-                                explanation=q.get("explanation", ""),
-                                points=q.get("points", 1)
-                            )
-                            db.add(question)
-                            total_questions += 1
-                        
-                        await db.commit()
-                        logger.info(f"Saved {len(group_questions)} questions to group")
+                _stage_listening_parts(tree, parts_data)
             
-            # Process READING/WRITING format: question_groups (new format - preferred)
+            # READING/WRITING format: question_groups (new format - preferred)
             elif question_groups_data:
+                section = tree.add_section(section_name, section_content)
                 for group_data in question_groups_data:
-                    group_questions = group_data.get("questions", [])
-                    
-                    # Create question group
-                    group = ExamQuestionGroup(
-                        exam_section_id=section.id,
-                        name=group_data.get("group_name", f"Questions {total_questions + 1}-{total_questions + len(group_questions)}"),
-                        question_type=group_data.get("question_type", "multiple_choice"),
-                        content=group_data.get("instruction", "")
-                    )
-                    db.add(group)
-                    await db.commit()
-                    await db.refresh(group)
-                    logger.info(f"Created question group: {group.name} (ID: {group.id})")
-                    
-                    # Save questions in this group
-                    for q in group_questions:
-                        options_json = None
-                        
-                        # Check for new format: answers array (multiple_choice with is_correct, feedback)
-                        if q.get("answers"):
-                            answers_data = q.get("answers")
-                            # If there's a locate field, store it with the answers
-                            if q.get("locate"):
-                                options_json = json.dumps({
-                                    "answers": answers_data,
-                                    "locate": q.get("locate")
-                                }, ensure_ascii=False)
-                            else:
-                                options_json = json.dumps(answers_data, ensure_ascii=False)
-                        # Fallback: old format with simple options array
-                        elif q.get("options"):
-                            options_json = json.dumps(q.get("options"), ensure_ascii=False)
-                        
-                        # Xử lý metadata cho Writing Task 1 (chart_data, time_minutes, word_count)
-                        metadata_fields = {}
-                        if q.get("chart_data"):
-                            metadata_fields["chart_data"] = q.get("chart_data")
-                        if q.get("time_minutes"):
-                            metadata_fields["time_minutes"] = q.get("time_minutes")
-                        if q.get("word_count"):
-                            metadata_fields["word_count"] = q.get("word_count")
-                        # Also include locate in metadata if not already stored with answers
-                        if q.get("locate") and not q.get("answers"):
-                            metadata_fields["locate"] = q.get("locate")
-                        
-                        # Nếu có metadata, lưu vào options (dùng options để lưu vì Text field rộng)
-                        # Nếu đã có options (multiple choice), merge vào
-                        if metadata_fields:
-                            if options_json:
-                                # Đã có options (multiple choice), thêm metadata
-                                existing_data = json.loads(options_json) if options_json else []
-                                if isinstance(existing_data, dict):
-                                    # Already has structure like {"answers": [...], "locate": "..."}
-                                    existing_data["metadata"] = metadata_fields
-                                    options_json = json.dumps(existing_data, ensure_ascii=False)
-                                else:
-                                    # Simple list, wrap it
-                                    combined = {
-                                        "answers": existing_data,
-                                        "metadata": metadata_fields
-                                    }
-                                    options_json = json.dumps(combined, ensure_ascii=False)
-                            else:
-                                # Không có options, lưu metadata trực tiếp
-                                options_json = json.dumps({"metadata": metadata_fields}, ensure_ascii=False)
-                        
-                        question = ExamQuestion(
-                            question_group_id=group.id,
-                            question_text=q.get("content", q.get("question_text", "")),
-                            question_type=q.get("question_type", group.question_type),
-                            options=options_json,
-                            correct_answer=q.get("correct_answer", ""),
-                            explanation=q.get("explanation", ""),
-                            points=q.get("points", 1)
-                        )
-                        db.add(question)
-                        total_questions += 1
-                    
-                    await db.commit()
-                    logger.info(f"Saved {len(group_questions)} questions to group {group.name}")
+                    _stage_question_group(tree, section, group_data)
             
-            # Fallback: Process old format (flat questions list)
+            # Fallback: old format (flat questions list)
             elif questions_data:
-                question_type = questions_data[0].get("question_type", "multiple_choice") if questions_data else "multiple_choice"
-                
-                group = ExamQuestionGroup(
-                    exam_section_id=section.id,
-                    name=f"Questions {total_questions + 1}-{total_questions + len(questions_data)}",
-                    question_type=question_type,
-                    content=section_config.get("passage_content", "")
-                )
-                db.add(group)
-                await db.commit()
-                await db.refresh(group)
-                logger.info(f"Created question group: {group.name} (ID: {group.id})")
-                
-                # Save questions
-                for q in questions_data:
-                    options_json = None
-                    
-                    # Check for new format: answers array (multiple_choice with is_correct, feedback)
-                    if q.get("answers"):
-                        answers_data = q.get("answers")
-                        # If there's a locate field, store it with the answers
-                        if q.get("locate"):
-                            options_json = json.dumps({
-                                "answers": answers_data,
-                                "locate": q.get("locate")
-                            }, ensure_ascii=False)
-                        else:
-                            options_json = json.dumps(answers_data, ensure_ascii=False)
-                    # Fallback: old format with simple options array
-                    elif q.get("options"):
-                        options_json = json.dumps(q.get("options"), ensure_ascii=False)
-                    # Store locate even if no answers/options
-                    elif q.get("locate"):
-                        options_json = json.dumps({"locate": q.get("locate")}, ensure_ascii=False)
-                    
-                    question = ExamQuestion(
-                        question_group_id=group.id,
-                        question_text=q.get("content", q.get("question_text", "")),
-                        question_type=q.get("question_type", "multiple_choice"),
-                        options=options_json,
-                        correct_answer=q.get("correct_answer", ""),
-                        explanation=q.get("explanation", ""),
-                        points=q.get("points", 1)
-                    )
-                    db.add(question)
-                    total_questions += 1
-                
-                await db.commit()
-                logger.info(f"Saved {len(questions_data)} questions to database")
+                section = tree.add_section(section_name, section_content)
+                _stage_flat_questions(tree, section, questions_data, section_config.get("passage_content", ""))
+            
+            else:
+                tree.add_section(section_name, section_content)
         
-        # Activate skill after creation completes
-        exam_skill.is_active = True
-        await db.commit()
+        skill_id = await write_exam_tree(db, tree)
+        await invalidate_skill_content(db, skill_id)
+        await invalidate_exam_content(db, exam_test.exam_id)
         
-        logger.info(f"Skill '{exam_skill.name}' created successfully with {total_questions} questions")
+        total_questions = tree.question_count
+        logger.info(f"Skill '{request.skill_name}' created successfully with {total_questions} questions")
         
         return ExamGenerationResponse(
             status="success",
             message=f"Skill '{request.skill_name}' created successfully with {total_questions} questions",
-            task_id=f"skill_{exam_skill.id}",
-            exam_id=exam_skill.id  # Trả về skill_id
+            task_id=f"skill_{skill_id}",
+            exam_id=skill_id  # Trả về skill_id
         )
         
     except HTTPException:
@@ -551,6 +499,8 @@ class QuestionGenerationRequest(BaseModel):
     num_questions: int  # Number of questions to generate
     question_types: Optional[List[str]] = None  # Optional: specific question types
     part_number: Optional[int] = None  # For Listening: which part to generate (1, 2, 3, or 4)
+    use_cache: bool = True  # False = force a fresh generation ("Sinh lại")
+    chunked: Optional[bool] = None  # Parallel chunked generation (None = auto for large sets)
 
 
 class QuestionGenerationResponse(BaseModel):
@@ -560,10 +510,89 @@ class QuestionGenerationResponse(BaseModel):
     data: Dict[str, Any]  # Contains passage and question_groups
 
 
+async def _build_generation_response(result: Any) -> QuestionGenerationResponse:
+    """
+    Chuẩn hoá kết quả sinh câu hỏi thành response
+    
+    Listening: sinh thêm file audio cho từng part.
+    Reading/Writing: luôn có object passage (rỗng nếu không có).
+    """
+    # LISTENING FORMAT: parts with test_title
+    if isinstance(result, dict) and "parts" in result and "test_title" in result:
+        # Count total questions from all parts
+        total_qs = 0
+        for part in result["parts"]:
+            if "question_groups" in part:
+                for group in part["question_groups"]:
+                    total_qs += len(group.get("questions", []))
+        
+        logger.info(f"✅ Listening format detected: {len(result['parts'])} parts, {total_qs} questions")
+        
+        # Generate audio files for each part
+        try:
+            logger.info("🎤 Generating audio files for Listening parts...")
+            parts_with_audio = await chatgpt_service.generate_listening_audio(
+                parts=result["parts"],
+                output_dir="uploads/audio"
+            )
+            result["parts"] = parts_with_audio
+            logger.info(f"✅ Generated {len(parts_with_audio)} audio files")
+        except Exception as e:
+            logger.error(f"⚠️ Failed to generate audio files: {str(e)}")
+            # Continue without audio files
+        
+        return QuestionGenerationResponse(
+            status="success",
+            message=f"Generated {total_qs} questions across {len(result['parts'])} parts with audio",
+            data=result  # Return with audio_url in each part
+        )
+    
+    # READING/WRITING FORMAT: question_groups (with or without passage)
+    elif isinstance(result, dict) and "question_groups" in result:
+        total_qs = sum(len(g.get("questions", [])) for g in result["question_groups"])
+        
+        # Always return full structure with passage and question_groups
+        # If passage is missing, add empty passage object
+        if "passage" not in result:
+            result["passage"] = {
+                "title": "",
+                "introduction": "",
+                "content": "",
+                "topic": "",
+                "word_count": 0
+            }
+            message = f"Generated {total_qs} questions (no passage)"
+        else:
+            message = f"Generated {total_qs} questions with passage"
+        
+        logger.info(f"✅ Reading/Writing format detected: {total_qs} questions")
+        
+        return QuestionGenerationResponse(
+            status="success",
+            message=message,
+            data=result
+        )
+    
+    # Old format (just questions list) - wrap it
+    elif isinstance(result, list):
+        logger.info(f"⚠️ Old format detected: {len(result)} questions")
+        return QuestionGenerationResponse(
+            status="success",
+            message=f"Generated {len(result)} questions",
+            data={
+                "questions": result
+            }
+        )
+    
+    else:
+        logger.error(f"❌ Unexpected result format: {result}")
+        raise ValueError("Unexpected response format from ChatGPT service")
+
+
 @router.post("/generate-questions", response_model=QuestionGenerationResponse)
 async def generate_questions_only(
     request: QuestionGenerationRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Sinh câu hỏi bằng AI (không lưu vào DB)
@@ -594,7 +623,9 @@ async def generate_questions_only(
             difficulty=request.difficulty,
             num_questions=request.num_questions,
             question_types=request.question_types,
-            part_number=request.part_number  # Pass part_number to service
+            part_number=request.part_number,  # Pass part_number to service
+            use_cache=request.use_cache,
+            chunked=request.chunked,
         )
         
         # Log để debug
@@ -610,76 +641,7 @@ async def generate_questions_only(
                 logger.info(f"Passage title: {passage.get('title', 'N/A')}")
                 logger.info(f"Passage content length: {len(passage.get('content', ''))}")
         
-        # LISTENING FORMAT: parts with test_title
-        if isinstance(result, dict) and "parts" in result and "test_title" in result:
-            # Count total questions from all parts
-            total_qs = 0
-            for part in result["parts"]:
-                if "question_groups" in part:
-                    for group in part["question_groups"]:
-                        total_qs += len(group.get("questions", []))
-            
-            logger.info(f"✅ Listening format detected: {len(result['parts'])} parts, {total_qs} questions")
-            
-            # Generate audio files for each part
-            try:
-                logger.info("🎤 Generating audio files for Listening parts...")
-                parts_with_audio = await chatgpt_service.generate_listening_audio(
-                    parts=result["parts"],
-                    output_dir="uploads/audio"
-                )
-                result["parts"] = parts_with_audio
-                logger.info(f"✅ Generated {len(parts_with_audio)} audio files")
-            except Exception as e:
-                logger.error(f"⚠️ Failed to generate audio files: {str(e)}")
-                # Continue without audio files
-            
-            return QuestionGenerationResponse(
-                status="success",
-                message=f"Generated {total_qs} questions across {len(result['parts'])} parts with audio",
-                data=result  # Return with audio_url in each part
-            )
-        
-        # READING/WRITING FORMAT: question_groups (with or without passage)
-        elif isinstance(result, dict) and "question_groups" in result:
-            total_qs = sum(len(g.get("questions", [])) for g in result["question_groups"])
-            
-            # Always return full structure with passage and question_groups
-            # If passage is missing, add empty passage object
-            if "passage" not in result:
-                result["passage"] = {
-                    "title": "",
-                    "introduction": "",
-                    "content": "",
-                    "topic": "",
-                    "word_count": 0
-                }
-                message = f"Generated {total_qs} questions (no passage)"
-            else:
-                message = f"Generated {total_qs} questions with passage"
-            
-            logger.info(f"✅ Reading/Writing format detected: {total_qs} questions")
-            
-            return QuestionGenerationResponse(
-                status="success",
-                message=message,
-                data=result
-            )
-        
-        # Old format (just questions list) - wrap it
-        elif isinstance(result, list):
-            logger.info(f"⚠️ Old format detected: {len(result)} questions")
-            return QuestionGenerationResponse(
-                status="success",
-                message=f"Generated {len(result)} questions",
-                data={
-                    "questions": result
-                }
-            )
-        
-        else:
-            logger.error(f"❌ Unexpected result format: {result}")
-            raise ValueError("Unexpected response format from ChatGPT service")
+        return await _build_generation_response(result)
         
     except Exception as e:
         logger.error(f"Error generating questions: {str(e)}")
@@ -688,3 +650,58 @@ async def generate_questions_only(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate questions: {str(e)}"
         )
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/generate-questions/stream")
+async def generate_questions_stream(
+    request: QuestionGenerationRequest,
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Sinh câu hỏi bằng AI dạng streaming (Server-Sent Events, không lưu DB)
+    
+    Giống /generate-questions nhưng trả về từng phần ngay khi sinh xong,
+    để admin UI hiển thị câu hỏi dần dần thay vì chờ 30+ giây:
+    
+        event: passage          data: {...}   (Reading)
+        event: question_group   data: {...}   (mỗi nhóm câu hỏi)
+        event: part             data: {...}   (mỗi part Listening, chưa có audio)
+        event: complete         data: {"status", "message", "data"}  (giống /generate-questions)
+        event: error            data: {"detail": "..."}
+    
+    Luôn dùng một completion duy nhất (không áp dụng chế độ chunked).
+    """
+    logger.info(f"Streaming questions: {request.exam_type} {request.skill} - {request.topic}")
+    
+    async def event_stream():
+        try:
+            async for item in chatgpt_service.stream_exam_questions(
+                exam_type=request.exam_type,
+                skill=request.skill,
+                topic=request.topic,
+                difficulty=request.difficulty,
+                num_questions=request.num_questions,
+                question_types=request.question_types,
+                part_number=request.part_number,
+                use_cache=request.use_cache,
+            ):
+                if item["event"] == "complete":
+                    response = await _build_generation_response(item["data"])
+                    yield _sse_event("complete", response.model_dump())
+                else:
+                    yield _sse_event(item["event"], item["data"])
+        except Exception as e:
+            logger.error(f"Error streaming questions: {str(e)}")
+            logger.exception(e)
+            yield _sse_event("error", {"detail": f"Failed to generate questions: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,17 +1,30 @@
 from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from datetime import datetime
+import asyncio
 import json
+import time
 
 from app.services.chatgpt_service import chatgpt_service
-from app.models.auth_models import User
+from app.services.wallet_ledger import wallet_ledger
+from app.services.submission_review import touch_submission
+from app.services.grading_jobs import (
+    TERMINAL_STATUSES,
+    create_grading_job,
+    enqueue_grading_job,
+    format_grading_result,
+    get_grading_job,
+    serialize_job,
+)
 from app.models.exam_models import UserExamAnswer
-from app.models.payment_models import UserWallet, AIGradingConfig, WalletTransaction
-from app.database import get_db
-from app.auth import get_current_user
+from app.models.payment_models import UserWallet, AIGradingConfig
+from app.config import settings
+from app.database import get_db, AsyncSessionLocal
+from app.auth import get_current_user, Principal
 from loguru import logger
 
 router = APIRouter()
@@ -36,64 +49,45 @@ async def get_ai_grading_cost(db: AsyncSession, skill_type: str) -> int:
     return config.cost_per_grading
 
 
-async def deduct_ai_grading_cost(db: AsyncSession, user_id: int, skill_type: str) -> dict:
+async def reserve_ai_grading_cost(
+    db: AsyncSession,
+    user_id: int,
+    skill_type: str,
+    reference_id: Optional[str] = None,
+) -> dict:
     """
-    Deduct AI grading cost from user wallet and create transaction record
-    Returns dict with cost and new_balance
-    Raises HTTPException if insufficient balance
+    Reserve AI grading cost from user wallet (atomic debit + HOLD transaction)
+    Returns dict with transaction_id, cost and new_balance
+    Raises HTTPException if there is no wallet or the balance is insufficient
     """
-    # Get cost
     cost = await get_ai_grading_cost(db, skill_type)
     
-    # Get user wallet
+    reservation = await wallet_ledger.reserve(
+        db,
+        user_id=user_id,
+        amount=cost,
+        description=f'Chấm điểm AI - {skill_type.upper()}',
+        reference_id=reference_id,
+    )
+    if reservation is not None:
+        return reservation
+    
+    # Debit was rejected; read the wallet only to explain why
     result = await db.execute(
-        select(UserWallet).where(UserWallet.user_id == user_id)
+        select(UserWallet.balance).where(UserWallet.user_id == user_id)
     )
-    wallet = result.scalar_one_or_none()
+    balance = result.scalar_one_or_none()
     
-    if not wallet:
+    if balance is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Bạn chưa có ví. Vui lòng nạp tiền để sử dụng AI chấm điểm."
         )
     
-    # Check balance
-    if wallet.balance < cost:
-        raise HTTPException(
-            status_code=status.HTTP_402_PAYMENT_REQUIRED,
-            detail=f"Số dư không đủ. Cần {cost} Trứng Cú, bạn có {wallet.balance} Trứng Cú. Vui lòng nạp thêm."
-        )
-    
-    # Store balance before
-    balance_before = wallet.balance
-    
-    # Deduct balance
-    wallet.balance -= cost
-    wallet.total_spent += cost
-    wallet.updated_at = datetime.utcnow()
-    
-    # Create transaction record
-    transaction = WalletTransaction(
-        user_id=user_id,
-        amount=-cost,  # Negative for deduction
-        transaction_type='AI_GRADING',
-        description=f'Chấm điểm AI - {skill_type.upper()}',
-        reference_id=None,  # Could add exam_id or answer_id later
-        balance_before=balance_before,
-        balance_after=wallet.balance,
-        created_at=datetime.utcnow()
+    raise HTTPException(
+        status_code=status.HTTP_402_PAYMENT_REQUIRED,
+        detail=f"Số dư không đủ. Cần {cost} Trứng Cú, bạn có {balance} Trứng Cú. Vui lòng nạp thêm."
     )
-    db.add(transaction)
-    
-    await db.commit()
-    await db.refresh(wallet)
-    
-    logger.info(f"Deducted {cost} OWL from user {user_id} for {skill_type} AI grading. New balance: {wallet.balance}")
-    
-    return {
-        "cost": cost,
-        "new_balance": wallet.balance
-    }
 
 
 class WritingGradingRequest(BaseModel):
@@ -133,44 +127,37 @@ class GradingResponse(BaseModel):
 async def grade_writing(
     request: WritingGradingRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Chấm bài Writing tự động bằng ChatGPT
     
     Endpoint này:
     - Kiểm tra số dư ví
-    - Trừ Trứng Cú từ ví
+    - Trừ Trứng Cú từ ví (tự động hoàn lại nếu chấm lỗi)
     - Sử dụng AI để chấm điểm theo tiêu chí chuẩn
     - Trả về điểm số và feedback chi tiết
     """
     try:
         logger.info(f"Grading writing answer for question: {request.question_id}")
         
-        # Deduct cost from wallet BEFORE grading
-        payment_info = await deduct_ai_grading_cost(db, current_user.id, "writing")
+        # Reserve cost from wallet BEFORE grading; refunded automatically if grading fails
+        payment_info = await reserve_ai_grading_cost(db, current_user.id, "writing")
         
         # Grade with AI
-        result = await chatgpt_service.grade_writing_answer(
-            question=request.question_text,
-            answer=request.answer,
-            exam_type=request.exam_type,
-            criteria=request.criteria,
-        )
+        async with wallet_ledger.settle(db, payment_info["transaction_id"]):
+            result = await chatgpt_service.grade_writing_answer(
+                question=request.question_text,
+                answer=request.answer,
+                exam_type=request.exam_type,
+                criteria=request.criteria,
+            )
         
         logger.info(f"Writing graded successfully. Cost: {payment_info['cost']} OWL, New balance: {payment_info['new_balance']}")
         
         return GradingResponse(
             status="success",
-            question_id=request.question_id,
-            overall_band=result.get("overall_score", 0),
-            criteria_scores=result.get("criteria_scores", {}),
-            criteria_feedback=result.get("criteria_feedback", {}),
-            strengths=result.get("strengths", []),
-            weaknesses=result.get("weaknesses", []),
-            detailed_feedback=result.get("detailed_feedback", ""),
-            suggestions=result.get("suggestions", []),
-            band_justification=result.get("band_justification"),
+            **format_grading_result(request.question_id, result),
         )
         
     except HTTPException:
@@ -188,45 +175,37 @@ async def grade_writing(
 async def grade_speaking(
     request: SpeakingGradingRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Chấm bài Speaking tự động bằng ChatGPT
     
     Endpoint này:
     - Kiểm tra số dư ví
-    - Trừ Trứng Cú từ ví
+    - Trừ Trứng Cú từ ví (tự động hoàn lại nếu chấm lỗi)
     - Sử dụng AI để chấm điểm theo tiêu chí chuẩn
     - Trả về điểm số và feedback chi tiết
     """
     try:
         logger.info(f"Grading speaking answer for question: {request.question_id}")
         
-        # Deduct cost from wallet BEFORE grading
-        payment_info = await deduct_ai_grading_cost(db, current_user.id, "speaking")
+        # Reserve cost from wallet BEFORE grading; refunded automatically if grading fails
+        payment_info = await reserve_ai_grading_cost(db, current_user.id, "speaking")
         
         # Grade with AI
-        result = await chatgpt_service.grade_speaking_answer(
-            question=request.question_text,
-            transcript=request.transcript,
-            exam_type=request.exam_type,
-            criteria=request.criteria,
-        )
+        async with wallet_ledger.settle(db, payment_info["transaction_id"]):
+            result = await chatgpt_service.grade_speaking_answer(
+                question=request.question_text,
+                transcript=request.transcript,
+                exam_type=request.exam_type,
+                criteria=request.criteria,
+            )
         
         logger.info(f"Speaking graded successfully. Cost: {payment_info['cost']} OWL, New balance: {payment_info['new_balance']}")
         
         return GradingResponse(
             status="success",
-            question_id=request.question_id,
-            overall_band=result.get("overall_score", 0),
-            criteria_scores=result.get("criteria_scores", {}),
-            criteria_feedback=result.get("criteria_feedback", {}),
-            strengths=result.get("strengths", []),
-            weaknesses=result.get("weaknesses", []),
-            detailed_feedback=result.get("detailed_feedback", ""),
-            suggestions=result.get("suggestions", []),
-            band_justification=result.get("band_justification"),
-            pronunciation_note=result.get("pronunciation_note"),
+            **format_grading_result(request.question_id, result),
         )
         
     except HTTPException:
@@ -240,11 +219,164 @@ async def grade_speaking(
         )
 
 
+class GradingJobRequest(BaseModel):
+    """Request for a background grading job"""
+    type: str  # "writing" or "speaking"
+    question_id: int
+    question_text: str
+    answer: Optional[str] = None  # Writing
+    transcript: Optional[str] = None  # Speaking
+    exam_type: str = "IELTS"
+    criteria: Optional[Dict[str, Any]] = None
+
+
+class GradingJobResponse(BaseModel):
+    """Status of a background grading job"""
+    job_id: str
+    status: str  # QUEUED, RUNNING, RETRYING, SUCCEEDED, DEAD_LETTER
+    skill_type: str
+    question_id: Optional[int] = None
+    attempts: int = 0
+    cost: int = 0
+    result: Optional[Dict[str, Any]] = None  # GradingResponse fields once SUCCEEDED
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+@router.post("/jobs", response_model=GradingJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_grading_job(
+    request: GradingJobRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Gửi bài Writing/Speaking vào hàng đợi chấm AI, trả về job_id ngay lập tức
+    
+    - Trừ Trứng Cú từ ví khi gửi (hoàn lại nếu job thất bại hẳn)
+    - Worker chấm bài ở background (retry khi lỗi)
+    - Poll kết quả qua GET /grading/jobs/{job_id} hoặc SSE /grading/jobs/{job_id}/events
+    """
+    if request.type not in ("writing", "speaking"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="type phải là 'writing' hoặc 'speaking'"
+        )
+    
+    try:
+        payment_info = await reserve_ai_grading_cost(db, current_user.id, request.type)
+        
+        # The worker confirms the reservation on success and refunds it on dead-letter
+        try:
+            job = await create_grading_job(
+                db,
+                user_id=current_user.id,
+                skill_type=request.type,
+                question_id=request.question_id,
+                payload={
+                    "question_text": request.question_text,
+                    "answer": request.answer,
+                    "transcript": request.transcript,
+                    "exam_type": request.exam_type,
+                    "criteria": request.criteria,
+                    "wallet_transaction_id": payment_info["transaction_id"],
+                },
+                cost=payment_info["cost"],
+            )
+        except Exception as e:
+            await db.rollback()
+            await wallet_ledger.refund(db, payment_info["transaction_id"], reason=str(e))
+            raise
+        await enqueue_grading_job(job.id)
+        
+        return GradingJobResponse(**serialize_job(job))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error submitting grading job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to submit grading job: {str(e)}"
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=GradingJobResponse)
+async def get_grading_job_status(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Lấy trạng thái / kết quả của job chấm bài"""
+    job = await get_grading_job(db, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Grading job not found"
+        )
+    return GradingJobResponse(**serialize_job(job))
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_grading_job_events(
+    job_id: str,
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Theo dõi job chấm bài qua Server-Sent Events
+    
+    Gửi event "status" mỗi khi trạng thái thay đổi, kết thúc bằng "complete"
+    (SUCCEEDED / DEAD_LETTER) hoặc "timeout".
+    """
+    async with AsyncSessionLocal() as db:
+        job = await get_grading_job(db, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Grading job not found"
+        )
+    
+    async def event_stream():
+        deadline = time.monotonic() + settings.GRADING_JOB_EVENTS_TIMEOUT_SECONDS
+        last_state = None
+        current = job
+        while True:
+            state = (current.status, current.attempts)
+            if state != last_state:
+                last_state = state
+                data = serialize_job(current)
+                if current.status in TERMINAL_STATUSES:
+                    yield _sse_event("complete", data)
+                    return
+                yield _sse_event("status", data)
+            
+            if time.monotonic() >= deadline:
+                yield _sse_event("timeout", {"job_id": job_id})
+                return
+            
+            await asyncio.sleep(settings.GRADING_JOB_EVENTS_POLL_SECONDS)
+            # Short-lived session per poll so idle streams do not hold a DB connection
+            async with AsyncSessionLocal() as db:
+                current = await get_grading_job(db, job_id) or current
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/ai-grading-cost/{skill_type}")
 async def get_ai_grading_cost_endpoint(
     skill_type: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get AI grading cost for a skill type
@@ -302,7 +434,7 @@ class FeedbackResponse(BaseModel):
 @router.post("/feedback", response_model=FeedbackResponse)
 async def get_feedback(
     request: FeedbackRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Cung cấp feedback chi tiết cho bất kỳ câu trả lời nào
@@ -343,60 +475,124 @@ class BatchAnswerData(BaseModel):
 class BatchGradingRequest(BaseModel):
     """Request for batch grading multiple answers"""
     answers: List[BatchAnswerData]
+    # Defaults to (and is capped at) GRADING_BATCH_DEADLINE_SECONDS
+    deadline_seconds: Optional[float] = Field(None, gt=0)
+
+
+def _batch_deadline(request: BatchGradingRequest) -> float:
+    """Client deadline, never longer than GRADING_BATCH_DEADLINE_SECONDS"""
+    return min(request.deadline_seconds or settings.GRADING_BATCH_DEADLINE_SECONDS, settings.GRADING_BATCH_DEADLINE_SECONDS)
 
 
 class BatchGradingResponse(BaseModel):
     """Response for batch grading"""
-    status: str
+    status: str  # "success", or "partial" if some items failed / missed the deadline
     results: List[Dict[str, Any]]
     total_score: float
     num_graded: int
+    errors: List[Dict[str, Any]] = []  # [{"question_id", "error"}]
+    pending_question_ids: List[int] = []  # Not finished before the deadline
+
+
+async def _grade_batch_answer(answer_data: BatchAnswerData) -> Dict[str, Any]:
+    if answer_data.type == "writing":
+        return await chatgpt_service.grade_writing_answer(
+            question=answer_data.question,
+            answer=answer_data.answer or "",
+            exam_type=answer_data.exam_type,
+        )
+    if answer_data.type == "speaking":
+        return await chatgpt_service.grade_speaking_answer(
+            question=answer_data.question,
+            transcript=answer_data.transcript or "",
+            exam_type=answer_data.exam_type,
+        )
+    raise ValueError(f"Unknown answer type: {answer_data.type}")
+
+
+async def _iter_batch_grading(
+    answers: List[BatchAnswerData],
+    deadline_seconds: float,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Grade answers concurrently (at most GRADING_BATCH_CONCURRENCY at a time)
+    
+    Yields ("result", item) / ("error", item) as each answer finishes, then
+    ("pending", [question_id, ...]) for answers still running at the deadline.
+    Unfinished calls are cancelled; completions already in flight still land
+    in the LLM cache, so re-submitting them is cheap.
+    """
+    semaphore = asyncio.Semaphore(settings.GRADING_BATCH_CONCURRENCY)
+    
+    async def grade_one(answer_data: BatchAnswerData) -> Dict[str, Any]:
+        async with semaphore:
+            return await _grade_batch_answer(answer_data)
+    
+    tasks = {asyncio.create_task(grade_one(a)): a for a in answers}
+    pending = set(tasks)
+    deadline = time.monotonic() + deadline_seconds
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                answer_data = tasks[task]
+                error = task.exception()
+                if error is not None:
+                    logger.error(f"Batch grading failed for question {answer_data.question_id}: {str(error)}")
+                    yield "error", {"question_id": answer_data.question_id, "error": str(error)}
+                else:
+                    yield "result", {"question_id": answer_data.question_id, "result": task.result()}
+        
+        if pending:
+            logger.warning(f"Batch grading deadline reached with {len(pending)} answer(s) pending")
+        yield "pending", [tasks[t].question_id for t in tasks if t in pending]
+    finally:
+        for task in pending:
+            task.cancel()
 
 
 @router.post("/grade-batch", response_model=BatchGradingResponse)
 async def grade_batch(
     request: BatchGradingRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Chấm hàng loạt câu trả lời (cho Writing và Speaking)
     
-    Useful khi học sinh nộp toàn bộ bài thi
+    Useful khi học sinh nộp toàn bộ bài thi. Các câu được chấm song song;
+    câu lỗi không làm hỏng cả batch, câu chưa xong khi hết deadline được
+    trả về trong pending_question_ids.
     """
     try:
         results = []
-        total_score = 0
-        
-        for answer_data in request.answers:
-            if answer_data.type == "writing":
-                result = await chatgpt_service.grade_writing_answer(
-                    question=answer_data.question,
-                    answer=answer_data.answer or "",
-                    exam_type=answer_data.exam_type,
-                )
-            elif answer_data.type == "speaking":
-                result = await chatgpt_service.grade_speaking_answer(
-                    question=answer_data.question,
-                    transcript=answer_data.transcript or "",
-                    exam_type=answer_data.exam_type,
-                )
+        errors = []
+        pending_ids: List[int] = []
+        
+        deadline = _batch_deadline(request)
+        async for kind, item in _iter_batch_grading(request.answers, deadline):
+            if kind == "result":
+                results.append(item)
+            elif kind == "error":
+                errors.append(item)
             else:
-                logger.warning(f"Unknown answer type: {answer_data.type}")
-                continue
-            
-            results.append({
-                "question_id": answer_data.question_id,
-                "result": result,
-            })
-            
-            total_score += result.get("overall_score", 0)  # Keep as is for internal calculation
+                pending_ids = item
+        
+        # Keep the request order regardless of completion order
+        order = {a.question_id: i for i, a in enumerate(request.answers)}
+        results.sort(key=lambda r: order.get(r["question_id"], 0))
+        total_score = sum(r["result"].get("overall_score", 0) for r in results)
         
         return BatchGradingResponse(
-            status="success",
+            status="partial" if errors or pending_ids else "success",
             results=results,
             total_score=total_score,
             num_graded=len(results),
+            errors=errors,
+            pending_question_ids=pending_ids,
         )
         
     except Exception as e:
@@ -407,6 +603,46 @@ async def grade_batch(
         )
 
 
+@router.post("/grade-batch/stream")
+async def grade_batch_stream(
+    request: BatchGradingRequest,
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Chấm hàng loạt dạng Server-Sent Events
+    
+    Events: "result" / "error" cho từng câu ngay khi chấm xong, cuối cùng là
+    "complete" với tổng điểm và pending_question_ids.
+    """
+    deadline = _batch_deadline(request)
+    
+    async def event_stream():
+        total_score = 0
+        num_graded = 0
+        num_errors = 0
+        async for kind, item in _iter_batch_grading(request.answers, deadline):
+            if kind == "result":
+                num_graded += 1
+                total_score += item["result"].get("overall_score", 0)
+                yield _sse_event("result", item)
+            elif kind == "error":
+                num_errors += 1
+                yield _sse_event("error", item)
+            else:
+                yield _sse_event("complete", {
+                    "status": "partial" if num_errors or item else "success",
+                    "total_score": total_score,
+                    "num_graded": num_graded,
+                    "pending_question_ids": item,
+                })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 class SaveAIGradingRequest(BaseModel):
     """Request to save AI grading result to database"""
     submission_id: int
@@ -418,7 +654,7 @@ class SaveAIGradingRequest(BaseModel):
 async def save_ai_grading(
     request: SaveAIGradingRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Save AI grading result to user_exam_answers.ai_feedback
@@ -443,6 +679,8 @@ async def save_ai_grading(
         # Save AI grading result as JSON
         answer.ai_feedback = json.dumps(request.ai_grading_result, ensure_ascii=False)
         answer.updated_at = datetime.utcnow()
+        # Rebuild the cached review of this submission
+        await touch_submission(db, request.submission_id)
         
         await db.commit()
         await db.refresh(answer)
@@ -477,12 +715,15 @@ class TranscriptionResponse(BaseModel):
     status: str
     transcript: str
     audio_url: str
+    segments: List[Dict[str, Any]] = []  # [{"start", "end", "text"}], seconds from start of recording
+    duration: Optional[float] = None
+    cached: bool = False
 
 
 @router.post("/transcribe-audio", response_model=TranscriptionResponse)
 async def transcribe_audio(
     request: TranscriptionRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Transcribe audio file to text using OpenAI Whisper API
@@ -490,7 +731,8 @@ async def transcribe_audio(
     This endpoint:
     - Takes audio URL from uploads directory
     - Uses Whisper API to transcribe audio to text
-    - Returns transcript for AI grading
+      (cached by audio content; long recordings are split and transcribed in parallel)
+    - Returns transcript (with timestamped segments) for AI grading
     """
     try:
         from pathlib import Path
@@ -509,17 +751,20 @@ async def transcribe_audio(
         logger.info(f"Transcribing audio: {request.audio_url}")
         
         # Transcribe using Whisper API
-        transcript = await chatgpt_service.transcribe_audio(
+        result = await chatgpt_service.transcribe_audio_detailed(
             audio_file_path=str(full_path),
             language=request.language
         )
         
-        logger.info(f"Transcription complete. Length: {len(transcript)} characters")
+        logger.info(f"Transcription complete. Length: {len(result['text'])} characters")
         
         return TranscriptionResponse(
             status="success",
-            transcript=transcript,
-            audio_url=request.audio_url
+            transcript=result["text"],
+            audio_url=request.audio_url,
+            segments=result["segments"],
+            duration=result.get("duration"),
+            cached=result["cached"],
         )
         
     except HTTPException:
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from pydantic import BaseModel
@@ -7,8 +7,12 @@ from datetime import datetime
 
 from app.models.exam_models import ExamQuestionGroup, ExamSection, ExamQuestion
 from app.database import get_db
-from app.auth import get_current_user, get_optional_user
-from app.models.auth_models import User
+from app.auth import get_current_user, get_optional_user, Principal
+from app.services.exam_content import (
+    GROUP, SKILL, cached_parent_skill, get_content_version, invalidate_skill_content,
+    skill_id_for_group, skill_id_for_section
+)
+from app.services.http_cache import is_not_modified, make_etag, not_modified, set_cache_headers
 
 router = APIRouter()
 
@@ -46,7 +50,7 @@ class GroupUpdate(BaseModel):
 async def list_groups_by_section(
     section_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """List all question groups for a section"""
     # Check if section exists
@@ -98,7 +102,7 @@ async def list_groups_by_section(
 async def get_group(
     group_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_user)
+    current_user: Optional[Principal] = Depends(get_optional_user)
 ):
     """Get question group by ID (public endpoint - auth optional)"""
     result = await db.execute(
@@ -137,10 +141,20 @@ async def get_group(
 @router.get("/groups/{group_id}/questions")
 async def get_questions_by_group(
     group_id: int,
+    request: Request,
+    response: Response,
+    v: Optional[int] = Query(None, description="Content version (immutable caching)"),
     db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_user)
+    current_user: Optional[Principal] = Depends(get_optional_user)
 ):
-    """Get all questions for a question group (public endpoint - auth optional)"""
+    """Get all questions for a question group (public endpoint - auth optional, 304 if If-None-Match is current)"""
+    # Version is read before the content, so the ETag never runs ahead of the body
+    skill_id = cached_parent_skill(GROUP, group_id) or await skill_id_for_group(db, group_id)
+    version = await get_content_version(SKILL, skill_id, db)
+    etag = make_etag(f"group-{group_id}-questions", version)
+    if is_not_modified(request, etag):
+        return not_modified(etag, version, v)
+    
     # Check if group exists
     result = await db.execute(
         select(ExamQuestionGroup)
@@ -164,6 +178,7 @@ async def get_questions_by_group(
     result = await db.execute(query)
     questions = result.scalars().all()
     
+    set_cache_headers(response, etag, version, v)
     return questions
 
 
@@ -172,7 +187,7 @@ async def create_group(
     section_id: int,
     group_data: GroupCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create new question group"""
     # Check if section exists
@@ -199,6 +214,8 @@ async def create_group(
     await db.commit()
     await db.refresh(group)
     
+    await invalidate_skill_content(db, section.exam_skill_id)
+    
     return {
         "id": group.id,
         "exam_section_id": group.exam_section_id,
@@ -216,7 +233,7 @@ async def update_group(
     group_id: int,
     group_data: GroupUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update question group"""
     result = await db.execute(
@@ -242,6 +259,8 @@ async def update_group(
     await db.commit()
     await db.refresh(group)
     
+    await invalidate_skill_content(db, await skill_id_for_section(db, group.exam_section_id))
+    
     # Get questions count
     count_query = select(func.count(ExamQuestion.id)).where(
         ExamQuestion.question_group_id == group.id,
@@ -266,7 +285,7 @@ async def update_group(
 async def delete_group(
     group_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Soft delete question group"""
     result = await db.execute(
@@ -285,4 +304,6 @@ async def delete_group(
     group.deleted_at = datetime.utcnow()
     await db.commit()
     
+    await invalidate_skill_content(db, await skill_id_for_section(db, group.exam_section_id))
+    
     return None
@@ -8,16 +8,23 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
 from typing import Optional
-import httpx
 from loguru import logger
 
 from app.database import get_db
 from app.models.auth_models import User, LoginActivity
 from app.auth import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.config import settings
+from app.services.http_client import CircuitBreaker, send_request
 
 router = APIRouter()
 
+# Shared by the token exchange and user info calls
+google_breaker = CircuitBreaker(
+    "google",
+    failure_threshold=settings.HTTP_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.HTTP_BREAKER_RESET_SECONDS,
+)
+
 
 @router.get("/oauth/google/redirect")
 async def google_redirect():
@@ -47,40 +54,45 @@ async def google_callback(
     """
     try:
         # Exchange authorization code for tokens
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                "https://oauth2.googleapis.com/token",
-                data={
-                    "code": code,
-                    "client_id": settings.GOOGLE_CLIENT_ID,
-                    "client_secret": settings.GOOGLE_CLIENT_SECRET,
-                    "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-                    "grant_type": "authorization_code",
-                }
-            )
-            
-            if token_response.status_code != 200:
+        token_response = await send_request(
+            google_breaker,
+            "POST",
+            "https://oauth2.googleapis.com/token",
+            data={
+                "code": code,
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+                "grant_type": "authorization_code",
+            }
+        )
+        
+        if token_response is None or token_response.status_code != 200:
+            if token_response is not None:
                 logger.error(f"Google token exchange failed: {token_response.text}")
-                return RedirectResponse(
-                    url=f"{settings.FRONTEND_APP_URL}/login?error=oauth_failed"
-                )
-            
-            tokens = token_response.json()
-            access_token = tokens.get("access_token")
-            
-            # Get user info from Google
-            user_info_response = await client.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
-                headers={"Authorization": f"Bearer {access_token}"}
+            return RedirectResponse(
+                url=f"{settings.FRONTEND_APP_URL}/login?error=oauth_failed"
             )
-            
-            if user_info_response.status_code != 200:
+        
+        tokens = token_response.json()
+        access_token = tokens.get("access_token")
+        
+        # Get user info from Google
+        user_info_response = await send_request(
+            google_breaker,
+            "GET",
+            "https://www.googleapis.com/oauth2/v2/userinfo",
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+        
+        if user_info_response is None or user_info_response.status_code != 200:
+            if user_info_response is not None:
                 logger.error(f"Google user info failed: {user_info_response.text}")
-                return RedirectResponse(
-                    url=f"{settings.FRONTEND_APP_URL}/login?error=oauth_failed"
-                )
-            
-            user_info = user_info_response.json()
+            return RedirectResponse(
+                url=f"{settings.FRONTEND_APP_URL}/login?error=oauth_failed"
+            )
+        
+        user_info = user_info_response.json()
         
         # Extract user information
         email = user_info.get("email")
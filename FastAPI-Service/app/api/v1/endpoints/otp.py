@@ -7,18 +7,26 @@ from sqlalchemy import select
 from pydantic import BaseModel, EmailStr
 from typing import Optional, Literal
 from datetime import datetime, timedelta
-import random
+import secrets
 import string
 from loguru import logger
 
 from app.database import get_db
 from app.models.auth_models import User
 from app.services.email_service import email_service
+from app.services.otp_store import INVALID, LOCKED, MISSING, OK, PURPOSE_MISMATCH, otp_store
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
 
 router = APIRouter()
 
-# In-memory OTP storage (for production, use Redis)
-otp_storage = {}
+# verify() result -> error message
+OTP_ERRORS = {
+    MISSING: "Mã OTP không tồn tại hoặc đã hết hạn",
+    INVALID: "Mã OTP không chính xác",
+    LOCKED: "Bạn đã nhập sai mã OTP quá nhiều lần. Vui lòng yêu cầu mã mới.",
+    PURPOSE_MISMATCH: "Mục đích xác thực không khớp",
+}
 
 
 class OTPSendRequest(BaseModel):
@@ -38,7 +46,7 @@ class OTPVerifyRequest(BaseModel):
 
 def generate_otp(length: int = 6) -> str:
     """Generate random OTP code"""
-    return ''.join(random.choices(string.digits, k=length))
+    return ''.join(secrets.choice(string.digits) for _ in range(length))
 
 
 @router.post("/otp/send")
@@ -65,20 +73,24 @@ async def send_otp(
                     detail="Email đã được đăng ký"
                 )
         
+        # Throttle sends per destination
+        allowed, retry_after = await otp_store.allow_send(request.destination)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Bạn đã yêu cầu quá nhiều mã OTP. Vui lòng thử lại sau.",
+                headers={"Retry-After": str(retry_after)}
+            )
+        
         # Generate OTP
         otp_code = generate_otp()
         
-        # Store OTP with expiration (5 minutes)
-        otp_storage[request.destination] = {
-            "code": otp_code,
-            "expires_at": datetime.utcnow() + timedelta(minutes=5),
-            "purpose": request.purpose,
-            "email": request.email
-        }
+        # Store OTP (hashed, expires after OTP_TTL_SECONDS)
+        await otp_store.save(request.destination, otp_code, request.purpose, request.email)
         
         # Send OTP based on channel
         if request.channel == "email":
-            success = email_service.send_otp_email(request.destination, otp_code)
+            success = await email_service.send_otp_email(request.destination, otp_code)
             if not success:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -125,35 +137,12 @@ async def verify_otp(
     Verify OTP code and create user account (for register purpose)
     """
     try:
-        # Check if OTP exists
-        if request.destination not in otp_storage:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Mã OTP không tồn tại hoặc đã hết hạn"
-            )
-        
-        stored_otp = otp_storage[request.destination]
-        
-        # Check if OTP is expired
-        if datetime.utcnow() > stored_otp["expires_at"]:
-            del otp_storage[request.destination]
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Mã OTP đã hết hạn"
-            )
-        
-        # Verify OTP code
-        if stored_otp["code"] != request.otp_code:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Mã OTP không chính xác"
-            )
-        
-        # Check purpose
-        if stored_otp["purpose"] != request.purpose:
+        # Check OTP (existence / expiry, code, attempts, purpose)
+        result = await otp_store.verify(request.destination, request.otp_code, request.purpose)
+        if result != OK:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Mục đích xác thực không khớp"
+                detail=OTP_ERRORS[result]
             )
         
         # If purpose is register, create or update user account
@@ -173,11 +162,12 @@ async def verify_otp(
             
             # If user exists but no password (OAuth user), update password
             if existing_user and (not existing_user.password or existing_user.password == ""):
-                existing_user.password = User.hash_password(request.password)
+                existing_user.password = await password_hasher.hash(request.password)
                 existing_user.email_verified_at = datetime.utcnow()
                 existing_user.updated_at = datetime.utcnow()
                 await db.commit()
                 await db.refresh(existing_user)
+                await principal_cache.invalidate(existing_user.id)
                 user = existing_user
                 logger.info(f"Password set for OAuth user via OTP: {user.email}")
             else:
@@ -191,7 +181,7 @@ async def verify_otp(
                     name=request.email.split('@')[0],  # Use email prefix as default name
                     email=request.email,
                     phone=phone,
-                    password=User.hash_password(request.password),
+                    password=await password_hasher.hash(request.password),
                     is_active=True,
                     role_id=2,  # Student role
                     email_verified_at=datetime.utcnow(),
@@ -204,9 +194,10 @@ async def verify_otp(
                 await db.refresh(user)
                 
                 logger.info(f"New user created via OTP: {user.email}")
+                await email_service.send_welcome_email(user.email, user.name)
             
             # Clean up OTP
-            del otp_storage[request.destination]
+            await otp_store.discard(request.destination)
             
             # Import here to avoid circular import
             from app.auth import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
@@ -232,7 +223,7 @@ async def verify_otp(
             }
         
         # For other purposes, just verify OTP
-        del otp_storage[request.destination]
+        await otp_store.discard(request.destination)
         return {
             "success": True,
             "message": "Xác thực OTP thành công"
@@ -8,11 +8,11 @@ from datetime import datetime
 import random
 from loguru import logger
 
-from app.models.auth_models import User
 from app.models.payment_models import Payment, UserWallet, PaymentStatus, WalletTransaction
-from app.auth import get_current_user
+from app.auth import get_current_user, Principal
 from app.database import get_db
 from app.services.payos_service import payos_service
+from app.services.wallet_ledger import TX_HOLD
 
 router = APIRouter()
 
@@ -98,7 +98,7 @@ async def get_or_create_wallet(db: AsyncSession, user_id: int) -> UserWallet:
 @router.post("/create", response_model=PaymentResponse)
 async def create_payment(
     payment_request: CreatePaymentRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -190,7 +190,7 @@ async def create_payment(
 @router.get("/check/{order_code}")
 async def check_payment_status(
     order_code: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -296,7 +296,7 @@ async def check_payment_status(
 
 @router.get("/history", response_model=List[PaymentHistoryItem])
 async def get_payment_history(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -347,7 +347,7 @@ async def get_payment_history(
                 time=t.created_at.strftime("%H:%M · %d/%m/%Y"),
                 eggs=t.amount,  # Negative for AI grading
                 note=t.description or f"{t.transaction_type}",
-                status="done"  # Transactions are always completed
+                status="pending" if t.transaction_type == TX_HOLD else "done"  # HOLD = AI grading in progress
             ))
         
         # Sort by time (most recent first)
@@ -365,7 +365,7 @@ async def get_payment_history(
 
 @router.get("/wallet", response_model=WalletResponse)
 async def get_wallet(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -7,8 +7,8 @@ from datetime import datetime
 
 from app.models.exam_models import ExamQuestion, ExamQuestionGroup
 from app.database import get_db
-from app.auth import get_current_user
-from app.models.auth_models import User
+from app.auth import get_current_user, Principal
+from app.services.exam_content import invalidate_skill_content, skill_id_for_group
 
 router = APIRouter()
 
@@ -58,7 +58,7 @@ async def list_questions(
     question_group_id: Optional[int] = None,
     is_active: Optional[bool] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """List questions with filters"""
     query = select(ExamQuestion).where(ExamQuestion.deleted_at.is_(None))
@@ -81,7 +81,7 @@ async def list_questions(
 async def get_question(
     question_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get question by ID"""
     result = await db.execute(
@@ -104,7 +104,7 @@ async def get_question(
 async def create_question(
     question_data: QuestionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create new question"""
     # Verify question group exists
@@ -125,6 +125,8 @@ async def create_question(
     await db.commit()
     await db.refresh(question)
     
+    await invalidate_skill_content(db, await skill_id_for_group(db, question.question_group_id))
+    
     return question
 
 
@@ -133,7 +135,7 @@ async def update_question(
     question_id: int,
     question_data: QuestionUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update question"""
     result = await db.execute(
@@ -159,6 +161,8 @@ async def update_question(
     await db.commit()
     await db.refresh(question)
     
+    await invalidate_skill_content(db, await skill_id_for_group(db, question.question_group_id))
+    
     return question
 
 
@@ -166,7 +170,7 @@ async def update_question(
 async def delete_question(
     question_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Soft delete question"""
     result = await db.execute(
@@ -185,4 +189,6 @@ async def delete_question(
     question.deleted_at = datetime.utcnow()
     await db.commit()
     
+    await invalidate_skill_content(db, await skill_id_for_group(db, question.question_group_id))
+    
     return None
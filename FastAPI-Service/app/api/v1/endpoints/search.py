@@ -0,0 +1,49 @@
+"""
+API endpoints for content search (exams, tests, skills, passages, questions)
+"""
+from fastapi import APIRouter, HTTPException, Depends, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.database import get_db
+from app.auth import get_current_user, Principal
+from app.services.content_search import SEARCH_TYPES, search_content
+from loguru import logger
+
+router = APIRouter()
+
+
+@router.get("/content")
+async def search_exam_content(
+    q: str = Query(..., min_length=2, description="Words to search (each also matches as a prefix)"),
+    types: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(SEARCH_TYPES)}"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    [ADMIN] Full-text search over the question bank, best matches first.
+
+    Every word must match; results carry the ids needed to open them
+    (exam_skill_id for sections, groups and questions).
+    """
+    if not current_user.role_id or current_user.role_id != 1:
+        raise HTTPException(status_code=403, detail="Chỉ admin mới có quyền truy cập")
+
+    selected = None
+    if types:
+        selected = [t.strip() for t in types.split(",") if t.strip()]
+        unknown = [t for t in selected if t not in SEARCH_TYPES]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown search types: {', '.join(unknown)}"
+            )
+
+    try:
+        results = await search_content(db, q, selected, limit)
+    except Exception as e:
+        logger.error(f"Content search error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+    return {"success": True, "total": len(results), "data": results}
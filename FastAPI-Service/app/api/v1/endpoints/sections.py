@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
 from pydantic import BaseModel
@@ -7,8 +7,11 @@ from datetime import datetime
 
 from app.models.exam_models import ExamSection, ExamSkill, ExamQuestionGroup
 from app.database import get_db
-from app.auth import get_current_user, get_optional_user
-from app.models.auth_models import User
+from app.auth import get_current_user, get_optional_user, Principal
+from app.services.exam_content import (
+    SECTION, SKILL, cached_parent_skill, get_content_version, invalidate_skill_content, skill_id_for_section
+)
+from app.services.http_cache import is_not_modified, make_etag, not_modified, set_cache_headers
 
 router = APIRouter()
 
@@ -49,7 +52,7 @@ class SectionUpdateRequest(BaseModel):
 async def list_sections(
     skill_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """List all sections for a skill"""
     # Check if skill exists
@@ -102,13 +105,23 @@ async def list_sections(
 @router.get("/sections/{section_id}")
 async def get_section(
     section_id: int,
+    request: Request,
+    response: Response,
     with_questions: bool = False,
+    v: Optional[int] = Query(None, description="Content version (immutable caching)"),
     db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_user)
+    current_user: Optional[Principal] = Depends(get_optional_user)
 ):
-    """Get section by ID (public endpoint - auth optional)"""
+    """Get section by ID (public endpoint - auth optional, 304 if If-None-Match is current)"""
     from app.models.exam_models import ExamQuestion
     
+    # Version is read before the content, so the ETag never runs ahead of the body
+    skill_id = cached_parent_skill(SECTION, section_id) or await skill_id_for_section(db, section_id)
+    version = await get_content_version(SKILL, skill_id, db)
+    etag = make_etag(f"section-{section_id}-q{int(with_questions)}", version)
+    if is_not_modified(request, etag):
+        return not_modified(etag, version, v)
+    
     result = await db.execute(
         select(ExamSection).where(
             ExamSection.id == section_id,
@@ -189,6 +202,7 @@ async def get_section(
         
         response_data["question_groups"] = question_groups_data
     
+    set_cache_headers(response, etag, version, v)
     return {"success": True, "data": response_data}
 
 
@@ -197,7 +211,7 @@ async def create_section(
     skill_id: int,
     section_data: SectionCreateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create new section"""
     # Check if skill exists
@@ -226,6 +240,8 @@ async def create_section(
     await db.commit()
     await db.refresh(new_section)
     
+    await invalidate_skill_content(db, skill_id)
+    
     return {
         "id": new_section.id,
         "exam_skill_id": new_section.exam_skill_id,
@@ -245,7 +261,7 @@ async def update_section(
     section_id: int,
     section_data: SectionUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update section"""
     result = await db.execute(
@@ -269,6 +285,8 @@ async def update_section(
     await db.commit()
     await db.refresh(section)
     
+    await invalidate_skill_content(db, section.exam_skill_id)
+    
     # Get question groups count
     count_query = select(func.count(ExamQuestionGroup.id)).where(
         ExamQuestionGroup.exam_section_id == section.id,
@@ -295,7 +313,7 @@ async def update_section(
 async def delete_section(
     section_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Soft delete section"""
     result = await db.execute(
@@ -315,4 +333,6 @@ async def delete_section(
     section.deleted_at = datetime.utcnow()
     await db.commit()
     
+    await invalidate_skill_content(db, section.exam_skill_id)
+    
     return None
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, func, update
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 
-from app.models.exam_models import ExamSkill, ExamTest, Exam, SkillType
+from app.models.exam_models import ExamSkill, ExamTest, Exam, ExamSubmission, SkillType
 from app.database import get_db
-from app.auth import get_current_user, get_optional_user
-from app.models.auth_models import User
+from app.auth import get_current_user, get_optional_user, Principal
+from app.services.exam_content import (
+    SKILL, exam_id_for_test, get_content_version, invalidate_exam_content, invalidate_skill_content
+)
+from app.services.http_cache import is_not_modified, make_etag, not_modified, set_cache_headers
+from app.services.skill_snapshot import skill_snapshot_cache
 
 router = APIRouter()
 
@@ -67,7 +71,7 @@ async def list_skills(
     search: Optional[str] = Query(None),
     is_online: Optional[bool] = Query(None),
     db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_user)
+    current_user: Optional[Principal] = Depends(get_optional_user)
 ):
     """List all skills with filters (public endpoint - auth optional)"""
     # Calculate pagination
@@ -132,160 +136,41 @@ async def list_skills(
 @router.get("/{skill_id}")
 async def get_skill(
     skill_id: int,
+    request: Request,
     with_sections: bool = Query(False, description="Include sections and questions"),
+    v: Optional[int] = Query(None, description="Content version (immutable caching)"),
     db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_user)
+    current_user: Optional[Principal] = Depends(get_optional_user)
 ):
-    """Get skill by ID (public endpoint - auth optional)"""
-    result = await db.execute(
-        select(ExamSkill)
-        .where(ExamSkill.id == skill_id)
-    )
-    skill = result.scalar_one_or_none()
-    
-    if not skill:
+    """
+    Get skill by ID (public endpoint - auth optional)
+
+    Answers 304 when If-None-Match carries the current ETag. Otherwise the body
+    is served from the serialized snapshot cache; the skill tree is only loaded
+    (with a fixed number of queries) after an edit.
+    """
+    version = await get_content_version(SKILL, skill_id, db)
+    etag = make_etag(f"skill-{skill_id}-s{int(with_sections)}", version)
+    if is_not_modified(request, etag):
+        return not_modified(etag, version, v)
+    
+    body = await skill_snapshot_cache.get(db, skill_id, with_sections, version)
+    if body is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Skill not found"
         )
     
-    # Load relationships
-    await db.refresh(skill, ['exam_test'])
-    if skill.exam_test:
-        await db.refresh(skill.exam_test, ['exam'])
-    
-    response_data = {
-        "id": skill.id,
-        "exam_test_id": skill.exam_test_id,
-        "name": skill.name,
-        "skill_type": skill.skill_type.value if hasattr(skill.skill_type, 'value') else skill.skill_type,
-        "time_limit": skill.time_limit,
-        "description": skill.description,
-        "is_active": skill.is_active,
-        "is_online": skill.is_online,
-        "created_at": skill.created_at,
-        "exam_test_name": skill.exam_test.name if skill.exam_test else None,
-        "exam_id": skill.exam_test.exam_id if skill.exam_test else None,
-        "exam_name": skill.exam_test.exam.name if skill.exam_test and skill.exam_test.exam else None,
-        "exam_type": skill.exam_test.exam.type if skill.exam_test and skill.exam_test.exam else None,
-    }
-    
-    # If with_sections is True, include sections with questions
-    if with_sections:
-        await db.refresh(skill, ['exam_sections'])
-        sections_data = []
-        
-        for section in skill.exam_sections:
-            await db.refresh(section, ['question_groups'])
-            
-            question_groups_data = []
-            for group in section.question_groups:
-                await db.refresh(group, ['questions'])
-                
-                questions_data = []
-                for question in group.questions:
-                    # Parse options/metadata from JSON
-                    import json
-                    parsed_metadata = None
-                    parsed_options = None
-                    
-                    if question.options:
-                        try:
-                            options_data = json.loads(question.options)
-                            # Check if it's the new format with metadata
-                            if isinstance(options_data, dict):
-                                if "metadata" in options_data:
-                                    parsed_metadata = options_data["metadata"]
-                                    if "options" in options_data:
-                                        parsed_options = options_data["options"]
-                                elif "chart_data" in options_data or "time_minutes" in options_data:
-                                    # Direct metadata format
-                                    parsed_metadata = options_data
-                                else:
-                                    # Old format - just options array
-                                    parsed_options = options_data
-                            elif isinstance(options_data, list):
-                                # Old format - array of options
-                                parsed_options = options_data
-                        except json.JSONDecodeError:
-                            # If not JSON, treat as plain text
-                            pass
-                    
-                    question_dict = {
-                        "id": question.id,
-                        "content": question.question_text,
-                        "answer_content": question.correct_answer,
-                        "metadata": parsed_metadata
-                    }
-                    
-                    # Add options separately if they exist
-                    if parsed_options:
-                        question_dict["options"] = parsed_options
-                    
-                    questions_data.append(question_dict)
-                
-                # Generate audio URL for this group (inherited from section)
-                group_audio_url = None
-                if section.audio:
-                    if section.audio.startswith(('http://', 'https://')):
-                        group_audio_url = section.audio
-                    else:
-                        from app.config import settings
-                        base_url = getattr(settings, 'BASE_URL', 'http://localhost:8000')
-                        base_url = base_url.rstrip('/')
-                        
-                        if section.audio.startswith('/'):
-                            group_audio_url = f"{base_url}{section.audio}"
-                        else:
-                            group_audio_url = f"{base_url}/uploads/audio/{section.audio}"
-                
-                # FIXED: Move this append INSIDE the group loop
-                question_groups_data.append({
-                    "id": group.id,
-                    "name": group.name,
-                    "question_type": group.question_type,
-                    "content": group.content,
-                    "audio_url": group_audio_url,
-                    "questions": questions_data
-                })
-            
-            # Generate audio URL if audio path exists
-            audio_url = None
-            if section.audio:
-                # If it's already a full URL, use it as is
-                if section.audio.startswith(('http://', 'https://')):
-                    audio_url = section.audio
-                else:
-                    # Otherwise, construct full URL
-                    from app.config import settings
-                    base_url = getattr(settings, 'BASE_URL', 'http://localhost:8000')
-                    base_url = base_url.rstrip('/')
-                    
-                    if section.audio.startswith('/'):
-                        audio_url = f"{base_url}{section.audio}"
-                    else:
-                        audio_url = f"{base_url}/uploads/audio/{section.audio}"
-            
-            sections_data.append({
-                "id": section.id,
-                "title": section.name,
-                "content": section.content,
-                "ui_layer": section.ui_layer,
-                "audio": section.audio,
-                "audio_url": audio_url,
-                "question_groups": question_groups_data
-            })
-        
-        response_data["sections"] = sections_data
-    
-    return {"success": True, "data": response_data}
+    response = Response(content=body, media_type="application/json")
+    set_cache_headers(response, etag, version, v)
+    return response
 
 
 @router.post("/", response_model=SkillResponse)
 async def create_skill(
     skill_data: SkillCreateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create new skill"""
     # Check if exam_test exists
@@ -316,6 +201,8 @@ async def create_skill(
     await db.commit()
     await db.refresh(new_skill)
     
+    await invalidate_exam_content(db, exam_test.exam_id)
+    
     # Load relationships
     await db.refresh(new_skill, ['exam_test'])
     if new_skill.exam_test:
@@ -344,7 +231,7 @@ async def update_skill(
     skill_id: int,
     skill_data: SkillUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update skill"""
     result = await db.execute(
@@ -371,12 +258,20 @@ async def update_skill(
             )
     
     # Update fields
+    previous_exam_test_id = skill.exam_test_id
     if skill_data.exam_test_id is not None:
         skill.exam_test_id = skill_data.exam_test_id
     if skill_data.name is not None:
         skill.name = skill_data.name
     if skill_data.skill_type is not None:
         skill.skill_type = skill_data.skill_type
+        # Keep the copy used by the admin submission filters in sync
+        await db.execute(
+            update(ExamSubmission)
+            .where(ExamSubmission.exam_skill_id == skill.id)
+            .values(skill_type=skill_data.skill_type)
+            .execution_options(synchronize_session=False)
+        )
     if skill_data.time_limit is not None:
         skill.time_limit = skill_data.time_limit
     if skill_data.description is not None:
@@ -391,6 +286,14 @@ async def update_skill(
     await db.commit()
     await db.refresh(skill)
     
+    await invalidate_skill_content(db, skill.id)
+    # The skill header is listed under its exam (and the previous one if it moved)
+    for exam_id in {
+        await exam_id_for_test(db, previous_exam_test_id),
+        await exam_id_for_test(db, skill.exam_test_id),
+    }:
+        await invalidate_exam_content(db, exam_id)
+    
     # Load relationships
     await db.refresh(skill, ['exam_test'])
     if skill.exam_test:
@@ -418,7 +321,7 @@ async def update_skill(
 async def delete_skill(
     skill_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete skill"""
     result = await db.execute(
@@ -432,7 +335,11 @@ async def delete_skill(
             detail="Skill not found"
         )
     
+    exam_id = await exam_id_for_test(db, skill.exam_test_id)
     await db.delete(skill)
     await db.commit()
     
+    await invalidate_skill_content(db, skill_id)
+    await invalidate_exam_content(db, exam_id)
+    
     return {"message": "Skill deleted successfully"}
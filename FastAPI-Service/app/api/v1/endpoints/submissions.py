@@ -1,25 +1,33 @@
 """
 API endpoints for exam submissions and user answers
 """
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, insert
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import json
 
 from app.models.exam_models import (
-    ExamSubmission, UserExamAnswer, ExamQuestion, 
-    ExamSkill, ExamSection, SubmissionStatus, ExamQuestionGroup
+    ExamSubmission, UserExamAnswer, Exam, ExamTest,
+    ExamSkill, ExamSection, SubmissionStatus
 )
 from app.database import get_db
-from app.auth import get_current_user
+from app.auth import get_current_user, Principal
+from app.responses import FastJSONResponse
+from app.services.answer_key_cache import answer_key_cache
+from app.services.pagination import NEXT_CURSOR_HEADER, after_cursor, decode_cursor, split_page
+from app.services.scoring import load_answer_key, score_answers
+from app.services.submission_listing import submission_conditions, submission_count_cache
+from app.services.submission_review import submission_review_builder
 from app.models.auth_models import User
 from loguru import logger
 
 router = APIRouter()
 
+# Page size of /my-submissions when only a cursor is given
+MY_SUBMISSIONS_PAGE_SIZE = 50
+
 
 # ============================================
 # PYDANTIC MODELS
@@ -74,6 +82,8 @@ class SubmissionResponse(BaseModel):
     # Additional fields for display
     skill_name: Optional[str] = None
     skill_type: Optional[str] = None
+    test_name: Optional[str] = None
+    exam_name: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -124,7 +134,7 @@ class SubmissionDetailResponse(BaseModel):
 async def submit_exam(
     request: SubmissionCreateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Submit exam answers
@@ -170,68 +180,48 @@ async def submit_exam(
                 )
         
         # Create submission
+        now = datetime.utcnow()
         submission = ExamSubmission(
             user_id=current_user.id,
             exam_skill_id=request.exam_skill_id,
             exam_section_id=request.exam_section_id,
+            skill_type=skill.skill_type,
             status=SubmissionStatus.COMPLETED,
-            started_at=datetime.utcnow(),
-            submitted_at=datetime.utcnow(),
+            started_at=now,
+            submitted_at=now,
             time_spent=request.time_spent,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_at=now,
+            updated_at=now
         )
         
         db.add(submission)
         await db.flush()  # Get submission ID
         
-        # Save answers and calculate score
-        total_score = 0
-        max_score = 0
+        # Score all answers against the skill's compiled answer key
+        answer_key = (await answer_key_cache.get(db, skill.id))["questions"]
+        submitted_ids = {a.question_id for a in request.answers}
+        if not submitted_ids <= answer_key.keys():
+            # Questions outside this skill: one IN query for the rest
+            answer_key = {**answer_key, **await load_answer_key(db, submitted_ids - answer_key.keys())}
+        missing = submitted_ids - answer_key.keys()
+        if missing:
+            logger.warning(f"Questions {sorted(missing)} not found, skipping")
         
-        for answer_data in request.answers:
-            # Get question to check correct answer
-            question_result = await db.execute(
-                select(ExamQuestion).where(
-                    ExamQuestion.id == answer_data.question_id,
-                    ExamQuestion.deleted_at.is_(None)
-                )
-            )
-            question = question_result.scalar_one_or_none()
-            
-            if not question:
-                logger.warning(f"Question {answer_data.question_id} not found, skipping")
-                continue
-            
-            # Check if answer is correct (for multiple choice and fill in blank)
-            is_correct = None
-            score = None
-            
-            print(f"🎯 Q{answer_data.question_id}: question_type='{question.question_type}', correct_answer='{question.correct_answer}'")
-            
-            if question.question_type in ["multiple_choice", "fill_blank", "true_false", "yes_no", "yes_no_not_given"] and question.correct_answer:
-                user_answer = (answer_data.answer_text or "").strip().lower()
-                correct_answer = (question.correct_answer or "").strip().lower()
-                is_correct = user_answer == correct_answer
-                score = question.points if is_correct else 0
-                total_score += score
-                print(f"✅ Q{answer_data.question_id}: user='{user_answer}', correct='{correct_answer}', is_correct={is_correct}, score={score}")
-            
-            max_score += question.points
-            
-            # Create answer record
-            user_answer = UserExamAnswer(
-                submission_id=submission.id,
-                question_id=answer_data.question_id,
-                answer_text=answer_data.answer_text,
-                answer_audio=answer_data.answer_audio,
-                is_correct=is_correct,
-                score=score,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
+        rows, total_score, max_score = score_answers(submission.id, request.answers, answer_key, now)
+        
+        # Bulk insert answers in one statement
+        answer_ids: Dict[int, List[int]] = {}
+        if rows:
+            await db.execute(insert(UserExamAnswer).values(rows))
+            # Ids are not necessarily consecutive (innodb_autoinc_lock_mode=2): read
+            # them back; the submission is new, so these are exactly the rows above
+            id_result = await db.execute(
+                select(UserExamAnswer.id, UserExamAnswer.question_id)
+                .where(UserExamAnswer.submission_id == submission.id)
+                .order_by(UserExamAnswer.id)
             )
-            
-            db.add(user_answer)
+            for answer_id, question_id in id_result.all():
+                answer_ids.setdefault(question_id, []).append(answer_id)
         
         # Update submission with scores
         submission.total_score = total_score
@@ -242,16 +232,6 @@ async def submit_exam(
             submission.status = SubmissionStatus.GRADED
         
         await db.commit()
-        await db.refresh(submission)
-        
-        # Load answers for response
-        answers_result = await db.execute(
-            select(UserExamAnswer).where(
-                UserExamAnswer.submission_id == submission.id,
-                UserExamAnswer.deleted_at.is_(None)
-            )
-        )
-        answers = answers_result.scalars().all()
         
         return SubmissionResponse(
             id=submission.id,
@@ -268,16 +248,16 @@ async def submit_exam(
             updated_at=submission.updated_at,
             answers=[
                 AnswerResponse(
-                    id=ans.id,
-                    question_id=ans.question_id,
-                    answer_text=ans.answer_text,
-                    answer_audio=ans.answer_audio,
-                    is_correct=ans.is_correct,
-                    score=ans.score,
-                    ai_feedback=json.loads(ans.ai_feedback) if ans.ai_feedback else None,
-                    created_at=ans.created_at
+                    id=answer_ids[row["question_id"]].pop(0),
+                    question_id=row["question_id"],
+                    answer_text=row["answer_text"],
+                    answer_audio=row["answer_audio"],
+                    is_correct=row["is_correct"],
+                    score=row["score"],
+                    ai_feedback=None,
+                    created_at=row["created_at"]
                 )
-                for ans in answers
+                for row in rows
             ]
         )
         
@@ -295,72 +275,59 @@ async def submit_exam(
 @router.get("/admin/all")
 async def admin_get_all_submissions(
     skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces skip)"),
     user_id: Optional[int] = None,
     skill_type: Optional[str] = None,
     status_filter: Optional[str] = None,
     search: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    [ADMIN] Get all submissions across all users.
-    Supports filters: user_id, skill_type, status, search (email or name)
+    [ADMIN] Get all submissions across all users, newest first.
+    Supports filters: user_id, skill_type, status, search (email or name prefix)
+
+    Pagination: pass the returned `next_cursor` back as `cursor` (keyset, any
+    depth); `skip` is still accepted for the first pages. `total` is cached for
+    a short time per filter combination.
     """
     if not current_user.role_id or current_user.role_id != 1:
         raise HTTPException(status_code=403, detail="Chỉ admin mới có quyền truy cập")
 
     try:
-        conditions = [ExamSubmission.deleted_at.is_(None)]
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        if user_id:
-            conditions.append(ExamSubmission.user_id == user_id)
-        if status_filter:
-            conditions.append(ExamSubmission.status == status_filter)
+    try:
+        conditions = submission_conditions(user_id, skill_type, status_filter, search)
+        if conditions is None:
+            return FastJSONResponse({"success": True, "total": 0, "next_cursor": None, "data": []})
+
+        total = await submission_count_cache.count(db, conditions, {
+            "user_id": user_id,
+            "skill_type": skill_type,
+            "status": status_filter,
+            "search": search,
+        })
+
+        page_conditions = list(conditions)
+        if position:
+            page_conditions.append(after_cursor(ExamSubmission.created_at, ExamSubmission.id, position))
 
         query = (
             select(ExamSubmission, User, ExamSkill)
             .join(User, ExamSubmission.user_id == User.id)
             .join(ExamSkill, ExamSubmission.exam_skill_id == ExamSkill.id, isouter=True)
-            .where(and_(*conditions))
+            .where(and_(*page_conditions))
+            .order_by(ExamSubmission.created_at.desc(), ExamSubmission.id.desc())
+            .limit(limit + 1)
         )
-
-        if skill_type:
-            query = query.where(ExamSkill.skill_type == skill_type)
-
-        if search:
-            from sqlalchemy import or_
-            query = query.where(
-                or_(
-                    User.email.ilike(f"%{search}%"),
-                    User.name.ilike(f"%{search}%"),
-                )
-            )
-
-        query = query.order_by(ExamSubmission.created_at.desc()).offset(skip).limit(limit)
+        if skip and not position:
+            query = query.offset(skip)
         result = await db.execute(query)
-        rows = result.all()
-
-        # Count total
-        from sqlalchemy import func as sql_func
-        count_query = (
-            select(sql_func.count(ExamSubmission.id))
-            .join(User, ExamSubmission.user_id == User.id)
-            .join(ExamSkill, ExamSubmission.exam_skill_id == ExamSkill.id, isouter=True)
-            .where(and_(*conditions))
-        )
-        if skill_type:
-            count_query = count_query.where(ExamSkill.skill_type == skill_type)
-        if search:
-            from sqlalchemy import or_ as or2
-            count_query = count_query.where(
-                or2(
-                    User.email.ilike(f"%{search}%"),
-                    User.name.ilike(f"%{search}%"),
-                )
-            )
-        total_result = await db.execute(count_query)
-        total = total_result.scalar_one_or_none() or 0
+        rows, next_page = split_page(result.all(), limit, key=lambda row: (row[0].created_at, row[0].id))
 
         items = []
         for sub, user, skill in rows:
@@ -393,7 +360,7 @@ async def admin_get_all_submissions(
                 "created_at": sub.created_at.isoformat() if sub.created_at else None,
             })
 
-        return {"success": True, "total": total, "data": items}
+        return FastJSONResponse({"success": True, "total": total, "next_cursor": next_page, "data": items})
 
     except HTTPException:
         raise
@@ -406,7 +373,7 @@ async def admin_get_all_submissions(
 async def admin_get_submission_detail(
     submission_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     [ADMIN] Get detailed submission by id – không check user_id
@@ -415,157 +382,11 @@ async def admin_get_submission_detail(
         raise HTTPException(status_code=403, detail="Chỉ admin mới có quyền truy cập")
 
     try:
-        result = await db.execute(
-            select(ExamSubmission).where(
-                ExamSubmission.id == submission_id,
-                ExamSubmission.deleted_at.is_(None)
-            )
-        )
-        submission = result.scalar_one_or_none()
-
-        if not submission:
+        response_data = await submission_review_builder.build(db, submission_id, include_owner=True)
+        if response_data is None:
             raise HTTPException(status_code=404, detail="Submission not found")
 
-        # Lấy thông tin user
-        user_result = await db.execute(select(User).where(User.id == submission.user_id))
-        owner = user_result.scalar_one_or_none()
-
-        # Lấy skill
-        skill_result = await db.execute(select(ExamSkill).where(ExamSkill.id == submission.exam_skill_id))
-        skill = skill_result.scalar_one_or_none()
-
-        # Lấy section name
-        section_name = None
-        if submission.exam_section_id:
-            section_result = await db.execute(select(ExamSection).where(ExamSection.id == submission.exam_section_id))
-            section = section_result.scalar_one_or_none()
-            if section:
-                section_name = section.name
-
-        # Lấy tất cả câu hỏi của skill
-        questions_result = await db.execute(
-            select(ExamQuestion, ExamQuestionGroup, ExamSection)
-            .join(ExamQuestionGroup, ExamQuestion.question_group_id == ExamQuestionGroup.id)
-            .join(ExamSection, ExamQuestionGroup.exam_section_id == ExamSection.id)
-            .where(
-                ExamSection.exam_skill_id == submission.exam_skill_id,
-                ExamQuestion.deleted_at.is_(None),
-                ExamQuestionGroup.deleted_at.is_(None),
-                ExamSection.deleted_at.is_(None)
-            )
-            .order_by(ExamSection.id, ExamQuestion.id)
-        )
-        all_questions = questions_result.all()
-
-        # Lấy câu trả lời của user
-        answers_result = await db.execute(
-            select(UserExamAnswer).where(
-                UserExamAnswer.submission_id == submission_id,
-                UserExamAnswer.deleted_at.is_(None)
-            )
-        )
-        user_answers = {ans.question_id: ans for ans in answers_result.scalars().all()}
-
-        answers_list = []
-        correct_count = 0
-        overall_question_number = 1
-
-        for question, question_group, section in all_questions:
-            user_answer = user_answers.get(question.id)
-            is_correct = False
-            if user_answer:
-                is_correct = user_answer.is_correct if user_answer.is_correct is not None else False
-                if is_correct:
-                    correct_count += 1
-
-            correct_answer = question.correct_answer or "N/A"
-            if question.options:
-                try:
-                    options = json.loads(question.options) if isinstance(question.options, str) else question.options
-                    if isinstance(options, list) and len(options) > 0:
-                        for idx, option in enumerate(options):
-                            if isinstance(option, dict) and option.get('is_correct'):
-                                correct_answer = chr(65 + idx)
-                                break
-                    elif isinstance(options, dict):
-                        correct_answer_normalized = str(question.correct_answer).strip().lower()
-                        for key, value in options.items():
-                            if str(value).strip().lower() == correct_answer_normalized:
-                                correct_answer = key
-                                break
-                except (json.JSONDecodeError, TypeError, AttributeError):
-                    pass
-
-            metadata = {}
-            if question.options:
-                try:
-                    options_data = json.loads(question.options) if isinstance(question.options, str) else question.options
-                    if isinstance(options_data, list):
-                        metadata["answers"] = options_data
-                    elif isinstance(options_data, dict):
-                        if "answers" in options_data:
-                            metadata["answers"] = options_data["answers"]
-                        if "locate" in options_data:
-                            metadata["locate"] = options_data["locate"]
-                        if "metadata" in options_data:
-                            metadata.update(options_data["metadata"])
-                        if "options" in options_data:
-                            metadata["answers"] = options_data["options"]
-                except (json.JSONDecodeError, TypeError):
-                    pass
-
-            if question.explanation:
-                metadata["explanation"] = question.explanation
-
-            answers_list.append({
-                "question_id": question.id,
-                "question_number": overall_question_number,
-                "part": section.name if section else "Part 1",
-                "question_content": question.question_text or question.content or "",
-                "user_answer": user_answer.answer_text if user_answer and user_answer.answer_text else "",
-                "answer_audio": user_answer.answer_audio if user_answer and user_answer.answer_audio else None,
-                "correct_answer": correct_answer,
-                "is_correct": is_correct,
-                "score": user_answer.score if user_answer else None,
-                "ai_feedback": json.loads(user_answer.ai_feedback) if (user_answer and user_answer.ai_feedback) else None,
-                "has_ai_grading": bool(user_answer and user_answer.ai_feedback),
-                "metadata": metadata if metadata else None
-            })
-            overall_question_number += 1
-
-        total_questions = len(answers_list)
-        answered_questions = sum(1 for ans in answers_list if (ans["user_answer"] or ans.get("answer_audio")))
-
-        response_data = {
-            "id": submission.id,
-            "user_id": submission.user_id,
-            "user_email": owner.email if owner else "",
-            "user_name": owner.name if owner else "",
-            "exam_skill_id": submission.exam_skill_id,
-            "exam_section_id": submission.exam_section_id,
-            "status": submission.status.value if hasattr(submission.status, "value") else submission.status,
-            "started_at": submission.started_at.isoformat() if submission.started_at else None,
-            "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
-            "time_spent": submission.time_spent or 0,
-            "total_score": submission.total_score,
-            "max_score": submission.max_score,
-            "created_at": submission.created_at.isoformat() if submission.created_at else None,
-            "updated_at": submission.updated_at.isoformat() if submission.updated_at else None,
-            "skill": {
-                "name": skill.name if skill else None,
-                "skill_type": skill.skill_type.value if skill else None
-            },
-            "exam": None,
-            "section_name": section_name,
-            "total_questions": total_questions,
-            "answered_questions": answered_questions,
-            "correct_answers": correct_count,
-            "teacher_score": getattr(submission, 'teacher_score', None),
-            "teacher_feedback": getattr(submission, 'teacher_feedback', None),
-            "answers": answers_list
-        }
-
-        return {"success": True, "data": response_data}
+        return FastJSONResponse({"success": True, "data": response_data})
 
     except HTTPException:
         raise
@@ -576,18 +397,31 @@ async def admin_get_submission_detail(
 
 @router.get("/my-submissions", response_model=List[SubmissionResponse])
 async def get_my_submissions(
+    response: Response,
     exam_skill_id: Optional[int] = None,
     status_filter: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header of the previous page"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Get all submissions for current user
+    Get submissions for current user, newest first
     
     Optional filters:
     - exam_skill_id: Filter by specific skill
     - status_filter: Filter by status (in_progress, completed, graded)
+    
+    Without `limit` and `cursor` the whole history is returned (as before).
+    Keyset pagination: pass `limit` (or a `cursor`; default page size
+    MY_SUBMISSIONS_PAGE_SIZE); when more rows exist, the response carries an
+    X-Next-Cursor header; pass it back as `cursor` to get the next page.
     """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
     try:
         # Build query
         conditions = [
@@ -601,51 +435,57 @@ async def get_my_submissions(
         if status_filter:
             conditions.append(ExamSubmission.status == status_filter)
         
+        if position:
+            conditions.append(after_cursor(ExamSubmission.created_at, ExamSubmission.id, position))
+        
+        paginated = limit is not None or position is not None
+        if paginated and limit is None:
+            limit = MY_SUBMISSIONS_PAGE_SIZE
+        
         try:
-            result = await db.execute(
-                select(ExamSubmission)
+            # Submissions with skill / test / exam names in one query (index user_id, created_at)
+            query = (
+                select(ExamSubmission, ExamSkill.name, ExamSkill.skill_type, ExamTest.name, Exam.name)
+                .outerjoin(ExamSkill, ExamSkill.id == ExamSubmission.exam_skill_id)
+                .outerjoin(ExamTest, ExamTest.id == ExamSkill.exam_test_id)
+                .outerjoin(Exam, Exam.id == ExamTest.exam_id)
                 .where(and_(*conditions))
-                .order_by(ExamSubmission.created_at.desc())
+                .order_by(ExamSubmission.created_at.desc(), ExamSubmission.id.desc())
             )
-            submissions = result.scalars().all()
+            if paginated:
+                result = await db.execute(query.limit(limit + 1))
+                rows, next_page = split_page(result.all(), limit, key=lambda row: (row[0].created_at, row[0].id))
+            else:
+                rows, next_page = (await db.execute(query)).all(), None
         except Exception as db_error:
             # If table doesn't exist, return empty list
             logger.error(f"Database error (table might not exist): {str(db_error)}")
             return []
         
-        # Get skill information for each submission
-        response_list = []
-        for sub in submissions:
-            try:
-                # Get skill data
-                skill_result = await db.execute(
-                    select(ExamSkill).where(ExamSkill.id == sub.exam_skill_id)
-                )
-                skill = skill_result.scalar_one_or_none()
-                
-                response_list.append(
-                    SubmissionResponse(
-                        id=sub.id,
-                        user_id=sub.user_id,
-                        exam_skill_id=sub.exam_skill_id,
-                        exam_section_id=sub.exam_section_id,
-                        status=sub.status,
-                        started_at=sub.started_at,
-                        submitted_at=sub.submitted_at,
-                        time_spent=sub.time_spent,
-                        total_score=sub.total_score,
-                        max_score=sub.max_score,
-                        created_at=sub.created_at,
-                        updated_at=sub.updated_at,
-                        skill_name=skill.name if skill else None,
-                        skill_type=skill.skill_type.value if skill else None
-                    )
-                )
-            except Exception as item_error:
-                logger.error(f"Error processing submission {sub.id}: {str(item_error)}")
-                continue
+        if next_page:
+            response.headers[NEXT_CURSOR_HEADER] = next_page
         
-        return response_list
+        return [
+            SubmissionResponse(
+                id=sub.id,
+                user_id=sub.user_id,
+                exam_skill_id=sub.exam_skill_id,
+                exam_section_id=sub.exam_section_id,
+                status=sub.status,
+                started_at=sub.started_at,
+                submitted_at=sub.submitted_at,
+                time_spent=sub.time_spent,
+                total_score=sub.total_score,
+                max_score=sub.max_score,
+                created_at=sub.created_at,
+                updated_at=sub.updated_at,
+                skill_name=skill_name,
+                skill_type=skill_type.value if skill_type else None,
+                test_name=test_name,
+                exam_name=exam_name
+            )
+            for sub, skill_name, skill_type, test_name, exam_name in rows
+        ]
         
     except Exception as e:
         logger.error(f"Error fetching submissions: {str(e)}")
@@ -659,209 +499,20 @@ async def get_my_submissions(
 async def get_submission_detail(
     submission_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get detailed submission with all answers and grading
     """
     try:
-        # Get submission
-        result = await db.execute(
-            select(ExamSubmission).where(
-                ExamSubmission.id == submission_id,
-                ExamSubmission.user_id == current_user.id,
-                ExamSubmission.deleted_at.is_(None)
-            )
-        )
-        submission = result.scalar_one_or_none()
-        
-        if not submission:
+        response_data = await submission_review_builder.build(db, submission_id, user_id=current_user.id)
+        if response_data is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Submission not found"
             )
         
-        # Get ALL questions from the skill (not just answered ones)
-        questions_result = await db.execute(
-            select(ExamQuestion, ExamQuestionGroup, ExamSection)
-            .join(ExamQuestionGroup, ExamQuestion.question_group_id == ExamQuestionGroup.id)
-            .join(ExamSection, ExamQuestionGroup.exam_section_id == ExamSection.id)
-            .where(
-                ExamSection.exam_skill_id == submission.exam_skill_id,
-                ExamQuestion.deleted_at.is_(None),
-                ExamQuestionGroup.deleted_at.is_(None),
-                ExamSection.deleted_at.is_(None)
-            )
-            .order_by(ExamSection.id, ExamQuestion.id)
-        )
-        all_questions = questions_result.all()
-        
-        # Get user's answers
-        answers_result = await db.execute(
-            select(UserExamAnswer)
-            .where(
-                UserExamAnswer.submission_id == submission_id,
-                UserExamAnswer.deleted_at.is_(None)
-            )
-        )
-        user_answers = {ans.question_id: ans for ans in answers_result.scalars().all()}
-        
-        # Get skill info
-        skill_result = await db.execute(
-            select(ExamSkill).where(ExamSkill.id == submission.exam_skill_id)
-        )
-        skill = skill_result.scalar_one_or_none()
-        
-        # Get section name if applicable
-        section_name = None
-        if submission.exam_section_id:
-            section_result = await db.execute(
-                select(ExamSection).where(ExamSection.id == submission.exam_section_id)
-            )
-            section = section_result.scalar_one_or_none()
-            if section:
-                section_name = section.name
-        
-        # Process ALL questions and merge with user answers
-        answers_list = []
-        correct_count = 0
-        overall_question_number = 1
-        
-        for question, question_group, section in all_questions:
-            # Get user's answer for this question (if exists)
-            user_answer = user_answers.get(question.id)
-            
-            # Determine correctness
-            is_correct = False
-            if user_answer:
-                is_correct = user_answer.is_correct if user_answer.is_correct is not None else False
-                if is_correct:
-                    correct_count += 1
-            
-            # Get correct answer - convert to letter if it's a multiple choice question
-            correct_answer = question.correct_answer or "N/A"
-            
-            # If question has options (multiple choice), find the letter key for correct answer
-            if question.options:
-                try:
-                    options = json.loads(question.options) if isinstance(question.options, str) else question.options
-                    
-                    # Options can be:
-                    # 1. List of objects: [{"answer_content": "...", "is_correct": true/false}, ...]
-                    # 2. Dict: {"A": "...", "B": "..."}
-                    
-                    if isinstance(options, list) and len(options) > 0:
-                        # Find the index of the correct answer (where is_correct=true)
-                        for idx, option in enumerate(options):
-                            if isinstance(option, dict) and option.get('is_correct'):
-                                # Convert index to letter: 0→A, 1→B, 2→C, 3→D
-                                correct_answer = chr(65 + idx)  # 65 is ASCII for 'A'
-                                print(f"✅ Q{question.id}: Found correct answer at index {idx} → {correct_answer}")
-                                break
-                    
-                    elif isinstance(options, dict):
-                        # Dict format - find key that matches correct_answer value
-                        correct_answer_normalized = str(question.correct_answer).strip().lower()
-                        for key, value in options.items():
-                            value_normalized = str(value).strip().lower()
-                            if value_normalized == correct_answer_normalized:
-                                correct_answer = key
-                                print(f"✅ Q{question.id}: Found match - key={key}")
-                                break
-                        
-                except (json.JSONDecodeError, TypeError, AttributeError) as e:
-                    logger.warning(f"Failed to parse options for question {question.id}: {e}")
-                    pass  # Keep the original correct_answer if parsing fails
-            
-            # Get part name from section
-            part_name = section.name if section else "Part 1"
-            
-            # Parse metadata from question.options (contains answers array with feedback, locate, etc.)
-            metadata = {}
-            if question.options:
-                try:
-                    options_data = json.loads(question.options) if isinstance(question.options, str) else question.options
-                    
-                    # If options is a list (answers array with feedback), include it in metadata
-                    if isinstance(options_data, list):
-                        metadata["answers"] = options_data
-                    # If options is a dict, it may contain answers, locate, and/or metadata
-                    elif isinstance(options_data, dict):
-                        # Check for answers array
-                        if "answers" in options_data:
-                            metadata["answers"] = options_data["answers"]
-                        # Check for locate field at the same level as answers
-                        if "locate" in options_data:
-                            metadata["locate"] = options_data["locate"]
-                        # Merge any metadata field
-                        if "metadata" in options_data:
-                            metadata.update(options_data["metadata"])
-                        # Handle old structure where options contains the answers directly
-                        if "options" in options_data:
-                            metadata["answers"] = options_data["options"]
-                except (json.JSONDecodeError, TypeError) as e:
-                    logger.warning(f"Failed to parse question.options for question {question.id}: {e}")
-            
-            # Add question explanation if available
-            if question.explanation:
-                metadata["explanation"] = question.explanation
-            
-            # Try to extract locate from the answers array if not already in metadata
-            # (for old format where locate might be in individual answer objects)
-            if "locate" not in metadata and "answers" in metadata:
-                for answer_item in metadata["answers"]:
-                    if isinstance(answer_item, dict) and "locate" in answer_item:
-                        metadata["locate"] = answer_item.get("locate")
-                        break
-            
-            answers_list.append({
-                "question_id": question.id,
-                "question_number": overall_question_number,
-                "part": part_name,
-                "question_content": question.question_text or question.content or "",  # Add question content
-                "user_answer": user_answer.answer_text if user_answer and user_answer.answer_text else "",
-                "answer_audio": user_answer.answer_audio if user_answer and user_answer.answer_audio else None,  # Add audio URL
-                "correct_answer": correct_answer,
-                "is_correct": is_correct,
-                "score": user_answer.score if user_answer else None,
-                "ai_feedback": json.loads(user_answer.ai_feedback) if (user_answer and user_answer.ai_feedback) else None,
-                "has_ai_grading": bool(user_answer and user_answer.ai_feedback),  # Flag để frontend biết đã có AI grading
-                "metadata": metadata if metadata else None  # Include metadata with explanations and locate
-            })
-            overall_question_number += 1
-        
-        # Count questions
-        total_questions = len(answers_list)
-        answered_questions = sum(1 for ans in answers_list if (ans["user_answer"] or ans.get("answer_audio")))
-        
-        response_data = {
-            "id": submission.id,
-            "user_id": submission.user_id,
-            "exam_skill_id": submission.exam_skill_id,
-            "exam_section_id": submission.exam_section_id,
-            "status": submission.status,
-            "started_at": submission.started_at.isoformat() if submission.started_at else None,
-            "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
-            "time_spent": submission.time_spent or 0,
-            "total_score": submission.total_score,
-            "max_score": submission.max_score,
-            "created_at": submission.created_at.isoformat() if submission.created_at else None,
-            "updated_at": submission.updated_at.isoformat() if submission.updated_at else None,
-            "skill": {
-                "name": skill.name if skill else None,
-                "skill_type": skill.skill_type.value if skill else None
-            },
-            "exam": None,  # TODO: Add exam info if needed
-            "section_name": section_name,
-            "total_questions": total_questions,
-            "answered_questions": answered_questions,
-            "correct_answers": correct_count,
-            "teacher_score": getattr(submission, 'teacher_score', None),
-            "teacher_feedback": getattr(submission, 'teacher_feedback', None),
-            "answers": answers_list
-        }
-        
-        return {"success": True, "data": response_data}
+        return FastJSONResponse({"success": True, "data": response_data})
         
     except HTTPException:
         raise
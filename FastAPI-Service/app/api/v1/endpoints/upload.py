@@ -4,8 +4,7 @@ import os
 import uuid
 from datetime import datetime
 from pathlib import Path
-from app.auth import get_current_user
-from app.models.auth_models import User
+from app.auth import get_current_user, Principal
 
 router = APIRouter()
 
@@ -27,7 +26,7 @@ MAX_AUDIO_SIZE = 50 * 1024 * 1024  # 50MB
 @router.post("/image")
 async def upload_image(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Upload an image file"""
     
@@ -71,7 +70,7 @@ async def upload_image(
 @router.post("/audio")
 async def upload_audio(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Upload an audio file"""
     
@@ -115,7 +114,7 @@ async def upload_audio(
 @router.delete("/image")
 async def delete_image(
     filename: str,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete an uploaded image"""
     
@@ -133,7 +132,7 @@ async def delete_image(
 @router.delete("/audio")
 async def delete_audio(
     filename: str,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete an uploaded audio"""
     
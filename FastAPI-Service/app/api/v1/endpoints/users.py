@@ -7,7 +7,8 @@ from datetime import datetime
 
 from app.models.auth_models import User, Role
 from app.database import get_db
-from app.auth import get_current_user
+from app.auth import get_current_user, Principal
+from app.services.principal_cache import principal_cache
 
 router = APIRouter()
 
@@ -31,7 +32,7 @@ async def list_users(
     limit: int = 20,
     is_active: Optional[bool] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """List all users (Requires authentication)"""
     if limit > 100:
@@ -54,7 +55,7 @@ async def list_users(
 async def get_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get user by ID"""
     result = await db.execute(
@@ -76,7 +77,7 @@ async def get_user(
 @router.get("/stats/summary")
 async def get_user_stats(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get user statistics"""
     # Total users
@@ -113,7 +114,7 @@ async def update_user(
     user_id: int,
     user_data: UserUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update user information"""
     # Get user
@@ -157,6 +158,7 @@ async def update_user(
     
     await db.commit()
     await db.refresh(user)
+    await principal_cache.invalidate(user.id)
     
     return user
 
@@ -165,7 +167,7 @@ async def update_user(
 async def delete_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Soft delete user"""
     # Get user
@@ -192,5 +194,6 @@ async def delete_user(
     # Soft delete
     user.deleted_at = datetime.utcnow()
     await db.commit()
+    await principal_cache.invalidate(user.id)
     
     return {"message": "User deleted successfully"}
@@ -3,10 +3,10 @@ from typing import Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
-from app.models.auth_models import User
-from app.database import AsyncSessionLocal
-from sqlalchemy import select
+from app.database import get_db
+from app.services.principal_cache import Principal, principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
@@ -29,8 +29,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    """Get current user from JWT token"""
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Get current user from JWT token
+
+    Returns a cached read-only snapshot (see principal_cache); endpoints that
+    modify the user load the row from their own session.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -45,12 +53,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     except JWTError:
         raise credentials_exception
     
-    # Fetch user from SQLAlchemy DB
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(select(User).where(User.id == int(user_id)))
-        user = result.scalar_one_or_none()
+    # Cached snapshot; on a miss it is loaded with the request's own session
+    user = await principal_cache.get(db, int(user_id))
 
-    if user is None or getattr(user, "deleted_at", None) is not None:
+    if user is None or user.deleted_at is not None:
         raise credentials_exception
 
     if not user.is_active:
@@ -63,15 +69,18 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-async def get_optional_user(token: Optional[str] = Depends(OAuth2PasswordBearer(tokenUrl="api/v1/auth/login", auto_error=False))) -> Optional[User]:
+async def get_optional_user(
+    token: Optional[str] = Depends(OAuth2PasswordBearer(tokenUrl="api/v1/auth/login", auto_error=False)),
+    db: AsyncSession = Depends(get_db)
+) -> Optional[Principal]:
     """Get current user from JWT token (optional - returns None if no token)"""
     if not token:
         return None
@@ -84,12 +93,10 @@ async def get_optional_user(token: Optional[str] = Depends(OAuth2PasswordBearer(
     except JWTError:
         return None
     
-    # Fetch user from SQLAlchemy DB
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(select(User).where(User.id == int(user_id)))
-        user = result.scalar_one_or_none()
+    # Cached snapshot; on a miss it is loaded with the request's own session
+    user = await principal_cache.get(db, int(user_id))
 
-    if user is None or getattr(user, "deleted_at", None) is not None:
+    if user is None or user.deleted_at is not None:
         return None
 
     if not user.is_active:
@@ -103,10 +110,9 @@ async def get_optional_user(token: Optional[str] = Depends(OAuth2PasswordBearer(
 
 def require_role(role_name: str):
     """Dependency to require specific role"""
-    async def role_checker(current_user: User = Depends(get_current_user)):
-        # current_user.role is relationship loaded lazily; compare by name
-        role = getattr(current_user, "role", None)
-        if not role or role.name != role_name:
+    async def role_checker(current_user: Principal = Depends(get_current_user)):
+        # Role name is part of the snapshot, no lazy load needed
+        if current_user.role_name != role_name:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Role required: {role_name}"
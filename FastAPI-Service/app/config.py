@@ -29,15 +29,83 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-3.5-turbo"  # More stable and supports 16k tokens
     OPENAI_MAX_TOKENS: int = 4096  # Safe default for most models
     OPENAI_TEMPERATURE: float = 0.7
+    OPENAI_MAX_CONCURRENCY: int = 8  # Concurrent OpenAI calls per worker
+    OPENAI_REQUESTS_PER_MINUTE: int = 500  # Initial RPM budget, adapted from x-ratelimit-* headers
+    OPENAI_TOKENS_PER_MINUTE: int = 60000  # Initial TPM budget, adapted from x-ratelimit-* headers
+    OPENAI_RATE_LIMIT_SAFETY_FACTOR: float = 0.9  # Use this share of the limits reported by OpenAI
+
+    # Chunked (parallel) question generation for large Reading/Listening sets
+    GENERATION_CHUNK_THRESHOLD: int = 15  # Auto-enable chunked mode from this many questions
+    GENERATION_CHUNK_SIZE: int = 10  # Max questions per sub-request
+    GENERATION_FANOUT_CONCURRENCY: int = 4  # Parallel sub-requests per generation
+    GENERATION_CHUNK_RETRIES: int = 2  # Retries of a failed sub-request before the generation fails
+
+    # Text-to-speech for Listening parts
+    TTS_CONCURRENCY: int = 4  # Parts synthesized in parallel per test
+    TTS_SINGLEFLIGHT_ENABLED: bool = True  # Share one synthesis between identical concurrent requests
+    TTS_SINGLEFLIGHT_LOCK_TTL_SECONDS: float = 120.0  # Max time other workers wait on the lock holder
+    TTS_SINGLEFLIGHT_POLL_INTERVAL_SECONDS: float = 0.5
+    TTS_SINGLEFLIGHT_RESULT_TTL_SECONDS: int = 60  # Lifetime of the cross-worker result handoff
+
+    # Whisper transcription for Speaking answers
+    TRANSCRIBE_SEGMENT_SECONDS: int = 60  # Target segment length when splitting long recordings
+    TRANSCRIBE_CONCURRENCY: int = 4  # Segments transcribed in parallel per recording
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = 30 * 86400
+
+    # Compiled answer keys (scoring + submission review)
+    ANSWER_KEY_CACHE_MAX_ENTRIES: int = 256  # Skills kept per worker
+    ANSWER_KEY_CACHE_TTL_SECONDS: int = 86400
+
+    # Serialized GET /skills/{id} responses
+    SKILL_SNAPSHOT_CACHE_MAX_ENTRIES: int = 128  # Snapshots kept per worker
+    SKILL_SNAPSHOT_CACHE_TTL_SECONDS: int = 86400
+
+    # Assembled reviews of graded submissions
+    SUBMISSION_REVIEW_CACHE_MAX_ENTRIES: int = 256
+    SUBMISSION_REVIEW_CACHE_TTL_SECONDS: int = 3600
+
+    # Admin submission listing
+    ADMIN_SUBMISSION_COUNT_CACHE_MAX_ENTRIES: int = 256
+    ADMIN_SUBMISSION_COUNT_CACHE_TTL_SECONDS: int = 60  # Totals may lag new submissions by this much
+
+    # HTTP caching of exam content (ETag = content version)
+    EXAM_CONTENT_IMMUTABLE_MAX_AGE_SECONDS: int = 31536000  # Responses requested with ?v=<current version>
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # LLM response cache (in-process LRU + Redis)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 86400  # Default TTL when a call site doesn't set one
+    LLM_CACHE_MAX_ENTRIES: int = 512  # In-process LRU size per worker
+
+    # Single-flight coalescing of identical concurrent LLM requests
+    LLM_SINGLEFLIGHT_ENABLED: bool = True
+    LLM_SINGLEFLIGHT_LOCK_TTL_SECONDS: float = 120.0  # Max time other workers wait on the lock holder
+    LLM_SINGLEFLIGHT_POLL_INTERVAL_SECONDS: float = 0.5
+    LLM_SINGLEFLIGHT_RESULT_TTL_SECONDS: int = 60  # Lifetime of the cross-worker result handoff
+
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Authenticated-user snapshots (get_current_user)
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60  # Upper bound for other workers to see a deactivation / role change
+
+    # Password hashing (bcrypt, off the event loop)
+    BCRYPT_ROUNDS: int = 12  # Changing it rehashes passwords on the next login
+    PASSWORD_HASH_WORKERS: int = 0  # 0 = CPU count
+    LOGIN_MAX_CONCURRENCY: int = 16  # Logins verified at once per worker
+    LOGIN_QUEUE_TIMEOUT_SECONDS: float = 10.0  # Wait for a slot before answering 503
+
+    # OTP codes (services/otp_store.py)
+    OTP_TTL_SECONDS: int = 300
+    OTP_MAX_ATTEMPTS: int = 5  # Wrong codes before the code is discarded
+    OTP_SEND_LIMIT: int = 5  # Codes sent per destination per window
+    OTP_SEND_WINDOW_SECONDS: int = 3600
+
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
 
@@ -49,6 +117,16 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
 
+    # Background grading jobs
+    GRADING_JOB_MAX_RETRIES: int = 3  # Retries before a job is moved to DEAD_LETTER
+    GRADING_JOB_RETRY_BACKOFF_SECONDS: float = 10.0  # Doubled after each failed attempt
+    GRADING_JOB_EVENTS_POLL_SECONDS: float = 1.0  # Status polling interval for the SSE endpoint
+    GRADING_JOB_EVENTS_TIMEOUT_SECONDS: int = 300  # Close idle SSE streams after this long
+
+    # /grading/grade-batch
+    GRADING_BATCH_CONCURRENCY: int = 4  # Answers graded in parallel per batch
+    GRADING_BATCH_DEADLINE_SECONDS: float = 90.0  # Return partial results after this long
+
     # Logging
     LOG_LEVEL: str = "INFO"
 
@@ -61,6 +139,21 @@ class Settings(BaseSettings):
     MAIL_ENCRYPTION: str = "tls"
     MAIL_FROM_ADDRESS: str = ""
     MAIL_FROM_NAME: str = "Owl"
+    EMAIL_SMTP_POOL_SIZE: int = 2  # Persistent SMTP connections (= delivery workers) per app worker
+    EMAIL_SMTP_TIMEOUT_SECONDS: float = 15.0
+    EMAIL_SMTP_IDLE_SECONDS: float = 60.0  # Check idle connections with NOOP before reuse
+    EMAIL_MAX_RETRIES: int = 5  # Retries before a message is dropped
+    EMAIL_RETRY_BACKOFF_SECONDS: float = 5.0  # Doubled after each failed attempt
+
+    # Outbound HTTP (PayOS, Google OAuth; services/http_client.py)
+    HTTP_CLIENT_HTTP2: bool = True  # Needs the h2 package (httpx[http2])
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    HTTP_READ_TIMEOUT_SECONDS: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures before calls fail fast
+    HTTP_BREAKER_RESET_SECONDS: float = 30.0  # Fail fast this long, then try one call
 
     # OAuth Google Configuration
     GOOGLE_CLIENT_ID: str = ""
@@ -7,7 +7,12 @@ from loguru import logger
 import sys
 
 from app.config import settings
+from app.responses import FastJSONResponse
 from app.database import connect_to_db, close_db_connection
+from app.services.email_service import email_service
+from app.services.http_client import open_http_client, close_http_client
+from app.services.password_hasher import password_hasher
+from app.services.redis_client import close_redis
 from app.api.v1 import api_router
 
 
@@ -27,12 +32,18 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up OwlEnglish Service...")
     await connect_to_db()
     logger.info("Connected to MySQL database")
+    email_service.start()
+    open_http_client()
     
     yield
     
     # Shutdown
     logger.info("Shutting down OwlEnglish Service...")
+    await email_service.stop()
     await close_db_connection()
+    await close_redis()
+    await close_http_client()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -40,6 +51,7 @@ app = FastAPI(
     description="Complete backend replacement for Laravel - Exam generation and grading with AI",
     version=settings.API_VERSION,
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS - MUST be added FIRST before other middlewares
@@ -5,11 +5,13 @@ from app.models.exam_models import (
     ExamSubmission, UserExamAnswer
 )
 from app.models.payment_models import UserWallet, Payment, PaymentStatus
+from app.models.grading_models import GradingJob, GradingJobStatus
 
 __all__ = [
     'Base',
     'User', 'Role', 'UserIdentity', 'UserContact', 'OtpCode', 'LoginActivity',
     'Exam', 'ExamTest', 'ExamSkill', 'ExamSection', 'ExamQuestionGroup', 'ExamQuestion',
     'ExamSubmission', 'UserExamAnswer',
-    'UserWallet', 'Payment', 'PaymentStatus'
+    'UserWallet', 'Payment', 'PaymentStatus',
+    'GradingJob', 'GradingJobStatus'
 ]
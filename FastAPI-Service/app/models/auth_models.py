@@ -8,9 +8,17 @@ from datetime import datetime
 from passlib.context import CryptContext
 import enum
 
+from app.config import settings
 from app.database import Base
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with another cost factor are flagged for rehash (verify_and_update)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 
 class ProviderEnum(str, enum.Enum):
@@ -48,7 +56,7 @@ class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    name = Column(String(255), nullable=True)
+    name = Column(String(255), nullable=True, index=True)  # Admin search by name prefix
     email = Column(String(255), unique=True, nullable=False, index=True)
     password = Column(String(255), nullable=True)  # Nullable for OAuth users
     phone = Column(String(50), nullable=True)
@@ -73,14 +81,14 @@ class User(Base):
     # permissions system removed - keep roles only
 
     def verify_password(self, plain_password: str) -> bool:
-        """Verify password"""
+        """Verify password (blocking - request handlers use password_hasher.verify)"""
         if not self.password:
             return False
         return pwd_context.verify(plain_password, self.password)
 
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash password"""
+        """Hash password (blocking - request handlers use password_hasher.hash)"""
         return pwd_context.hash(password)
 
     def __repr__(self):
@@ -2,7 +2,7 @@
 SQLAlchemy models for Exam system
 Maps to Laravel database structure
 """
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -27,6 +27,10 @@ class SkillType(str, enum.Enum):
 class Exam(Base):
     """Exams table - Bộ đề thi (IELTS, TOEIC, Online)"""
     __tablename__ = "exams"
+    __table_args__ = (
+        # Full-text search (services/content_search.py)
+        Index("ft_exams_name", "name", mysql_prefix="FULLTEXT"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(255), nullable=False)  # IELTS Academic, TOEIC Practice
@@ -34,6 +38,7 @@ class Exam(Base):
     description = Column(Text, nullable=True)
     image = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
+    content_version = Column(Integer, default=1, server_default="1", nullable=False)  # Tăng mỗi khi nội dung đề (tests / skills) thay đổi
     deleted_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -48,6 +53,10 @@ class Exam(Base):
 class ExamTest(Base):
     """Exam Tests table - Đề thi trong bộ (Test 1, Test 2, Mock Test)"""
     __tablename__ = "exam_tests"
+    __table_args__ = (
+        # Full-text search (services/content_search.py)
+        Index("ft_exam_tests_name", "name", mysql_prefix="FULLTEXT"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), nullable=False)
@@ -70,6 +79,10 @@ class ExamTest(Base):
 class ExamSkill(Base):
     """Exam Skills table - Kỹ năng trong đề thi (Reading, Writing, Speaking, Listening)"""
     __tablename__ = "exam_skills"
+    __table_args__ = (
+        # Full-text search (services/content_search.py)
+        Index("ft_exam_skills_name", "name", mysql_prefix="FULLTEXT"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     exam_test_id = Column(Integer, ForeignKey("exam_tests.id", ondelete="CASCADE"), nullable=False)
@@ -80,6 +93,7 @@ class ExamSkill(Base):
     image = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     is_online = Column(Boolean, default=True, nullable=False)
+    content_version = Column(Integer, default=1, server_default="1", nullable=False)  # Tăng mỗi khi sections / groups / questions thay đổi (ETag, cache)
     deleted_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -95,6 +109,10 @@ class ExamSkill(Base):
 class ExamSection(Base):
     """Exam Sections table - Phần trong kỹ năng (Section 1, Section 2)"""
     __tablename__ = "exam_sections"
+    __table_args__ = (
+        # Full-text search (services/content_search.py)
+        Index("ft_exam_sections_name_content", "name", "content", mysql_prefix="FULLTEXT"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     exam_skill_id = Column(Integer, ForeignKey("exam_skills.id", ondelete="CASCADE"), nullable=False)
@@ -118,6 +136,10 @@ class ExamSection(Base):
 class ExamQuestionGroup(Base):
     """Exam Question Groups table - Nhóm câu hỏi"""
     __tablename__ = "exam_question_groups"
+    __table_args__ = (
+        # Full-text search (services/content_search.py)
+        Index("ft_exam_question_groups_name_content", "name", "content", mysql_prefix="FULLTEXT"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     exam_section_id = Column(Integer, ForeignKey("exam_sections.id", ondelete="CASCADE"), nullable=False)
@@ -139,6 +161,10 @@ class ExamQuestionGroup(Base):
 class ExamQuestion(Base):
     """Exam Questions table - Câu hỏi"""
     __tablename__ = "exam_questions"
+    __table_args__ = (
+        # Full-text search (services/content_search.py)
+        Index("ft_exam_questions_question_text", "question_text", mysql_prefix="FULLTEXT"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     question_group_id = Column(Integer, ForeignKey("exam_question_groups.id", ondelete="CASCADE"), nullable=False)
@@ -170,11 +196,20 @@ class SubmissionStatus(str, enum.Enum):
 class ExamSubmission(Base):
     """Exam Submissions table - Bài nộp của học sinh"""
     __tablename__ = "exam_submissions"
+    __table_args__ = (
+        # Lịch sử làm bài của user, mới nhất trước (keyset pagination)
+        Index("ix_exam_submissions_user_id_created_at", "user_id", "created_at"),
+        # Admin listing: skill_type / user_id filters, newest first
+        Index("ix_exam_submissions_skill_type_user_id_created_at", "skill_type", "user_id", "created_at"),
+        Index("ix_exam_submissions_skill_type_created_at", "skill_type", "created_at"),
+        Index("ix_exam_submissions_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     exam_skill_id = Column(Integer, ForeignKey("exam_skills.id", ondelete="CASCADE"), nullable=False)
     exam_section_id = Column(Integer, ForeignKey("exam_sections.id", ondelete="CASCADE"), nullable=True)
+    skill_type = Column(SQLEnum(SkillType), nullable=True)  # Copy of exam_skill.skill_type (admin filters)
     status = Column(String(50), default=SubmissionStatus.IN_PROGRESS, nullable=False)
     started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     submitted_at = Column(DateTime, nullable=True)
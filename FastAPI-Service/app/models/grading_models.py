@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, JSON, Text, Index
+from datetime import datetime
+import enum
+
+from app.database import Base
+
+
+class GradingJobStatus(str, enum.Enum):
+    """Grading job status"""
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    RETRYING = "RETRYING"
+    SUCCEEDED = "SUCCEEDED"
+    DEAD_LETTER = "DEAD_LETTER"  # Hết số lần retry, cần xử lý thủ công
+
+
+class GradingJob(Base):
+    """Grading Jobs table - Hàng đợi chấm bài Writing/Speaking bằng AI"""
+    __tablename__ = "grading_jobs"
+    __table_args__ = (
+        Index("ix_grading_jobs_user_id_created_at", "user_id", "created_at"),
+    )
+
+    id = Column(String(36), primary_key=True)  # UUID, trả về cho client để poll
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    skill_type = Column(String(20), nullable=False)  # 'writing' or 'speaking'
+    question_id = Column(Integer, nullable=True)
+    status = Column(SQLEnum(GradingJobStatus), default=GradingJobStatus.QUEUED, nullable=False, index=True)
+    payload = Column(JSON, nullable=False)  # Đề bài, bài làm / transcript, exam_type, criteria
+    result = Column(JSON, nullable=True)  # Kết quả chấm (cùng format với GradingResponse)
+    error = Column(Text, nullable=True)  # Lỗi lần chạy gần nhất
+    attempts = Column(Integer, default=0, nullable=False)
+    cost = Column(Integer, default=0, nullable=False)  # Số Trứng Cú đã trừ
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<GradingJob {self.id}: {self.skill_type} - {self.status}>"
@@ -0,0 +1,48 @@
+"""
+Fast JSON responses (orjson)
+
+`FastJSONResponse` is the app-wide default response class. Its output matches
+FastAPI's JSONResponse for everything the API returns:
+
+- datetime / date / time -> ISO 8601 (same as `.isoformat()`)
+- Enum -> value, UUID -> str
+- Decimal -> int if integral, else float (same as jsonable_encoder)
+- non-str dict keys -> str, sets -> lists, Pydantic models -> their JSON dump
+
+Routes that build large payloads (submission detail, skill trees, admin lists)
+can return `FastJSONResponse(content)` themselves. FastAPI then skips
+jsonable_encoder and response_model validation, and orjson serializes the dicts
+directly in one pass.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes"""
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
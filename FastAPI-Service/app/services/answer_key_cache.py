@@ -0,0 +1,145 @@
+"""
+Compiled answer keys per ExamSkill
+
+One compiled key holds every question of a skill (ordered by section, question)
+with its normalized accepted answers, display answer / option letter, points
+and review metadata, so scoring and the submission review pages become
+dictionary lookups instead of per-question queries and JSON parsing.
+
+Two tiers:
+- In-process LRU of compiled objects (no JSON decoding on hits)
+- Redis blob shared by all workers
+
+Entries are keyed by the skill's content version (see exam_content); workers
+compare their local entry's version on every lookup (one small GET), so an
+edit in one worker is seen by all of them.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.exam_models import ExamQuestion, ExamQuestionGroup, ExamSection
+from app.services.exam_content import SKILL, get_content_version
+from app.services.redis_client import get_redis, mark_redis_failed
+from app.services.scoring import compile_question
+
+# Bump when compile_question changes what a key contains
+BLOB_PREFIX = "answer_key:v2:blob:"
+
+
+def _dump(key: Dict[str, Any]) -> bytes:
+    return json.dumps(
+        {
+            "question_ids": key["question_ids"],
+            "questions": {
+                str(qid): {**entry, "accepted": sorted(entry["accepted"])}
+                for qid, entry in key["questions"].items()
+            },
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def _load(raw: bytes) -> Dict[str, Any]:
+    data = json.loads(raw)
+    return {
+        "question_ids": data["question_ids"],
+        "questions": {
+            int(qid): {**entry, "accepted": frozenset(entry["accepted"])}
+            for qid, entry in data["questions"].items()
+        },
+    }
+
+
+async def compile_answer_key(db: AsyncSession, skill_id: int) -> Dict[str, Any]:
+    """Build the answer key for a skill from the database (one query)"""
+    result = await db.execute(
+        select(ExamQuestion, ExamSection.id, ExamSection.name)
+        .join(ExamQuestionGroup, ExamQuestion.question_group_id == ExamQuestionGroup.id)
+        .join(ExamSection, ExamQuestionGroup.exam_section_id == ExamSection.id)
+        .where(
+            ExamSection.exam_skill_id == skill_id,
+            ExamQuestion.deleted_at.is_(None),
+            ExamQuestionGroup.deleted_at.is_(None),
+            ExamSection.deleted_at.is_(None)
+        )
+        .order_by(ExamSection.id, ExamQuestion.id)
+    )
+    question_ids = []
+    questions = {}
+    for question, section_id, section_name in result:
+        question_ids.append(question.id)
+        questions[question.id] = compile_question(question, section_id, section_name)
+    return {"question_ids": question_ids, "questions": questions}
+
+
+class AnswerKeyCache:
+    """Versioned two-tier cache of compiled answer keys"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local: "OrderedDict[int, Tuple[int, float, Dict[str, Any]]]" = OrderedDict()
+        self.stats: Dict[str, int] = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "compiles": 0,
+        }
+
+    async def get(self, db: AsyncSession, skill_id: int) -> Dict[str, Any]:
+        """Compiled answer key for a skill"""
+        version = await get_content_version(SKILL, skill_id, db)
+        if version is None:
+            # Skill no longer exists (e.g. reviewing an old submission): nothing to cache
+            self.stats["compiles"] += 1
+            return await compile_answer_key(db, skill_id)
+
+        entry = self._local.get(skill_id)
+        if entry is not None and entry[0] == version and entry[1] > time.monotonic():
+            self._local.move_to_end(skill_id)
+            self.stats["local_hits"] += 1
+            return entry[2]
+
+        blob_key = f"{BLOB_PREFIX}{skill_id}:{version}"
+        key = None
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(blob_key)
+                if raw is not None:
+                    key = _load(raw)
+                    self.stats["redis_hits"] += 1
+            except Exception as e:
+                mark_redis_failed(e)
+                redis = None
+
+        if key is None:
+            key = await compile_answer_key(db, skill_id)
+            self.stats["compiles"] += 1
+            if redis is not None:
+                try:
+                    await redis.set(blob_key, _dump(key), ex=self.ttl)
+                except Exception as e:
+                    mark_redis_failed(e)
+
+        self._local[skill_id] = (version, time.monotonic() + self.ttl, key)
+        self._local.move_to_end(skill_id)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+        return key
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        return {**self.stats, "local_entries": len(self._local)}
+
+
+# Singleton instance
+answer_key_cache = AnswerKeyCache(
+    max_entries=settings.ANSWER_KEY_CACHE_MAX_ENTRIES,
+    ttl=settings.ANSWER_KEY_CACHE_TTL_SECONDS,
+)
@@ -1,30 +1,72 @@
-from openai import AsyncOpenAI
-from typing import List, Dict, Any, Optional
+import asyncio
+import hashlib
+import os
+import random
+import re
+import uuid
+
+import aiofiles
+
+from openai import AsyncOpenAI, RateLimitError
+from typing import List, Dict, Any, Optional, AsyncIterator
 from loguru import logger
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, stop_after_attempt, wait_random_exponential
 
 from app.config import settings
 from app.services.prompts import prompt_loader
+from app.services.llm_cache import llm_cache, make_request_fingerprint
+from app.services.singleflight import SingleFlight, llm_singleflight
+from app.services.rate_governor import rate_governor, RequestPriority
+from app.services.json_stream import IncrementalJSONParser
+from app.services.transcription import transcription_service
+
+# Per-call-site cache lifetimes (seconds)
+GENERATION_CACHE_TTL = 3600  # Regenerating the same topic within an hour reuses the result
+GRADING_CACHE_TTL = 7 * 86400  # Same essay/transcript + prompt -> same band scores
+FEEDBACK_CACHE_TTL = 30 * 86400  # MCQ feedback is effectively static
+
+# Coalesces identical concurrent TTS syntheses (result = file name)
+tts_singleflight = SingleFlight(
+    lock_ttl=settings.TTS_SINGLEFLIGHT_LOCK_TTL_SECONDS,
+    poll_interval=settings.TTS_SINGLEFLIGHT_POLL_INTERVAL_SECONDS,
+    result_ttl=settings.TTS_SINGLEFLIGHT_RESULT_TTL_SECONDS,
+    namespace="tts",
+)
+
+_backoff_with_jitter = wait_random_exponential(multiplier=1, min=2, max=10)
+
+
+def _completion_retry_wait(retry_state) -> float:
+    """
+    Tenacity wait strategy for chat completions
+
+    On 429 the rate governor already pauses every caller until the limit
+    resets, so only add a little jitter; other errors back off with jitter
+    to avoid synchronized retry storms.
+    """
+    if isinstance(retry_state.outcome.exception(), RateLimitError):
+        return random.uniform(0, 1)
+    return _backoff_with_jitter(retry_state)
 
 
 class ChatGPTService:
     """Service để tích hợp với ChatGPT API"""
 
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        # Retries are handled by tenacity + rate governor, not by the SDK
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
         self.model = settings.OPENAI_MODEL
         self.max_tokens = settings.OPENAI_MAX_TOKENS
         self.temperature = settings.OPENAI_TEMPERATURE
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-    )
     async def generate_completion(
         self,
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        cache_ttl: Optional[int] = None,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
     ) -> str:
         """
         Generate completion from ChatGPT
@@ -33,18 +75,68 @@ class ChatGPTService:
             messages: List of message dicts with 'role' and 'content'
             temperature: Override default temperature
             max_tokens: Override default max_tokens
+            use_cache: Set False to always call the API (e.g. "regenerate" actions);
+                also skips coalescing with identical in-flight requests
+            cache_ttl: Cache lifetime in seconds for this call site (default: LLM_CACHE_TTL_SECONDS)
+            priority: Queue priority when the OpenAI concurrency/rate limits are saturated
             
         Returns:
             Generated text response
         """
+        temperature = temperature or self.temperature
+        max_tokens = max_tokens or self.max_tokens
+        
+        if not use_cache:
+            return await self._request_completion(messages, temperature, max_tokens, priority)
+        
+        fingerprint = make_request_fingerprint(self.model, messages, temperature, max_tokens)
+        
+        if settings.LLM_CACHE_ENABLED:
+            cached = await llm_cache.get(fingerprint)
+            if cached is not None:
+                logger.info(f"LLM cache hit ({fingerprint[:12]})")
+                return cached
+        
+        async def fetch() -> str:
+            content = await self._request_completion(messages, temperature, max_tokens, priority)
+            if content and settings.LLM_CACHE_ENABLED:
+                await llm_cache.set(fingerprint, content, ttl=cache_ttl)
+            return content
+        
+        if settings.LLM_SINGLEFLIGHT_ENABLED:
+            # Identical concurrent requests (this worker or others) share one API call
+            return await llm_singleflight.do(fingerprint, fetch)
+        return await fetch()
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_completion_retry_wait,
+    )
+    async def _request_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+    ) -> str:
+        """Call the Chat Completions API (no caching, paced by the rate governor, retried by tenacity)"""
+        # Rough estimate (~4 chars/token) + completion budget, as counted by OpenAI's TPM limit
+        estimated_tokens = sum(len(m.get("content") or "") for m in messages) // 4 + max_tokens
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature or self.temperature,
-                max_tokens=max_tokens or self.max_tokens,
-            )
+            async with rate_governor.slot(priority, tokens=estimated_tokens):
+                raw = await self.client.chat.completions.with_raw_response.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+            await rate_governor.observe_headers(raw.headers)
+            response = raw.parse()
             return response.choices[0].message.content
+        except RateLimitError as e:
+            logger.warning(f"ChatGPT rate limited: {str(e)}")
+            await rate_governor.on_rate_limited(e.response.headers if e.response is not None else None)
+            raise
         except Exception as e:
             error_str = str(e)
             logger.error(f"ChatGPT API error: {error_str}")
@@ -55,14 +147,81 @@ class ChatGPTService:
                 logger.error(f"Body: {e.body}")
             # Log request details for debugging
             logger.error(f"Model: {self.model}")
-            logger.error(f"Max tokens: {max_tokens or self.max_tokens}")
-            logger.error(f"Temperature: {temperature or self.temperature}")
+            logger.error(f"Max tokens: {max_tokens}")
+            logger.error(f"Temperature: {temperature}")
             logger.error(f"Messages count: {len(messages)}")
             if messages:
                 logger.error(f"First message role: {messages[0].get('role')}")
                 logger.error(f"User prompt length: {len(messages[-1].get('content', ''))}")
             raise
 
+    async def stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        cache_ttl: Optional[int] = None,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion from ChatGPT as text deltas (stream=True)
+        
+        A cache hit yields the whole cached text at once; a fully streamed
+        response is stored in the same cache as generate_completion. Streams
+        are not retried (partial output has already been delivered).
+        
+        Args:
+            Same as generate_completion
+            
+        Yields:
+            Text deltas in arrival order
+        """
+        temperature = temperature or self.temperature
+        max_tokens = max_tokens or self.max_tokens
+        
+        fingerprint = None
+        if use_cache and settings.LLM_CACHE_ENABLED:
+            fingerprint = make_request_fingerprint(self.model, messages, temperature, max_tokens)
+            cached = await llm_cache.get(fingerprint)
+            if cached is not None:
+                logger.info(f"LLM cache hit ({fingerprint[:12]}), replaying stream")
+                yield cached
+                return
+        
+        estimated_tokens = sum(len(m.get("content") or "") for m in messages) // 4 + max_tokens
+        parts: List[str] = []
+        finish_reason = None
+        try:
+            async with rate_governor.slot(priority, tokens=estimated_tokens):
+                raw = await self.client.chat.completions.with_raw_response.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                )
+                await rate_governor.observe_headers(raw.headers)
+                stream = raw.parse()
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    finish_reason = choice.finish_reason or finish_reason
+                    delta = choice.delta.content if choice.delta else None
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+        except RateLimitError as e:
+            logger.warning(f"ChatGPT rate limited: {str(e)}")
+            await rate_governor.on_rate_limited(e.response.headers if e.response is not None else None)
+            raise
+        
+        if finish_reason == "length":
+            logger.warning(f"Streamed completion truncated at max_tokens={max_tokens}")
+        elif fingerprint and parts:
+            await llm_cache.set(fingerprint, "".join(parts), ttl=cache_ttl)
+
     async def generate_exam_questions(
         self,
         exam_type: str,
@@ -72,6 +231,8 @@ class ChatGPTService:
         num_questions: int = 5,
         question_types: Optional[List[str]] = None,
         part_number: Optional[int] = None,  # For Listening: which part (1-4)
+        use_cache: bool = True,
+        chunked: Optional[bool] = None,
     ):
         """
         Sinh câu hỏi thi tự động
@@ -84,10 +245,118 @@ class ChatGPTService:
             num_questions: Số lượng câu hỏi
             question_types: Loại câu hỏi
             part_number: For Listening only - which part to generate (1, 2, 3, or 4)
+            use_cache: Set False to force a fresh generation
+            chunked: Generate in parallel chunks (None = auto for large Reading/Listening sets)
             
         Returns:
             List of generated questions
         """
+        if self._should_generate_chunked(exam_type, skill, num_questions, part_number, chunked):
+            questions = await self._generate_questions_chunked(
+                exam_type=exam_type,
+                skill=skill,
+                topic=topic,
+                difficulty=difficulty,
+                num_questions=num_questions,
+                question_types=question_types,
+                use_cache=use_cache,
+            )
+            self._log_generation_result(questions, num_questions)
+            return questions
+        
+        messages = self._build_generation_messages(
+            exam_type, skill, topic, difficulty, num_questions, question_types, part_number
+        )
+
+        logger.info(
+            f"Generating {num_questions} questions for {exam_type} - {skill} - {topic}"
+        )
+        
+        max_tokens = self._generation_max_tokens(num_questions, question_types)
+        
+        response = await self.generate_completion(
+            messages,
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+            cache_ttl=GENERATION_CACHE_TTL,
+            priority=RequestPriority.BULK,
+        )
+        
+        # LOG: Response từ GPT
+        logger.info("=" * 80)
+        logger.info("📥 GPT RESPONSE (RAW):")
+        logger.info("=" * 80)
+        logger.info(f"Response length: {len(response)} characters")
+        logger.info(f"Response preview (first 500 chars):\n{response[:500]}...")
+        logger.info("=" * 80)
+        
+        # Parse response to structured format
+        questions = self._parse_generated_questions(response, skill)
+        
+        self._log_generation_result(questions, num_questions)
+        
+        return questions
+
+    async def stream_exam_questions(
+        self,
+        exam_type: str,
+        skill: str,
+        topic: str,
+        difficulty: str,
+        num_questions: int = 5,
+        question_types: Optional[List[str]] = None,
+        part_number: Optional[int] = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Sinh câu hỏi dạng streaming - yield từng phần ngay khi JSON của phần đó hoàn chỉnh
+        
+        Args:
+            Same as generate_exam_questions (always a single streamed completion)
+            
+        Yields:
+            {"event": "passage", "data": {...}}          - Reading passage
+            {"event": "question_group", "data": {...}}   - each question group (Reading/Writing)
+            {"event": "part", "data": {...}}             - each Listening part
+            {"event": "complete", "data": <same result as generate_exam_questions>}
+        """
+        messages = self._build_generation_messages(
+            exam_type, skill, topic, difficulty, num_questions, question_types, part_number
+        )
+        max_tokens = self._generation_max_tokens(num_questions, question_types)
+        logger.info(f"Streaming {num_questions} questions for {exam_type} - {skill} - {topic}")
+        
+        parser = IncrementalJSONParser([("passage",), ("question_groups", "*"), ("parts", "*")])
+        async for delta in self.stream_completion(
+            messages,
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+            cache_ttl=GENERATION_CACHE_TTL,
+            priority=RequestPriority.BULK,
+        ):
+            for path, value in parser.feed(delta):
+                if path[0] == "passage":
+                    yield {"event": "passage", "data": value}
+                elif path[0] == "question_groups":
+                    yield {"event": "question_group", "data": value}
+                else:
+                    yield {"event": "part", "data": value}
+        
+        questions = self._parse_generated_questions(parser.text, skill)
+        self._log_generation_result(questions, num_questions)
+        yield {"event": "complete", "data": questions}
+
+    def _build_generation_messages(
+        self,
+        exam_type: str,
+        skill: str,
+        topic: str,
+        difficulty: str,
+        num_questions: int,
+        question_types: Optional[List[str]],
+        part_number: Optional[int],
+    ) -> List[Dict[str, str]]:
+        """Build system + user messages for a single-completion generation"""
         # Get system and user prompts from prompt loader
         system_prompt = prompt_loader.get_system_prompt("generation", exam_type, skill)
         user_prompt = prompt_loader.get_generation_prompt(
@@ -104,11 +373,10 @@ class ChatGPTService:
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
+        return messages
 
-        logger.info(
-            f"Generating {num_questions} questions for {exam_type} - {skill} - {topic}"
-        )
-        
+    def _generation_max_tokens(self, num_questions: int, question_types: Optional[List[str]]) -> int:
+        """Pick max_tokens for a single-completion generation of num_questions"""
         # Calculate appropriate max_tokens based on question count
         # Multiple choice questions with full structure need more tokens:
         # - Question content: ~50 tokens
@@ -151,20 +419,230 @@ class ChatGPTService:
             max_tokens = self.max_tokens  # Default for < 5 questions
             logger.info(f"Using default max_tokens={max_tokens} for {num_questions} questions")
         
-        response = await self.generate_completion(messages, max_tokens=max_tokens)
+        return max_tokens
+
+    def _should_generate_chunked(
+        self,
+        exam_type: str,
+        skill: str,
+        num_questions: int,
+        part_number: Optional[int],
+        chunked: Optional[bool],
+    ) -> bool:
+        """Decide between one big completion and parallel chunked generation"""
+        if chunked is False or part_number:
+            return False
+        if not prompt_loader.supports_chunked_generation(exam_type, skill):
+            return False
+        return bool(chunked) or num_questions >= settings.GENERATION_CHUNK_THRESHOLD
+
+    async def _generate_questions_chunked(
+        self,
+        exam_type: str,
+        skill: str,
+        topic: str,
+        difficulty: str,
+        num_questions: int,
+        question_types: Optional[List[str]],
+        use_cache: bool,
+    ) -> Dict[str, Any]:
+        """
+        Generate a large question set as parallel sub-requests
         
-        # LOG: Response từ GPT
-        logger.info("=" * 80)
-        logger.info("📥 GPT RESPONSE (RAW):")
-        logger.info("=" * 80)
-        logger.info(f"Response length: {len(response)} characters")
-        logger.info(f"Response preview (first 500 chars):\n{response[:500]}...")
-        logger.info("=" * 80)
+        - Reading: passage once, then one question group per chunk (in parallel)
+        - Listening: each part (own audio script + questions) in parallel
         
-        # Parse response to structured format
-        questions = self._parse_generated_questions(response, skill)
+        Each sub-request stays far below max_tokens, so nothing is truncated, and
+        wall-clock time is roughly the slowest chunk instead of one long call.
+        Results are merged and renumbered into the usual
+        {"passage", "question_groups"} / {"test_title", "parts"} shapes.
+        
+        A chunk that fails or returns fewer questions than asked is retried
+        (GENERATION_CHUNK_RETRIES, bypassing the cache); if it still fails the
+        whole generation raises, so a partial test is never returned.
+        """
+        semaphore = asyncio.Semaphore(settings.GENERATION_FANOUT_CONCURRENCY)
+        system_prompt = prompt_loader.get_system_prompt("generation", exam_type, skill)
+        
+        async def run_chunk(user_prompt: str, max_tokens: int, retry: bool = False) -> str:
+            async with semaphore:
+                return await self.generate_completion(
+                    [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    max_tokens=max_tokens,
+                    # A retry must not get the same (cached) unusable answer back
+                    use_cache=use_cache and not retry,
+                    cache_ttl=GENERATION_CACHE_TTL,
+                    priority=RequestPriority.BULK,
+                )
+        
+        if skill.lower() == "listening":
+            return await self._generate_listening_parts_parallel(
+                exam_type, topic, difficulty, num_questions, question_types, run_chunk
+            )
+        
+        logger.info(f"Chunked generation: {exam_type} Reading, {num_questions} questions - passage first")
+        passage_prompt = prompt_loader.get_reading_passage_prompt(exam_type, topic, difficulty, num_questions)
+        passage_data = self._parse_json_object(await run_chunk(passage_prompt, 2000))
+        passage = passage_data.get("passage", passage_data)
+        
+        chunks = self._plan_question_chunks(
+            num_questions,
+            question_types or ["true_false_not_given", "multiple_choice", "short_text"],
+        )
+        logger.info(f"Generating {len(chunks)} question groups in parallel")
+        
+        async def generate_group(question_type: str, start: int, end: int) -> List[Dict[str, Any]]:
+            count = end - start + 1
+            tokens_per_question = 350 if question_type == "multiple_choice" else 180
+            user_prompt = prompt_loader.get_reading_question_group_prompt(
+                exam_type, passage, difficulty, question_type, start, end
+            )
+            
+            async def attempt(retry: bool) -> List[Dict[str, Any]]:
+                response = await run_chunk(
+                    user_prompt, min(self.max_tokens, 400 + count * tokens_per_question), retry=retry
+                )
+                groups = self._parse_json_object(response).get("question_groups", [])
+                self._check_question_count(groups, count)
+                return groups
+            
+            return await self._with_chunk_retries(f"Chunk {start}-{end} ({question_type})", attempt)
+        
+        question_groups = []
+        for groups in await asyncio.gather(*[generate_group(*chunk) for chunk in chunks]):
+            question_groups.extend(groups)
+        
+        total = self._renumber_question_groups(question_groups, start=1) - 1
+        passage["introduction"] = re.sub(
+            r"Questions 1-\d+", f"Questions 1-{total}", passage.get("introduction", "")
+        )
+        return {"passage": passage, "question_groups": question_groups}
+
+    async def _generate_listening_parts_parallel(
+        self,
+        exam_type: str,
+        topic: str,
+        difficulty: str,
+        num_questions: int,
+        question_types: Optional[List[str]],
+        run_chunk,
+    ) -> Dict[str, Any]:
+        """Generate the 4 Listening parts concurrently and merge them into one test"""
+        per_part = [num_questions // 4 + (1 if i < num_questions % 4 else 0) for i in range(4)]
+        logger.info(f"Chunked generation: {exam_type} Listening, parts {per_part} in parallel")
+        
+        async def generate_part(part_number: int, count: int) -> Dict[str, Any]:
+            user_prompt = prompt_loader.get_generation_prompt(
+                exam_type=exam_type,
+                skill="listening",
+                topic=topic,
+                difficulty=difficulty,
+                num_questions=count,
+                question_types=question_types,
+                part_number=part_number,
+            )
+            tokens_per_question = 300 if question_types and "multiple_choice" in question_types else 180
+            
+            async def attempt(retry: bool) -> Dict[str, Any]:
+                response = await run_chunk(
+                    user_prompt, min(self.max_tokens, 1000 + count * tokens_per_question), retry=retry
+                )
+                result = self._parse_generated_questions(response, "listening")
+                if not isinstance(result, dict) or not result.get("parts"):
+                    raise ValueError("response has no parts")
+                self._check_question_count(result["parts"][0].get("question_groups", []), count)
+                return result
+            
+            return await self._with_chunk_retries(f"Listening Part {part_number}", attempt)
+        
+        planned = [(idx, count) for idx, count in enumerate(per_part, 1) if count > 0]
+        results = await asyncio.gather(*[generate_part(idx, count) for idx, count in planned])
+        
+        test_title = None
+        parts = []
+        for (part_number, _), result in zip(planned, results):
+            test_title = test_title or result.get("test_title")
+            part = result["parts"][0]
+            part["part_number"] = part_number
+            part["title"] = f"PART {part_number}"
+            parts.append(part)
+        
+        next_number = 1
+        for part in parts:
+            first = next_number
+            next_number = self._renumber_question_groups(part.get("question_groups", []), start=first)
+            part["subtitle"] = f"Questions {first}-{next_number - 1}"
         
-        # LOG: Parsed result
+        return {"test_title": test_title or "LISTENING TEST", "parts": parts}
+
+    @staticmethod
+    async def _with_chunk_retries(label: str, attempt):
+        """Run one generation chunk, retrying it GENERATION_CHUNK_RETRIES times before giving up"""
+        retries = max(0, settings.GENERATION_CHUNK_RETRIES)
+        for retry in range(retries + 1):
+            try:
+                return await attempt(retry > 0)
+            except Exception as e:
+                if retry >= retries:
+                    raise ValueError(f"{label} failed after {retry + 1} attempt(s): {str(e)}") from e
+                logger.warning(f"{label} failed ({str(e)}), retrying")
+
+    @staticmethod
+    def _check_question_count(question_groups: List[Dict[str, Any]], expected: int) -> None:
+        """Raise when a chunk came back with fewer questions than requested"""
+        generated = sum(len(group.get("questions", [])) for group in question_groups)
+        if generated < expected:
+            raise ValueError(f"returned {generated} of {expected} questions")
+
+    @staticmethod
+    def _plan_question_chunks(num_questions: int, question_types: List[str]) -> List[tuple]:
+        """Split N questions across types, then into chunks of at most GENERATION_CHUNK_SIZE"""
+        chunk_size = max(1, settings.GENERATION_CHUNK_SIZE)
+        per_type = [
+            num_questions // len(question_types) + (1 if i < num_questions % len(question_types) else 0)
+            for i in range(len(question_types))
+        ]
+        chunks = []
+        start = 1
+        for question_type, count in zip(question_types, per_type):
+            num_chunks = -(-count // chunk_size)  # ceil
+            for i in range(num_chunks):
+                # Near-equal chunk sizes (14 -> 7 + 7 rather than 10 + 4)
+                size = count // num_chunks + (1 if i < count % num_chunks else 0)
+                chunks.append((question_type, start, start + size - 1))
+                start += size
+        return chunks
+
+    @staticmethod
+    def _renumber_question_groups(question_groups: List[Dict[str, Any]], start: int = 1) -> int:
+        """Renumber questions sequentially across groups; returns the next free number"""
+        number = start
+        for group in question_groups:
+            questions = group.get("questions", [])
+            first = number
+            for q in questions:
+                q["question_number"] = number
+                number += 1
+            if questions and "group_name" in group:
+                group["group_name"] = f"Questions {first}-{number - 1}"
+        return number
+
+    @staticmethod
+    def _parse_json_object(response: str) -> Dict[str, Any]:
+        """Extract the JSON object from a completion (tolerates markdown fences)"""
+        import json
+        
+        start_idx = response.find("{")
+        end_idx = response.rfind("}") + 1
+        if start_idx == -1 or end_idx <= start_idx:
+            raise ValueError("No JSON object in response")
+        return json.loads(response[start_idx:end_idx])
+
+    def _log_generation_result(self, questions: Any, num_questions: int) -> None:
+        """Log the structure of a generated test and warn when questions are missing"""
         logger.info("📦 PARSED RESULT:")
         if isinstance(questions, dict):
             logger.info(f"Type: dict")
@@ -213,8 +691,6 @@ class ChatGPTService:
             logger.info(f"Type: {type(questions)}")
             logger.info(f"Length: {len(questions) if isinstance(questions, list) else 'N/A'}")
         logger.info("=" * 80)
-        
-        return questions
 
     async def grade_writing_answer(
         self,
@@ -252,7 +728,9 @@ class ChatGPTService:
 
         logger.info(f"Grading writing answer for {exam_type}")
         
-        response = await self.generate_completion(messages, temperature=0.3)
+        response = await self.generate_completion(
+            messages, temperature=0.3, cache_ttl=GRADING_CACHE_TTL
+        )
         
         # Parse grading result
         result = self._parse_grading_result(response)
@@ -295,16 +773,14 @@ class ChatGPTService:
 
         logger.info(f"Grading speaking answer for {exam_type}")
         
-        response = await self.generate_completion(messages, temperature=0.3)
+        response = await self.generate_completion(
+            messages, temperature=0.3, cache_ttl=GRADING_CACHE_TTL
+        )
         
         result = self._parse_grading_result(response)
         
         return result
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-    )
     async def transcribe_audio(
         self,
         audio_file_path: str,
@@ -314,27 +790,34 @@ class ChatGPTService:
         Transcribe audio file to text using OpenAI Whisper API
         
         Args:
-            audio_file_path: Path to audio file (local file path or URL)
+            audio_file_path: Path to local audio file
             language: Language code (e.g., 'en' for English)
             
         Returns:
             Transcribed text
         """
+        result = await self.transcribe_audio_detailed(audio_file_path, language)
+        return result["text"]
+
+    async def transcribe_audio_detailed(
+        self,
+        audio_file_path: str,
+        language: str = "en",
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Transcribe audio with timestamps (cached by audio content, long files split on silence)
+        
+        Returns:
+            {"text", "segments": [{"start", "end", "text"}], "duration", "cached"}
+        """
         try:
             logger.info(f"Transcribing audio file: {audio_file_path}")
-            
-            # Open audio file
-            with open(audio_file_path, "rb") as audio_file:
-                # Use Whisper API for transcription
-                transcript = await self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language=language,
-                    response_format="text"
-                )
-            
-            logger.info(f"Transcription successful. Length: {len(transcript)} characters")
-            return transcript
+            result = await transcription_service.transcribe(
+                self.client, audio_file_path, language, use_cache=use_cache
+            )
+            logger.info(f"Transcription successful. Length: {len(result['text'])} characters")
+            return result
             
         except Exception as e:
             logger.error(f"Error transcribing audio: {str(e)}")
@@ -375,7 +858,7 @@ class ChatGPTService:
             {"role": "user", "content": user_prompt},
         ]
 
-        feedback = await self.generate_completion(messages)
+        feedback = await self.generate_completion(messages, cache_ttl=FEEDBACK_CACHE_TTL)
         
         return feedback
 
@@ -605,6 +1088,60 @@ class ChatGPTService:
             logger.error(f"Error generating audio: {str(e)}")
             raise
 
+    async def synthesize_audio_file(
+        self,
+        text: str,
+        output_dir: str = "uploads/audio",
+        voice: str = "alloy",
+        model: str = "tts-1",
+    ) -> str:
+        """
+        Synthesize text to an MP3 file named by content hash of (model, voice, text)
+        
+        Identical scripts are never synthesized twice: an existing file is reused,
+        and concurrent identical requests (also across workers) share one TTS call.
+        Audio is streamed to disk chunk by chunk instead of being buffered in memory.
+        
+        Returns:
+            File name (relative to output_dir)
+        """
+        digest = hashlib.sha256(f"{model}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+        filename = f"tts_{digest[:32]}.mp3"
+        file_path = os.path.join(output_dir, filename)
+        
+        if os.path.exists(file_path):
+            logger.info(f"TTS cache hit: {filename}")
+            return filename
+        
+        async def synthesize() -> str:
+            if os.path.exists(file_path):
+                return filename
+            # Write to a temp file and rename, so readers never see a partial MP3
+            tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                # Same concurrency slots / request budget as completions and Whisper;
+                # TTS is billed per character, not token. Its own limits differ from
+                # the chat model's, so its headers don't retune the governor
+                async with rate_governor.slot(RequestPriority.BULK):
+                    async with self.client.audio.speech.with_streaming_response.create(
+                        model=model,
+                        voice=voice,
+                        input=text,
+                    ) as response:
+                        async with aiofiles.open(tmp_path, "wb") as f:
+                            async for chunk in response.iter_bytes():
+                                await f.write(chunk)
+                os.replace(tmp_path, file_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            logger.info(f"Audio saved to {file_path}")
+            return filename
+        
+        if settings.TTS_SINGLEFLIGHT_ENABLED:
+            return await tts_singleflight.do(digest, synthesize)
+        return await synthesize()
+
     async def generate_listening_audio(
         self,
         parts: List[Dict[str, Any]],
@@ -613,6 +1150,10 @@ class ChatGPTService:
         """
         Generate audio files for all parts in a Listening test
         
+        Parts are synthesized concurrently (at most TTS_CONCURRENCY at a time)
+        into content-addressed files, so concurrent generations never overwrite
+        each other and unchanged scripts reuse their existing audio.
+        
         Args:
             parts: List of part objects with audio_script
             output_dir: Directory to save audio files
@@ -620,48 +1161,43 @@ class ChatGPTService:
         Returns:
             Updated parts with audio_url field
         """
-        import os
-        
         # Create output directory if not exists
         os.makedirs(output_dir, exist_ok=True)
         
-        updated_parts = []
+        semaphore = asyncio.Semaphore(settings.TTS_CONCURRENCY)
         
-        for part_idx, part in enumerate(parts, 1):
+        async def process_part(part_idx: int, part: Dict[str, Any]) -> Dict[str, Any]:
             audio_script = part.get("audio_script", "")
             
             if not audio_script:
                 logger.warning(f"Part {part_idx} has no audio_script, skipping")
-                updated_parts.append(part)
-                continue
-            
-            # Generate filename
-            filename = f"listening_part_{part_idx}_{part.get('part_number', part_idx)}.mp3"
-            file_path = os.path.join(output_dir, filename)
+                return part
             
             try:
-                # Generate audio
                 logger.info(f"Generating audio for Part {part_idx}...")
-                await self.generate_audio_from_text(
-                    text=audio_script,
-                    voice="alloy",  # Professional voice
-                    output_path=file_path
-                )
+                async with semaphore:
+                    filename = await self.synthesize_audio_file(
+                        text=audio_script,
+                        output_dir=output_dir,
+                        voice="alloy",  # Professional voice
+                    )
                 
                 # Add audio URL to part
                 part_with_audio = {**part}
                 part_with_audio["audio_url"] = f"/uploads/audio/{filename}"
                 part_with_audio["audio_file"] = filename
                 
-                updated_parts.append(part_with_audio)
                 logger.info(f"✅ Generated audio for Part {part_idx}: {filename}")
+                return part_with_audio
                 
             except Exception as e:
                 logger.error(f"Failed to generate audio for Part {part_idx}: {str(e)}")
                 # Keep part without audio
-                updated_parts.append(part)
+                return part
         
-        return updated_parts
+        return list(await asyncio.gather(
+            *[process_part(part_idx, part) for part_idx, part in enumerate(parts, 1)]
+        ))
 
 
 # Singleton instance
@@ -0,0 +1,218 @@
+"""
+Full-text search over exam content (content team / admin)
+
+Covers exam, test and skill names, section and question group names and
+passages, and question text. On MySQL every target has an InnoDB FULLTEXT
+index and is searched with
+
+    MATCH (...) AGAINST ('+word1* +word2*' IN BOOLEAN MODE)
+
+so every word must appear, each word also matches as a prefix ("environ"
+finds "environment"), and results are ranked by MySQL's relevance score. The
+indexes are maintained by MySQL on every write, so there is nothing to rebuild.
+
+InnoDB does not index words shorter than innodb_ft_min_token_size (3 by
+default) or stopwords, so such words ("Test 1", "Part 2", "the") are left out
+of the boolean query and matched with LIKE '%word%' instead; a search made only
+of them is a plain LIKE search, unranked.
+
+Other dialects (local SQLite) fall back to LIKE '%word%' per word, unranked.
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, desc, literal, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.exam_models import Exam, ExamQuestion, ExamQuestionGroup, ExamSection, ExamSkill, ExamTest
+
+EXAM = "exam"
+TEST = "test"
+SKILL = "skill"
+SECTION = "section"
+GROUP = "group"
+QUESTION = "question"
+SEARCH_TYPES = (EXAM, TEST, SKILL, SECTION, GROUP, QUESTION)
+
+MAX_TERMS = 8
+SNIPPET_LENGTH = 160
+
+# innodb_ft_min_token_size (MySQL default)
+MIN_TOKEN_SIZE = 3
+
+# INNODB_FT_DEFAULT_STOPWORD
+STOPWORDS = frozenset((
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for",
+    "from", "how", "i", "in", "is", "it", "la", "of", "on", "or", "that", "the",
+    "this", "to", "was", "what", "when", "where", "who", "will", "with", "und", "www",
+))
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_TAG = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"\s+")
+
+
+def search_terms(text: str) -> List[str]:
+    """Words of a search string (boolean-mode operators are dropped)"""
+    return _WORD.findall(text.lower())[:MAX_TERMS]
+
+
+def is_indexed(term: str) -> bool:
+    """Whether InnoDB keeps the word in a FULLTEXT index"""
+    return len(term) >= MIN_TOKEN_SIZE and term not in STOPWORDS
+
+
+def boolean_query(terms: Sequence[str]) -> str:
+    """
+    Boolean-mode query requiring every indexed term, each as a prefix
+
+    Returns an empty string when no term is indexed (search with LIKE then).
+    """
+    return " ".join(f"+{term}*" for term in terms if is_indexed(term))
+
+
+def _is_mysql(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "mysql"
+
+
+def _relevance(db: AsyncSession, columns: Sequence[Any], terms: Sequence[str]):
+    """(WHERE clause, score expression) for the terms on a FULLTEXT column set"""
+    query = boolean_query(terms) if _is_mysql(db) else ""
+    clauses = [
+        or_(*[column.ilike(f"%{term}%") for column in columns])
+        for term in terms
+        if not query or not is_indexed(term)
+    ]
+    if not query:
+        return and_(*clauses), literal(0.0)
+    expr = match(*columns, against=query).in_boolean_mode()
+    return and_(expr, *clauses), expr
+
+
+def _snippet(text: Optional[str], terms: Sequence[str]) -> Optional[str]:
+    """Plain-text window of a passage around the first matching term"""
+    if not text:
+        return None
+    plain = _SPACES.sub(" ", _TAG.sub(" ", text)).strip()
+    if len(plain) <= SNIPPET_LENGTH:
+        return plain
+    lowered = plain.lower()
+    positions = [pos for pos in (lowered.find(term) for term in terms) if pos >= 0]
+    start = max(0, min(positions) - SNIPPET_LENGTH // 4) if positions else 0
+    end = start + SNIPPET_LENGTH
+    return ("…" if start else "") + plain[start:end].strip() + ("…" if end < len(plain) else "")
+
+
+def _targets(db: AsyncSession, terms: Sequence[str]) -> Dict[str, Any]:
+    """One ranked select per content type"""
+    def ranked(columns, *selected):
+        clause, score = _relevance(db, columns, terms)
+        return clause, select(*selected, score.label("score"))
+
+    clause, exams = ranked([Exam.name], Exam.id, Exam.name, Exam.type)
+    exams = exams.where(clause, Exam.deleted_at.is_(None))
+
+    clause, tests = ranked([ExamTest.name], ExamTest.id, ExamTest.name, ExamTest.exam_id)
+    tests = tests.where(clause, ExamTest.deleted_at.is_(None))
+
+    clause, skills = ranked(
+        [ExamSkill.name], ExamSkill.id, ExamSkill.name, ExamSkill.skill_type, ExamSkill.exam_test_id
+    )
+    skills = skills.where(clause, ExamSkill.deleted_at.is_(None))
+
+    clause, sections = ranked(
+        [ExamSection.name, ExamSection.content],
+        ExamSection.id, ExamSection.name, ExamSection.content, ExamSection.exam_skill_id
+    )
+    sections = sections.where(clause, ExamSection.deleted_at.is_(None))
+
+    clause, groups = ranked(
+        [ExamQuestionGroup.name, ExamQuestionGroup.content],
+        ExamQuestionGroup.id, ExamQuestionGroup.name, ExamQuestionGroup.content,
+        ExamQuestionGroup.exam_section_id, ExamSection.exam_skill_id
+    )
+    groups = (
+        groups.join(ExamSection, ExamSection.id == ExamQuestionGroup.exam_section_id)
+        .where(clause, ExamQuestionGroup.deleted_at.is_(None))
+    )
+
+    clause, questions = ranked(
+        [ExamQuestion.question_text],
+        ExamQuestion.id, ExamQuestion.question_text, ExamQuestion.question_group_id, ExamSection.exam_skill_id
+    )
+    questions = (
+        questions.join(ExamQuestionGroup, ExamQuestionGroup.id == ExamQuestion.question_group_id)
+        .join(ExamSection, ExamSection.id == ExamQuestionGroup.exam_section_id)
+        .where(clause, ExamQuestion.deleted_at.is_(None))
+    )
+
+    return {EXAM: exams, TEST: tests, SKILL: skills, SECTION: sections, GROUP: groups, QUESTION: questions}
+
+
+def _result(kind: str, row: Any, terms: Sequence[str]) -> Dict[str, Any]:
+    item = {"type": kind, "id": row.id, "score": float(row.score or 0)}
+    if kind == EXAM:
+        item.update({"title": row.name, "exam_type": row.type.value if row.type else None})
+    elif kind == TEST:
+        item.update({"title": row.name, "exam_id": row.exam_id})
+    elif kind == SKILL:
+        item.update({
+            "title": row.name,
+            "skill_type": row.skill_type.value if row.skill_type else None,
+            "exam_test_id": row.exam_test_id,
+        })
+    elif kind == SECTION:
+        item.update({
+            "title": row.name,
+            "snippet": _snippet(row.content, terms),
+            "exam_skill_id": row.exam_skill_id,
+        })
+    elif kind == GROUP:
+        item.update({
+            "title": row.name,
+            "snippet": _snippet(row.content, terms),
+            "exam_section_id": row.exam_section_id,
+            "exam_skill_id": row.exam_skill_id,
+        })
+    else:
+        item.update({
+            "title": _snippet(row.question_text, terms),
+            "question_group_id": row.question_group_id,
+            "exam_skill_id": row.exam_skill_id,
+        })
+    return item
+
+
+async def search_content(
+    db: AsyncSession,
+    text: str,
+    types: Optional[Sequence[str]] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Search exam content
+
+    Args:
+        text: Words to search; all must match, each as a prefix
+        types: Subset of SEARCH_TYPES (default: all)
+        limit: Maximum number of results overall
+
+    Returns:
+        Results of every type, best score first
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+
+    targets = _targets(db, terms)
+    results = []
+    for kind in types or SEARCH_TYPES:
+        query = targets[kind]
+        rows = (await db.execute(
+            query.order_by(desc("score"), query.selected_columns[0].desc()).limit(limit)
+        )).all()
+        results.extend(_result(kind, row, terms) for row in rows)
+
+    results.sort(key=lambda item: item["score"], reverse=True)
+    return results[:limit]
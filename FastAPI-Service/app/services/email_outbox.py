@@ -0,0 +1,323 @@
+"""
+Outbound email queue
+
+Request handlers only enqueue a rendered message; background workers (started
+in the app lifespan) deliver it, so an SMTP round trip never runs inside a
+request.
+
+- With Redis the queue is the list `email:outbox`, shared by all app workers,
+  and messages waiting for a retry sit in the sorted set `email:retry` (score =
+  due time) until a worker moves them back
+- A worker takes a message with BLMOVE into its own processing list and removes
+  it only once it was sent, dropped or scheduled for a retry. Every process
+  refreshes a heartbeat key; the processing lists of a process whose heartbeat
+  expired (crash, kill) are moved back to the queue, and `stop()` hands back the
+  messages of its own cancelled sends. Delivery is therefore at-least-once: a
+  crash right after the SMTP send can send a message twice
+- Without Redis (or after a Redis error) messages go to an in-process queue;
+  they are lost if the process stops before delivery
+- A failed delivery is retried EMAIL_MAX_RETRIES times with exponential
+  backoff (EMAIL_RETRY_BACKOFF_SECONDS, doubled each time), then dropped and
+  logged
+- Messages may carry `expires_at` (e.g. OTP codes): they are dropped instead of
+  delivered once that time has passed
+- `get_stats()` reports counters and the enqueue -> delivered time of recent
+  messages
+"""
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.services.redis_client import get_redis, mark_redis_failed
+
+QUEUE_KEY = "email:outbox"
+RETRY_KEY = "email:retry"
+PROCESSING_PREFIX = "email:processing:"  # + <process id>:<worker number>
+HEARTBEAT_PREFIX = "email:alive:"  # + <process id>
+
+# Block this long waiting for a message before checking retries again
+POLL_SECONDS = 1
+
+# A process counts as dead (its in-flight messages are re-queued) when its
+# heartbeat, refreshed every third of this, is this old
+PROCESSING_LEASE_SECONDS = 60
+
+# Delivery times kept for get_stats()
+LATENCY_SAMPLES = 1000
+
+# KEYS[1] = retry zset, KEYS[2] = queue; ARGV[1] = now. Moves due retries back to the queue
+_PROMOTE_SCRIPT = """
+local due = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, 100)
+for _, item in ipairs(due) do
+    redis.call("ZREM", KEYS[1], item)
+    redis.call("RPUSH", KEYS[2], item)
+end
+return #due
+"""
+
+# KEYS[1] = heartbeat of the list's owner, KEYS[2] = processing list, KEYS[3] = queue.
+# Moves the list back to the head of the queue unless the owner is alive
+_REQUEUE_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    return 0
+end
+local moved = 0
+while redis.call("LMOVE", KEYS[2], KEYS[3], "RIGHT", "LEFT") do
+    moved = moved + 1
+end
+return moved
+"""
+
+
+class EmailOutbox:
+    """Queue + delivery workers with retry / backoff"""
+
+    def __init__(
+        self,
+        deliver: Callable[[Dict[str, Any]], Awaitable[None]],
+        workers: int,
+        max_retries: int,
+        retry_backoff: float,
+    ):
+        self.deliver = deliver
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._memory: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.process_id = uuid.uuid4().hex
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.stats: Dict[str, int] = {
+            "queued": 0,
+            "sent": 0,
+            "retried": 0,
+            "failed": 0,
+            "expired": 0,
+            "requeued": 0,
+        }
+
+    def _queue(self) -> asyncio.Queue:
+        if self._memory is None:
+            self._memory = asyncio.Queue()
+        return self._memory
+
+    def _processing_key(self, worker: int) -> str:
+        return f"{PROCESSING_PREFIX}{self.process_id}:{worker}"
+
+    def start(self) -> None:
+        """Start the delivery workers (no-op if already running)"""
+        for n in range(self.workers):
+            if n >= len(self._tasks):
+                self._tasks.append(asyncio.create_task(self._worker(n)))
+            elif self._tasks[n].done():
+                self._tasks[n] = asyncio.create_task(self._worker(n))
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self) -> None:
+        """
+        Stop the workers; messages being sent go back to the Redis queue,
+        messages still in the in-process queue are lost
+        """
+        tasks = [*self._tasks, *([self._heartbeat_task] if self._heartbeat_task else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._heartbeat_task = None
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                await redis.delete(HEARTBEAT_PREFIX + self.process_id)
+                for worker in range(self.workers):
+                    await self._requeue(redis, self.process_id, self._processing_key(worker))
+            except Exception as e:
+                mark_redis_failed(e)
+        if self._memory is not None and not self._memory.empty():
+            logger.warning(f"{self._memory.qsize()} queued emails were not delivered")
+
+    async def _requeue(self, redis, process_id: str, processing_key: str) -> None:
+        moved = int(await redis.eval(
+            _REQUEUE_SCRIPT, 3, HEARTBEAT_PREFIX + process_id, processing_key, QUEUE_KEY
+        ))
+        if moved:
+            self.stats["requeued"] += moved
+            logger.warning(f"Re-queued {moved} emails left in {processing_key}")
+
+    async def _heartbeat(self) -> None:
+        """Keep this process's lease alive and re-queue the messages of dead ones"""
+        while True:
+            try:
+                redis = await get_redis()
+                if redis is not None:
+                    try:
+                        await redis.set(HEARTBEAT_PREFIX + self.process_id, 1, ex=PROCESSING_LEASE_SECONDS)
+                        async for key in redis.scan_iter(match=f"{PROCESSING_PREFIX}*"):
+                            key = key.decode() if isinstance(key, bytes) else key
+                            process_id = key[len(PROCESSING_PREFIX):].split(":", 1)[0]
+                            if process_id != self.process_id:
+                                await self._requeue(redis, process_id, key)
+                    except Exception as e:
+                        mark_redis_failed(e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email heartbeat error: {str(e)}")
+            await asyncio.sleep(PROCESSING_LEASE_SECONDS / 3)
+
+    async def enqueue(self, message: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """
+        Queue a message
+
+        Args:
+            message: Rendered message (to, subject, html, text)
+            ttl: Drop the message instead of delivering it after this many seconds
+        """
+        now = time.time()
+        message = {
+            **message,
+            "id": uuid.uuid4().hex,
+            "attempts": 0,
+            "enqueued_at": now,
+            "expires_at": now + ttl if ttl else None,
+        }
+        self.start()
+        self.stats["queued"] += 1
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                await redis.rpush(QUEUE_KEY, json.dumps(message))
+                return
+            except Exception as e:
+                mark_redis_failed(e)
+        self._queue().put_nowait(message)
+
+    async def _next(self, processing_key: str) -> Tuple[Optional[Dict[str, Any]], Optional[bytes]]:
+        """
+        Next message to deliver, or (None, None) after POLL_SECONDS without one
+
+        Returns:
+            (message, raw entry in the processing list; None for in-process messages)
+        """
+        queue = self._queue()
+        if not queue.empty():
+            return queue.get_nowait(), None
+
+        redis = await get_redis()
+        if redis is None:
+            try:
+                return await asyncio.wait_for(queue.get(), timeout=POLL_SECONDS), None
+            except asyncio.TimeoutError:
+                return None, None
+
+        try:
+            # Left over from a failed Redis call: deliver it before taking new ones
+            raw = await redis.lindex(processing_key, 0)
+            if raw is not None:
+                return json.loads(raw), raw
+            await redis.eval(_PROMOTE_SCRIPT, 2, RETRY_KEY, QUEUE_KEY, time.time())
+            raw = await redis.blmove(QUEUE_KEY, processing_key, POLL_SECONDS, "LEFT", "RIGHT")
+        except Exception as e:
+            mark_redis_failed(e)
+            return None, None
+        return (json.loads(raw), raw) if raw is not None else (None, None)
+
+    async def _finish(self, processing_key: str, raw: Optional[bytes], retry: Optional[Tuple[str, float]] = None) -> None:
+        """Remove a message from the processing list (scheduling its retry in the same transaction)"""
+        if raw is None:
+            return
+        redis = await get_redis()
+        if redis is None:
+            # Left in the list; re-queued once Redis is back and this lease expires
+            return
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                if retry is not None:
+                    pipe.zadd(RETRY_KEY, {retry[0]: retry[1]})
+                pipe.lrem(processing_key, 1, raw)
+                await pipe.execute()
+        except Exception as e:
+            mark_redis_failed(e)
+
+    async def _worker(self, worker: int) -> None:
+        processing_key = self._processing_key(worker)
+        while True:
+            try:
+                message, raw = await self._next(processing_key)
+                if message is not None:
+                    await self._process(message, processing_key, raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email worker error: {str(e)}")
+                await asyncio.sleep(POLL_SECONDS)
+
+    async def _process(self, message: Dict[str, Any], processing_key: str, raw: Optional[bytes]) -> None:
+        if message.get("expires_at") and time.time() > message["expires_at"]:
+            self.stats["expired"] += 1
+            logger.warning(f"Dropped expired email to {message['to']}: {message['subject']}")
+            await self._finish(processing_key, raw)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.deliver(message)
+        except Exception as e:
+            await self._retry(message, e, processing_key, raw)
+            return
+        await self._finish(processing_key, raw)
+
+        delivered_after = time.time() - message["enqueued_at"]
+        self._latencies.append(delivered_after)
+        self.stats["sent"] += 1
+        logger.info(
+            f"Email sent to {message['to']} in {time.monotonic() - started:.2f}s "
+            f"({delivered_after:.2f}s after enqueue, attempt {message['attempts'] + 1})"
+        )
+
+    async def _retry(
+        self, message: Dict[str, Any], error: Exception, processing_key: str, raw: Optional[bytes]
+    ) -> None:
+        message["attempts"] += 1
+        if message["attempts"] > self.max_retries:
+            self.stats["failed"] += 1
+            logger.error(f"Failed to send email to {message['to']} after {message['attempts']} attempts: {str(error)}")
+            await self._finish(processing_key, raw)
+            return
+
+        delay = self.retry_backoff * (2 ** (message["attempts"] - 1))
+        self.stats["retried"] += 1
+        logger.warning(f"Email to {message['to']} failed ({str(error)}), retrying in {delay:.1f}s")
+
+        if raw is not None:
+            # Taken from Redis: the retry is scheduled there (or, if Redis is
+            # gone, the message stays in the processing list and is re-queued)
+            await self._finish(processing_key, raw, retry=(json.dumps(message), time.time() + delay))
+            return
+        asyncio.get_running_loop().call_later(delay, self._queue().put_nowait, message)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters and delivery times (seconds from enqueue) of recent messages"""
+        samples = sorted(self._latencies)
+        delivery = {"samples": len(samples)}
+        if samples:
+            delivery.update({
+                "avg": round(sum(samples) / len(samples), 3),
+                "p50": round(samples[len(samples) // 2], 3),
+                "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+                "max": round(samples[-1], 3),
+            })
+        return {
+            **self.stats,
+            "workers": len([task for task in self._tasks if not task.done()]),
+            "pending_in_process": self._memory.qsize() if self._memory is not None else 0,
+            "delivery_seconds": delivery,
+        }
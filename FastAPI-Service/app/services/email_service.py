@@ -1,18 +1,147 @@
 """
 Email service for sending emails via SMTP
+
+- Templates (app/templates/email, Jinja2) are compiled once at startup
+- Endpoints call the async `send_*_email` helpers, which render the message
+  and put it on the outbox (services/email_outbox.py); they return immediately
+- Outbox workers deliver through a small pool of persistent SMTP connections,
+  used from dedicated threads (smtplib is blocking). Connections are reused
+  across messages, checked with NOOP after being idle and re-opened when the
+  server dropped them
 """
+import asyncio
+import queue
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Optional
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 from loguru import logger
 
 from app.config import settings
+from app.services.email_outbox import EmailOutbox
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+
+class SMTPConnectionPool:
+    """Persistent SMTP connections shared by the sender threads"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        use_tls: bool,
+        size: int,
+        timeout: float,
+        idle_seconds: float,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self._idle: "queue.LifoQueue[Tuple[smtplib.SMTP, float]]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"connects": 0, "reconnects": 0, "messages": 0}
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        with self._lock:
+            self.stats["connects"] += 1
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        """Idle connection (checked if it sat unused for a while) or a new one"""
+        try:
+            server, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+        if time.monotonic() - last_used > self.idle_seconds:
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except Exception:
+                pass
+            self._close(server)
+            return self._connect()
+        return server
+
+    def _release(self, server: smtplib.SMTP) -> None:
+        if self._idle.qsize() >= self.size:
+            self._close(server)
+        else:
+            self._idle.put((server, time.monotonic()))
+
+    def send(self, message: MIMEMultipart) -> None:
+        """
+        Send one message (blocking; call from a worker thread)
+
+        A connection the server already closed is replaced once; other errors
+        are raised to the caller.
+        """
+        for attempt in range(2):
+            server = self._checkout()
+            try:
+                server.send_message(message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self._close(server)
+                if attempt:
+                    raise
+                with self._lock:
+                    self.stats["reconnects"] += 1
+                continue
+            except smtplib.SMTPResponseException:
+                # Rejected by the server; the connection itself is fine
+                self._release(server)
+                raise
+            except Exception:
+                self._close(server)
+                raise
+            self._release(server)
+            with self._lock:
+                self.stats["messages"] += 1
+            return
+
+    def close_all(self) -> None:
+        """Close every idle connection (app shutdown)"""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
 
 
 class EmailService:
     """Service for sending emails"""
-    
+
     def __init__(self):
         self.smtp_host = settings.MAIL_HOST
         self.smtp_port = settings.MAIL_PORT
@@ -21,7 +150,61 @@ class EmailService:
         self.from_address = settings.MAIL_FROM_ADDRESS
         self.from_name = settings.MAIL_FROM_NAME
         self.use_tls = settings.MAIL_ENCRYPTION == "tls"
-    
+
+        self.pool = SMTPConnectionPool(
+            host=self.smtp_host,
+            port=self.smtp_port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            size=settings.EMAIL_SMTP_POOL_SIZE,
+            timeout=settings.EMAIL_SMTP_TIMEOUT_SECONDS,
+            idle_seconds=settings.EMAIL_SMTP_IDLE_SECONDS,
+        )
+        self.outbox = EmailOutbox(
+            deliver=self._deliver,
+            workers=settings.EMAIL_SMTP_POOL_SIZE,
+            max_retries=settings.EMAIL_MAX_RETRIES,
+            retry_backoff=settings.EMAIL_RETRY_BACKOFF_SECONDS,
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Compile every template once
+        env = Environment(
+            loader=FileSystemLoader(str(TEMPLATE_DIR)),
+            autoescape=select_autoescape(["html"]),
+        )
+        self.templates: Dict[str, Template] = {
+            name: env.get_template(name) for name in env.list_templates()
+        }
+
+    def render(self, template: str, **context: Any) -> Tuple[str, str]:
+        """(html, text) of a template pair, e.g. "otp" -> otp.html / otp.txt"""
+        return (
+            self.templates[f"{template}.html"].render(**context),
+            self.templates[f"{template}.txt"].render(**context),
+        )
+
+    def _build_message(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = f"{self.from_name} <{self.from_address}>"
+        msg['To'] = to_email
+
+        # Add text part if provided
+        if text_content:
+            msg.attach(MIMEText(text_content, 'plain'))
+
+        # Add HTML part
+        msg.attach(MIMEText(html_content, 'html'))
+        return msg
+
     def send_email(
         self,
         to_email: str,
@@ -30,149 +213,117 @@ class EmailService:
         text_content: Optional[str] = None
     ) -> bool:
         """
-        Send an email
-        
+        Send an email right away (blocking; scripts and worker threads only,
+        endpoints use `queue_email`)
+
         Args:
             to_email: Recipient email address
             subject: Email subject
             html_content: HTML content of the email
             text_content: Plain text content (optional)
-            
+
         Returns:
             bool: True if email was sent successfully
         """
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.from_name} <{self.from_address}>"
-            msg['To'] = to_email
-            
-            # Add text part if provided
-            if text_content:
-                part1 = MIMEText(text_content, 'plain')
-                msg.attach(part1)
-            
-            # Add HTML part
-            part2 = MIMEText(html_content, 'html')
-            msg.attach(part2)
-            
-            # Connect to SMTP server
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                if self.use_tls:
-                    server.starttls()
-                
-                # Login
-                server.login(self.username, self.password)
-                
-                # Send email
-                server.send_message(msg)
-            
+            self.pool.send(self._build_message(to_email, subject, html_content, text_content))
             logger.info(f"Email sent successfully to {to_email}")
             return True
-            
         except Exception as e:
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return False
-    
-    def send_otp_email(self, to_email: str, otp_code: str) -> bool:
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix="smtp")
+        return self._executor
+
+    async def _deliver(self, message: Dict[str, Any]) -> None:
+        """Outbox callback: send on a pooled connection, raise on failure"""
+        mime = self._build_message(message["to"], message["subject"], message["html"], message.get("text"))
+        await asyncio.get_running_loop().run_in_executor(self._get_executor(), self.pool.send, mime)
+
+    async def queue_email(
+        self,
+        to_email: str,
+        subject: str,
+        template: str,
+        ttl: Optional[int] = None,
+        **context: Any
+    ) -> bool:
         """
-        Send OTP verification email
-        
+        Render a template and queue it for delivery
+
+        Args:
+            to_email: Recipient email address
+            subject: Email subject
+            template: Template name (app/templates/email/<template>.html / .txt)
+            ttl: Drop the email if it could not be delivered within this many seconds
+
+        Returns:
+            bool: True if the email was queued
+        """
+        try:
+            html_content, text_content = self.render(template, **context)
+            await self.outbox.enqueue(
+                {"to": to_email, "subject": subject, "html": html_content, "text": text_content},
+                ttl=ttl,
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to queue email to {to_email}: {str(e)}")
+            return False
+
+    async def send_otp_email(self, to_email: str, otp_code: str) -> bool:
+        """
+        Queue OTP verification email (dropped once the code has expired)
+
         Args:
             to_email: Recipient email address
             otp_code: OTP code to send
-            
+
         Returns:
-            bool: True if email was sent successfully
+            bool: True if email was queued
         """
-        subject = "Mã xác thực OTP - Owl English"
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                }}
-                .container {{
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background-color: #4F46E5;
-                    color: white;
-                    padding: 20px;
-                    text-align: center;
-                    border-radius: 5px 5px 0 0;
-                }}
-                .content {{
-                    background-color: #f9fafb;
-                    padding: 30px;
-                    border: 1px solid #e5e7eb;
-                }}
-                .otp-code {{
-                    font-size: 32px;
-                    font-weight: bold;
-                    color: #4F46E5;
-                    text-align: center;
-                    padding: 20px;
-                    background-color: white;
-                    border-radius: 5px;
-                    margin: 20px 0;
-                    letter-spacing: 5px;
-                }}
-                .footer {{
-                    text-align: center;
-                    padding: 20px;
-                    color: #6b7280;
-                    font-size: 14px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Xác thực tài khoản</h1>
-                </div>
-                <div class="content">
-                    <p>Xin chào,</p>
-                    <p>Bạn đã yêu cầu mã xác thực OTP để đăng ký tài khoản tại <strong>Owl English</strong>.</p>
-                    <p>Mã OTP của bạn là:</p>
-                    <div class="otp-code">{otp_code}</div>
-                    <p><strong>Lưu ý:</strong> Mã này sẽ hết hạn sau 5 phút.</p>
-                    <p>Nếu bạn không thực hiện yêu cầu này, vui lòng bỏ qua email này.</p>
-                </div>
-                <div class="footer">
-                    <p>&copy; 2025 Owl English. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
+        return await self.queue_email(
+            to_email,
+            "Mã xác thực OTP - Owl English",
+            "otp",
+            ttl=settings.OTP_TTL_SECONDS,
+            otp_code=otp_code,
+            expires_minutes=max(1, settings.OTP_TTL_SECONDS // 60),
+        )
+
+    async def send_welcome_email(self, to_email: str, name: Optional[str]) -> bool:
         """
-        
-        text_content = f"""
-        Xác thực tài khoản - Owl English
-        
-        Xin chào,
-        
-        Bạn đã yêu cầu mã xác thực OTP để đăng ký tài khoản tại Owl English.
-        
-        Mã OTP của bạn là: {otp_code}
-        
-        Lưu ý: Mã này sẽ hết hạn sau 5 phút.
-        
-        Nếu bạn không thực hiện yêu cầu này, vui lòng bỏ qua email này.
-        
-        © 2025 Owl English. All rights reserved.
+        Queue welcome email for a newly registered account
+
+        Returns:
+            bool: True if email was queued
         """
-        
-        return self.send_email(to_email, subject, html_content, text_content)
+        return await self.queue_email(
+            to_email,
+            "Chào mừng đến với Owl English",
+            "welcome",
+            name=name or to_email,
+            email=to_email,
+        )
+
+    def start(self) -> None:
+        """Start delivering queued emails (app startup)"""
+        self.outbox.start()
+
+    async def stop(self) -> None:
+        """Stop the outbox workers and close SMTP connections (app shutdown)"""
+        await self.outbox.stop()
+        if self._executor is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.pool.close_all)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Outbox and SMTP pool counters for monitoring"""
+        return {"outbox": self.outbox.get_stats(), "smtp": dict(self.pool.stats)}
 
 
 # Create singleton instance
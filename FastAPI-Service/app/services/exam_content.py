@@ -0,0 +1,204 @@
+"""
+Exam content versions and change hooks
+
+`exams.content_version` and `exam_skills.content_version` are bumped by every
+write endpoint that changes what students fetch:
+
+- skill scope: the skill row and its sections / question groups / questions
+- exam scope: the exam row and the test / skill headers listed under it
+
+Derived data (compiled answer keys, serialized skill trees, ETags) is keyed by
+these versions, so a bump makes every stale entry in every worker stop
+matching. The current versions are mirrored in Redis so that a request can be
+validated (304) without touching MySQL; without Redis they are read from the
+database.
+"""
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.exam_models import Exam, ExamQuestionGroup, ExamSection, ExamSkill, ExamTest
+from app.services.redis_client import get_redis, mark_redis_failed
+
+SKILL = "skill"
+EXAM = "exam"
+SECTION = "section"
+GROUP = "group"
+
+_VERSIONED_MODELS = {SKILL: ExamSkill, EXAM: Exam}
+
+VERSION_PREFIX = "exam_content:version:"
+VERSION_TTL_SECONDS = 86400
+TOMBSTONE = b"deleted"  # Row is gone; never overwritten by a stale reader
+
+# Versions only move forward, so a reader that loaded an old value from MySQL
+# cannot overwrite a newer one published by a writer.
+_SET_IF_NEWER = """
+local current = redis.call('GET', KEYS[1])
+if current == false or (tonumber(current) and tonumber(current) < tonumber(ARGV[1])) then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+end
+return 1
+"""
+
+# (kind, id) -> owning skill id for sections and question groups
+_PARENT_SKILLS_MAX_ENTRIES = 10000
+_parent_skills: "OrderedDict[Tuple[str, int], int]" = OrderedDict()
+
+
+def remember_parent_skill(kind: str, object_id: int, skill_id: Optional[int]) -> None:
+    """Record the skill owning a section / question group"""
+    if skill_id is None:
+        return
+    _parent_skills[(kind, object_id)] = skill_id
+    _parent_skills.move_to_end((kind, object_id))
+    while len(_parent_skills) > _PARENT_SKILLS_MAX_ENTRIES:
+        _parent_skills.popitem(last=False)
+
+
+def cached_parent_skill(kind: str, object_id: int) -> Optional[int]:
+    """
+    Skill owning a section / question group, if this worker has seen it
+
+    Only used to build ETags: a stale mapping yields a tag that cannot match,
+    because moving an object bumps the version of its old skill.
+    """
+    return _parent_skills.get((kind, object_id))
+
+
+async def skill_id_for_section(db: AsyncSession, section_id: int) -> Optional[int]:
+    """Skill owning a section"""
+    result = await db.execute(
+        select(ExamSection.exam_skill_id).where(ExamSection.id == section_id)
+    )
+    skill_id = result.scalar_one_or_none()
+    remember_parent_skill(SECTION, section_id, skill_id)
+    return skill_id
+
+
+async def skill_id_for_group(db: AsyncSession, group_id: int) -> Optional[int]:
+    """Skill owning a question group"""
+    result = await db.execute(
+        select(ExamSection.exam_skill_id)
+        .join(ExamQuestionGroup, ExamQuestionGroup.exam_section_id == ExamSection.id)
+        .where(ExamQuestionGroup.id == group_id)
+    )
+    skill_id = result.scalar_one_or_none()
+    remember_parent_skill(GROUP, group_id, skill_id)
+    return skill_id
+
+
+async def skill_ids_for_test(db: AsyncSession, test_id: int) -> List[int]:
+    """Skills of an exam test"""
+    result = await db.execute(
+        select(ExamSkill.id).where(ExamSkill.exam_test_id == test_id)
+    )
+    return list(result.scalars())
+
+
+async def skill_ids_for_exam(db: AsyncSession, exam_id: int) -> List[int]:
+    """Skills of every test of an exam"""
+    result = await db.execute(
+        select(ExamSkill.id)
+        .join(ExamTest, ExamSkill.exam_test_id == ExamTest.id)
+        .where(ExamTest.exam_id == exam_id)
+    )
+    return list(result.scalars())
+
+
+async def exam_id_for_test(db: AsyncSession, test_id: Optional[int]) -> Optional[int]:
+    """Exam owning a test"""
+    if test_id is None:
+        return None
+    result = await db.execute(
+        select(ExamTest.exam_id).where(ExamTest.id == test_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _publish_version(scope: str, scope_id: int, version: Optional[int]) -> None:
+    redis = await get_redis()
+    if redis is None:
+        return
+    key = f"{VERSION_PREFIX}{scope}:{scope_id}"
+    try:
+        if version is None:
+            await redis.set(key, TOMBSTONE, ex=VERSION_TTL_SECONDS)
+        else:
+            await redis.eval(_SET_IF_NEWER, 1, key, version, VERSION_TTL_SECONDS)
+    except Exception as e:
+        mark_redis_failed(e)
+
+
+async def _read_version(db: AsyncSession, scope: str, scope_id: int) -> Optional[int]:
+    model = _VERSIONED_MODELS[scope]
+    result = await db.execute(
+        select(model.content_version).where(model.id == scope_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_content_version(
+    scope: str,
+    scope_id: Optional[int],
+    db: Optional[AsyncSession] = None,
+) -> Optional[int]:
+    """
+    Current content version of a skill / exam
+
+    Redis first; on a miss (or without Redis) the version is read from `db`
+    and published. Returns None if the row does not exist or the version
+    cannot be determined without a database session.
+    """
+    if scope_id is None:
+        return None
+
+    redis = await get_redis()
+    if redis is not None:
+        try:
+            raw = await redis.get(f"{VERSION_PREFIX}{scope}:{scope_id}")
+            if raw == TOMBSTONE:
+                return None
+            if raw is not None:
+                return int(raw)
+        except Exception as e:
+            mark_redis_failed(e)
+            redis = None
+
+    if db is None:
+        return None
+    version = await _read_version(db, scope, scope_id)
+    if version is not None and redis is not None:
+        await _publish_version(scope, scope_id, version)
+    return version
+
+
+async def bump_content_version(db: AsyncSession, scope: str, scope_id: Optional[int]) -> None:
+    """Increment a content version (committed) and publish it to every worker"""
+    if scope_id is None:
+        return
+    model = _VERSIONED_MODELS[scope]
+    await db.execute(
+        update(model)
+        .where(model.id == scope_id)
+        .values(content_version=model.content_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    # Deleted rows read back as None and are published as a tombstone
+    version = await _read_version(db, scope, scope_id)
+    await _publish_version(scope, scope_id, version)
+    logger.info(f"Exam content invalidated for {scope} {scope_id} (version {version})")
+
+
+async def invalidate_skill_content(db: AsyncSession, skill_id: Optional[int]) -> None:
+    """Call after committing a change to a skill or its sections / groups / questions"""
+    await bump_content_version(db, SKILL, skill_id)
+
+
+async def invalidate_exam_content(db: AsyncSession, exam_id: Optional[int]) -> None:
+    """Call after committing a change to an exam or the tests / skill headers under it"""
+    await bump_content_version(db, EXAM, exam_id)
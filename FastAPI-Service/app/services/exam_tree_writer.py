@@ -0,0 +1,112 @@
+"""
+Bulk persistence of a whole exam skill (skill → sections → groups → questions)
+
+The tree is staged in memory first (see `ExamTree`), then written in one
+transaction with one INSERT per level:
+
+1. INSERT the skill (one row, id from the insert)
+2. INSERT every section, then SELECT their ids back
+3. INSERT every group of every section, then SELECT their ids back
+4. INSERT every question of every group
+
+MySQL has no INSERT ... RETURNING, so ids are read back per level. The parent
+rows were created in this same uncommitted transaction, so no other
+connection can add children to them, and auto-increment ids are monotonic
+within a statement. `ORDER BY id` therefore returns the new rows in insert
+order. A 40-question test costs 6 statements and a single commit. Any failure
+rolls back the whole skill.
+"""
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.exam_models import ExamQuestion, ExamQuestionGroup, ExamSection, ExamSkill
+
+
+class ExamTree:
+    """In-memory skill tree waiting to be written"""
+
+    def __init__(self, **skill_values: Any):
+        self.skill = skill_values
+        self.sections: List[Dict[str, Any]] = []
+
+    def add_section(self, name: str, content: Optional[str] = "", audio: Optional[str] = None) -> Dict[str, Any]:
+        section = {"values": {"name": name, "content": content, "audio": audio}, "groups": []}
+        self.sections.append(section)
+        return section
+
+    @staticmethod
+    def add_group(section: Dict[str, Any], name: str, question_type: str, content: Optional[str] = "") -> Dict[str, Any]:
+        group = {"values": {"name": name, "question_type": question_type, "content": content}, "questions": []}
+        section["groups"].append(group)
+        return group
+
+    @staticmethod
+    def add_question(group: Dict[str, Any], **question_values: Any) -> None:
+        group["questions"].append(question_values)
+
+    @property
+    def question_count(self) -> int:
+        return sum(len(group["questions"]) for section in self.sections for group in section["groups"])
+
+
+async def _new_ids(db: AsyncSession, id_column: Any, parent_column: Any, parent_ids: List[int]) -> List[int]:
+    """Ids of the rows just inserted under these (new) parents, in insert order"""
+    result = await db.execute(
+        select(id_column).where(parent_column.in_(parent_ids)).order_by(id_column)
+    )
+    return [row[0] for row in result.all()]
+
+
+async def write_exam_tree(db: AsyncSession, tree: ExamTree) -> int:
+    """
+    Write a staged tree in one transaction
+
+    Returns:
+        Id of the new skill
+
+    Raises:
+        Exception: Anything the database raises; the transaction is rolled back
+    """
+    try:
+        result = await db.execute(insert(ExamSkill).values(**tree.skill))
+        skill_id = result.inserted_primary_key[0]
+
+        if tree.sections:
+            await db.execute(
+                insert(ExamSection),
+                [{"exam_skill_id": skill_id, **section["values"]} for section in tree.sections]
+            )
+            section_ids = await _new_ids(db, ExamSection.id, ExamSection.exam_skill_id, [skill_id])
+
+            group_rows = []
+            groups = []
+            for section_id, section in zip(section_ids, tree.sections):
+                for group in section["groups"]:
+                    group_rows.append({"exam_section_id": section_id, **group["values"]})
+                    groups.append(group)
+
+            if group_rows:
+                await db.execute(insert(ExamQuestionGroup), group_rows)
+                group_ids = await _new_ids(db, ExamQuestionGroup.id, ExamQuestionGroup.exam_section_id, section_ids)
+
+                question_rows = [
+                    {"question_group_id": group_id, **question}
+                    for group_id, group in zip(group_ids, groups)
+                    for question in group["questions"]
+                ]
+                if question_rows:
+                    await db.execute(insert(ExamQuestion), question_rows)
+
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    logger.info(
+        f"Wrote skill {skill_id}: {len(tree.sections)} sections, "
+        f"{sum(len(s['groups']) for s in tree.sections)} groups, {tree.question_count} questions"
+    )
+    return skill_id
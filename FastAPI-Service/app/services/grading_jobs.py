@@ -0,0 +1,197 @@
+"""
+Durable AI grading jobs (Writing / Speaking)
+
+The HTTP request only records a `grading_jobs` row and enqueues its id on the
+Celery broker; a worker (`celery -A app.worker worker`) runs the LLM call and
+persists the result. Clients poll `GET /grading/jobs/{id}` or subscribe to
+`GET /grading/jobs/{id}/events`.
+
+Failed attempts are retried with backoff; after GRADING_JOB_MAX_RETRIES the job
+is moved to DEAD_LETTER and kept for manual inspection, and the wallet
+reservation made at submit time is refunded. If the broker is down,
+the job runs inside the web worker instead so submissions are never lost.
+"""
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.grading_models import GradingJob, GradingJobStatus
+from app.services.chatgpt_service import chatgpt_service
+from app.services.wallet_ledger import wallet_ledger
+
+TERMINAL_STATUSES = {GradingJobStatus.SUCCEEDED, GradingJobStatus.DEAD_LETTER}
+
+# Keep references to in-process fallback tasks so they are not garbage collected
+_inline_tasks: Set[asyncio.Task] = set()
+
+
+def format_grading_result(question_id: Optional[int], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a raw grading result to the GradingResponse fields"""
+    return {
+        "question_id": question_id,
+        "overall_band": result.get("overall_score", 0),
+        "criteria_scores": result.get("criteria_scores", {}),
+        "criteria_feedback": result.get("criteria_feedback", {}),
+        "strengths": result.get("strengths", []),
+        "weaknesses": result.get("weaknesses", []),
+        "detailed_feedback": result.get("detailed_feedback", ""),
+        "suggestions": result.get("suggestions", []),
+        "band_justification": result.get("band_justification"),
+        "pronunciation_note": result.get("pronunciation_note"),
+    }
+
+
+def serialize_job(job: GradingJob) -> Dict[str, Any]:
+    """Public view of a grading job"""
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "skill_type": job.skill_type,
+        "question_id": job.question_id,
+        "attempts": job.attempts,
+        "cost": job.cost,
+        "result": job.result,
+        "error": job.error if job.status == GradingJobStatus.DEAD_LETTER else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+async def create_grading_job(
+    db: AsyncSession,
+    user_id: int,
+    skill_type: str,
+    question_id: Optional[int],
+    payload: Dict[str, Any],
+    cost: int,
+) -> GradingJob:
+    """Persist a QUEUED job (committed, so a worker can pick it up immediately)"""
+    job = GradingJob(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        skill_type=skill_type,
+        question_id=question_id,
+        status=GradingJobStatus.QUEUED,
+        payload=payload,
+        cost=cost,
+        created_at=datetime.utcnow(),
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_grading_job(db: AsyncSession, job_id: str) -> Optional[GradingJob]:
+    """Load a job by id"""
+    return await db.get(GradingJob, job_id)
+
+
+async def enqueue_grading_job(job_id: str) -> None:
+    """Send the job to the Celery broker, or run it in-process if the broker is unreachable"""
+    from app.worker import run_grading_job_task
+
+    try:
+        await asyncio.to_thread(run_grading_job_task.apply_async, args=[job_id], retry=False)
+        logger.info(f"Grading job {job_id} enqueued")
+    except Exception as e:
+        logger.warning(f"Celery broker unavailable ({str(e)}), running grading job {job_id} in-process")
+        task = asyncio.create_task(run_grading_job_inline(job_id))
+        _inline_tasks.add(task)
+        task.add_done_callback(_inline_tasks.discard)
+
+
+async def run_grading_job(job_id: str) -> None:
+    """
+    Execute one attempt of a grading job
+
+    Raises the grading error after recording it, so the caller can retry.
+    """
+    async with AsyncSessionLocal() as db:
+        job = await get_grading_job(db, job_id)
+        if job is None:
+            logger.warning(f"Grading job {job_id} not found, skipping")
+            return
+        if job.status in TERMINAL_STATUSES:
+            # Redelivered after completion (acks_late); nothing to do
+            return
+
+        job.status = GradingJobStatus.RUNNING
+        job.attempts += 1
+        job.started_at = job.started_at or datetime.utcnow()
+        await db.commit()
+
+        payload = job.payload
+        try:
+            if job.skill_type == "writing":
+                result = await chatgpt_service.grade_writing_answer(
+                    question=payload["question_text"],
+                    answer=payload.get("answer") or "",
+                    exam_type=payload.get("exam_type", "IELTS"),
+                    criteria=payload.get("criteria"),
+                )
+            else:
+                result = await chatgpt_service.grade_speaking_answer(
+                    question=payload["question_text"],
+                    transcript=payload.get("transcript") or "",
+                    exam_type=payload.get("exam_type", "IELTS"),
+                    criteria=payload.get("criteria"),
+                )
+        except Exception as e:
+            job.status = GradingJobStatus.RETRYING
+            job.error = str(e)
+            await db.commit()
+            logger.error(f"Grading job {job_id} attempt {job.attempts} failed: {str(e)}")
+            raise
+
+        job.status = GradingJobStatus.SUCCEEDED
+        job.result = format_grading_result(job.question_id, result)
+        job.error = None
+        job.finished_at = datetime.utcnow()
+        if payload.get("wallet_transaction_id"):
+            # Same transaction as the status: a terminal job never leaves a HOLD behind
+            await wallet_ledger.confirm(db, payload["wallet_transaction_id"], commit=False)
+        await db.commit()
+        logger.info(f"Grading job {job_id} succeeded after {job.attempts} attempt(s)")
+
+
+async def mark_dead_letter(job_id: str, error: str) -> None:
+    """Give up on a job after the last retry"""
+    async with AsyncSessionLocal() as db:
+        job = await get_grading_job(db, job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return
+        job.status = GradingJobStatus.DEAD_LETTER
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        if job.payload.get("wallet_transaction_id"):
+            await wallet_ledger.refund(
+                db, job.payload["wallet_transaction_id"], reason=f"grading job {job_id} failed", commit=False
+            )
+        await db.commit()
+    logger.error(f"Grading job {job_id} moved to dead letter: {error}")
+
+
+def retry_countdown(retries: int) -> float:
+    """Exponential backoff between attempts"""
+    return settings.GRADING_JOB_RETRY_BACKOFF_SECONDS * (2 ** retries)
+
+
+async def run_grading_job_inline(job_id: str) -> None:
+    """In-process fallback with the same retry / dead-letter policy as the Celery task"""
+    for retries in range(settings.GRADING_JOB_MAX_RETRIES + 1):
+        try:
+            await run_grading_job(job_id)
+            return
+        except Exception as e:
+            if retries >= settings.GRADING_JOB_MAX_RETRIES:
+                await mark_dead_letter(job_id, str(e))
+                return
+            await asyncio.sleep(retry_countdown(retries))
@@ -0,0 +1,63 @@
+"""
+Conditional GET helpers for versioned exam content
+
+ETags are strong and derived from the content version (see exam_content):
+
+    "skill-12-s1-v7"
+
+A client sending the tag back in If-None-Match gets 304 without a body. When
+the URL itself carries the current version (`?v=7`), the payload can never
+change and is marked immutable; otherwise clients revalidate every time.
+"""
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from app.config import settings
+
+
+def make_etag(resource: str, version: Optional[int]) -> Optional[str]:
+    """Strong ETag for a resource at a content version (None if the version is unknown)"""
+    if version is None:
+        return None
+    return f'"{resource}-v{version}"'
+
+
+def is_not_modified(request: Request, etag: Optional[str]) -> bool:
+    """True if If-None-Match already names this ETag"""
+    if etag is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def cache_control(version: Optional[int], requested_version: Optional[int]) -> str:
+    if version is not None and requested_version == version:
+        return f"public, max-age={settings.EXAM_CONTENT_IMMUTABLE_MAX_AGE_SECONDS}, immutable"
+    return "public, no-cache"
+
+
+def set_cache_headers(
+    response: Response,
+    etag: Optional[str],
+    version: Optional[int],
+    requested_version: Optional[int] = None,
+) -> None:
+    """Attach ETag / Cache-Control to a 200 response"""
+    if etag is None:
+        return
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control(version, requested_version)
+
+
+def not_modified(etag: str, version: Optional[int], requested_version: Optional[int] = None) -> Response:
+    """Empty 304 response"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control(version, requested_version)},
+    )
@@ -0,0 +1,160 @@
+"""
+Shared outbound HTTP client (PayOS, Google OAuth)
+
+One httpx.AsyncClient per worker, opened in the app lifespan and closed on
+shutdown, so calls to the same host reuse kept-alive connections instead of
+paying a TCP + TLS handshake each time.
+
+- HTTP/2 when the h2 package is installed (httpx[http2]), HTTP/1.1 otherwise
+- Split timeouts: a dead host fails after HTTP_CONNECT_TIMEOUT_SECONDS, a slow
+  one after HTTP_READ_TIMEOUT_SECONDS
+- `CircuitBreaker` per upstream: after HTTP_BREAKER_FAILURE_THRESHOLD
+  consecutive failures (transport errors, timeouts, 5xx) calls fail fast for
+  HTTP_BREAKER_RESET_SECONDS; then a single trial request decides whether the
+  upstream is back
+"""
+import importlib.util
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from loguru import logger
+
+from app.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.HTTP_CLIENT_HTTP2 and importlib.util.find_spec("h2") is not None
+    if settings.HTTP_CLIENT_HTTP2 and not http2:
+        logger.warning("h2 is not installed, outbound HTTP uses HTTP/1.1")
+
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(
+            connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+            read=settings.HTTP_READ_TIMEOUT_SECONDS,
+            write=settings.HTTP_READ_TIMEOUT_SECONDS,
+            pool=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared client (created on first use outside the app lifespan)"""
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def open_http_client() -> None:
+    """Create the shared client (app startup)"""
+    get_http_client()
+    logger.info("Outbound HTTP client ready")
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its connections (app shutdown)"""
+    global _client
+
+    if _client is not None:
+        try:
+            await _client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client: {str(e)}")
+        _client = None
+
+
+class CircuitBreaker:
+    """Fail fast while an upstream keeps failing"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_started: Optional[float] = None
+        self.stats: Dict[str, int] = {"failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (half-open: one trial call at a time)"""
+        state = self.state
+        if state == "closed":
+            return True
+
+        now = time.monotonic()
+        # A trial that never reported back (e.g. cancelled) does not block forever
+        if state == "half_open" and (
+            self._trial_started is None or now - self._trial_started > self.reset_timeout
+        ):
+            self._trial_started = now
+            return True
+
+        self.stats["rejected"] += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info(f"Circuit {self.name} closed")
+        self.failures = 0
+        self._opened_at = None
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.stats["failures"] += 1
+        if self._trial_started is not None or (
+            self._opened_at is None and self.failures >= self.failure_threshold
+        ):
+            self.stats["opened"] += 1
+            logger.warning(
+                f"Circuit {self.name} open for {self.reset_timeout:.0f}s after {self.failures} failures"
+            )
+            self._opened_at = time.monotonic()
+            self._trial_started = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "state": self.state, "consecutive_failures": self.failures}
+
+
+async def send_request(breaker: CircuitBreaker, method: str, url: str, **kwargs: Any) -> Optional[httpx.Response]:
+    """
+    Request through the shared client, guarded by a circuit breaker
+
+    Returns:
+        The response (any status), or None when the circuit is open or the
+        request failed in transport (already logged)
+    """
+    if not breaker.allow():
+        logger.warning(f"Circuit {breaker.name} open, skipped {method} {url}")
+        return None
+
+    try:
+        response = await get_http_client().request(method, url, **kwargs)
+    except httpx.HTTPError as e:
+        breaker.record_failure()
+        logger.error(f"{breaker.name} request failed: {method} {url}: {type(e).__name__} {str(e)}")
+        return None
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
@@ -0,0 +1,144 @@
+"""
+Incremental JSON parser for streamed completions
+
+Feeds text deltas as they arrive from the Chat Completions stream and emits
+selected sub-values (e.g. each element of "question_groups" or "parts") as
+soon as they are syntactically complete, without waiting for the full
+document. Text before the first '{' or '[' (markdown fences, preamble) is
+ignored.
+
+Usage:
+    parser = IncrementalJSONParser([("passage",), ("question_groups", "*")])
+    for delta in stream:
+        for path, value in parser.feed(delta):
+            ...  # path == ("question_groups", 0), value == {...}
+"""
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+WILDCARD = "*"
+
+Path = Tuple[Any, ...]
+
+
+class _Frame:
+    """An open object/array while scanning"""
+
+    __slots__ = ("kind", "start", "path", "key", "index")
+
+    def __init__(self, kind: str, start: int, path: Path):
+        self.kind = kind  # "object" or "array"
+        self.start = start
+        self.path = path
+        self.key: Optional[str] = None  # Current key (objects)
+        self.index = 0  # Current element index (arrays)
+
+
+class IncrementalJSONParser:
+    """Single-pass scanner that emits watched containers when they close"""
+
+    def __init__(self, watch: Sequence[Path]):
+        """
+        Args:
+            watch: Paths to emit; "*" matches any array index / object key
+        """
+        self.watch = [tuple(p) for p in watch]
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string: Optional[Tuple[int, int]] = None
+        self._started = False
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self._text
+
+    def _matches(self, path: Path) -> bool:
+        for pattern in self.watch:
+            if len(pattern) == len(path) and all(
+                p == WILDCARD or p == v for p, v in zip(pattern, path)
+            ):
+                return True
+        return False
+
+    def _child_path(self) -> Path:
+        if not self._stack:
+            return ()
+        parent = self._stack[-1]
+        if parent.kind == "object":
+            return parent.path + (parent.key,)
+        return parent.path + (parent.index,)
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        """
+        Consume a text delta
+
+        Returns:
+            (path, value) for every watched container completed by this chunk
+        """
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        text = self._text
+        emitted: List[Tuple[Path, Any]] = []
+
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = (self._string_start, i + 1)
+                i += 1
+                continue
+
+            if not self._started:
+                if ch in "{[":
+                    self._started = True
+                else:
+                    i += 1
+                    continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._stack.append(_Frame("object" if ch == "{" else "array", i, self._child_path()))
+            elif ch in "}]":
+                if not self._stack:
+                    break
+                frame = self._stack.pop()
+                if self._matches(frame.path):
+                    try:
+                        emitted.append((frame.path, json.loads(text[frame.start:i + 1])))
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Skipping malformed streamed value at {frame.path}: {str(e)}")
+                if not self._stack:
+                    self.done = True
+                    i += 1
+                    break
+            elif ch == ":":
+                frame = self._stack[-1] if self._stack else None
+                if frame is not None and frame.kind == "object" and self._last_string:
+                    start, end = self._last_string
+                    frame.key = json.loads(text[start:end])
+            elif ch == ",":
+                frame = self._stack[-1] if self._stack else None
+                if frame is not None and frame.kind == "array":
+                    frame.index += 1
+            i += 1
+
+        self._pos = i
+        return emitted
@@ -0,0 +1,156 @@
+"""
+Content-addressed response cache for ChatGPT completions
+
+Two tiers:
+- In-process LRU (per worker, hot entries, no network hop)
+- Redis (shared by all uvicorn workers, survives restarts)
+
+The cache key is a SHA-256 over the normalized request (model, messages,
+temperature, max_tokens), so identical prompts hit the same entry no matter
+which endpoint produced them.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.config import settings
+from app.services.redis_client import get_redis, mark_redis_failed
+
+KEY_PREFIX = "llm:completion:"
+
+
+def make_request_fingerprint(
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    """
+    Build a stable hash for a completion request
+
+    Message content is stripped and only role/content are kept, so
+    whitespace-only differences in prompt templates map to the same key.
+    """
+    normalized = {
+        "model": model,
+        "messages": [
+            {"role": m.get("role", ""), "content": (m.get("content") or "").strip()}
+            for m in messages
+        ],
+        "temperature": round(float(temperature), 3),
+        "max_tokens": int(max_tokens),
+    }
+    payload = json.dumps(normalized, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier (LRU + Redis) cache for completion text (or any other string payload)
+
+    With binary=True values are bytes and are stored / returned as-is.
+    """
+
+    def __init__(self, max_entries: int, default_ttl: int, key_prefix: str = KEY_PREFIX, binary: bool = False):
+        self.key_prefix = key_prefix
+        self.binary = binary
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._local: "OrderedDict[str, Tuple[float, Union[str, bytes]]]" = OrderedDict()
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "stores": 0,
+        }
+
+    def _get_local(self, key: str) -> Optional[Union[str, bytes]]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: Union[str, bytes], ttl: int) -> None:
+        self._local[key] = (time.monotonic() + ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Union[str, bytes]]:
+        """Look up a cached completion (LRU first, then Redis)"""
+        value = self._get_local(key)
+        if value is not None:
+            self.stats["hits"] += 1
+            self.stats["local_hits"] += 1
+            return value
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(self.key_prefix + key)
+                ttl = await redis.ttl(self.key_prefix + key) if raw is not None else -1
+            except Exception as e:
+                mark_redis_failed(e)
+                raw = None
+            if raw is not None:
+                value = raw if self.binary else raw.decode("utf-8")
+                # Promote into the LRU for the remaining lifetime of the Redis entry
+                self._set_local(key, value, ttl if ttl and ttl > 0 else self.default_ttl)
+                self.stats["hits"] += 1
+                self.stats["redis_hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Union[str, bytes], ttl: Optional[int] = None) -> None:
+        """Store a completion in both tiers"""
+        ttl = ttl or self.default_ttl
+        self._set_local(key, value, ttl)
+        self.stats["stores"] += 1
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                await redis.set(self.key_prefix + key, value if self.binary else value.encode("utf-8"), ex=ttl)
+            except Exception as e:
+                mark_redis_failed(e)
+
+    async def delete(self, key: str) -> None:
+        """Drop an entry from both tiers (other workers' LRUs keep theirs until it expires)"""
+        self._local.pop(key, None)
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                await redis.delete(self.key_prefix + key)
+            except Exception as e:
+                mark_redis_failed(e)
+
+    def clear_local(self) -> None:
+        """Drop all in-process entries (Redis entries expire on their own)"""
+        self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "local_entries": len(self._local),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Singleton instance
+llm_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    default_ttl=settings.LLM_CACHE_TTL_SECONDS,
+)
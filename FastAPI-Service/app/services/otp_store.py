@@ -0,0 +1,258 @@
+"""
+OTP store (codes for /otp/send and /otp/verify)
+
+- Codes are stored as HMAC-SHA256(SECRET_KEY, destination:code), never in clear
+- Each code expires after OTP_TTL_SECONDS and is deleted after OTP_MAX_ATTEMPTS
+  wrong guesses
+- Sends are counted per destination (OTP_SEND_LIMIT per OTP_SEND_WINDOW_SECONDS)
+  with an atomic counter
+
+Two backends with the same behaviour:
+- Redis (shared by all workers): a hash per code with a native TTL; verify and
+  the send counter are Lua scripts, so concurrent requests cannot race
+- In-process fallback when Redis is unavailable: a dict whose expired entries
+  are evicted by a timer wheel, swept on every call (no background task)
+"""
+import hashlib
+import hmac
+import math
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from app.config import settings
+from app.services.redis_client import get_redis, mark_redis_failed
+
+CODE_PREFIX = "otp:code:"
+SEND_PREFIX = "otp:send:"
+
+# verify() results
+OK = "ok"
+MISSING = "missing"  # never sent, expired or already used
+INVALID = "invalid"  # wrong code, attempts left
+LOCKED = "locked"  # too many wrong codes, code deleted
+PURPOSE_MISMATCH = "purpose_mismatch"
+
+# KEYS[1] = code hash key; ARGV = code hmac, purpose, max attempts
+_VERIFY_SCRIPT = """
+local stored = redis.call("HMGET", KEYS[1], "hash", "purpose")
+if not stored[1] then
+    return "missing"
+end
+if stored[1] ~= ARGV[1] then
+    local attempts = redis.call("HINCRBY", KEYS[1], "attempts", 1)
+    if attempts >= tonumber(ARGV[3]) then
+        redis.call("DEL", KEYS[1])
+        return "locked"
+    end
+    return "invalid"
+end
+if stored[2] ~= ARGV[2] then
+    return "purpose_mismatch"
+end
+return "ok"
+"""
+
+# KEYS[1] = send counter; ARGV[1] = window (seconds). Returns {count, ttl}
+_COUNT_SEND_SCRIPT = """
+local count = redis.call("INCR", KEYS[1])
+if count == 1 then
+    redis.call("EXPIRE", KEYS[1], ARGV[1])
+end
+return {count, redis.call("TTL", KEYS[1])}
+"""
+
+
+def _normalize(destination: str) -> str:
+    return destination.strip().lower()
+
+
+def hash_code(destination: str, code: str) -> str:
+    """HMAC of a code, bound to its destination"""
+    message = f"{_normalize(destination)}:{code.strip()}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel with one-second slots
+
+    Keys are filed under their expiry second modulo the wheel size; `advance`
+    visits every slot passed since the last call and returns the keys filed
+    there. Keys due in a later rotation are returned too; callers check the real
+    expiry and re-schedule them.
+    """
+
+    def __init__(self, slots: int):
+        self.size = slots
+        self.slots: List[Set[str]] = [set() for _ in range(slots)]
+        self.cursor = math.floor(time.monotonic())
+
+    def schedule(self, key: str, expires_at: float) -> None:
+        self.slots[math.ceil(expires_at) % self.size].add(key)
+
+    def advance(self, now: float) -> Set[str]:
+        due: Set[str] = set()
+        target = math.floor(now)
+        for tick in range(self.cursor + 1, min(target, self.cursor + self.size) + 1):
+            slot = self.slots[tick % self.size]
+            due |= slot
+            slot.clear()
+        self.cursor = max(self.cursor, target)
+        return due
+
+
+class MemoryOTPBackend:
+    """Per-worker fallback (codes are not shared between workers)"""
+
+    def __init__(self, wheel_slots: int):
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._wheel = TimerWheel(wheel_slots)
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        for key in self._wheel.advance(now):
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if entry[0] <= now:
+                del self._entries[key]
+            else:
+                self._wheel.schedule(key, entry[0])
+
+    def _get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def _set(self, key: str, value: Any, ttl: float) -> None:
+        expires_at = time.monotonic() + ttl
+        self._entries[key] = (expires_at, value)
+        self._wheel.schedule(key, expires_at)
+
+    async def count_send(self, destination: str, window: int) -> Tuple[int, int]:
+        self._sweep()
+        key = SEND_PREFIX + destination
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._set(key, 1, window)
+            return 1, window
+        expires_at, count = entry
+        self._entries[key] = (expires_at, count + 1)
+        return count + 1, max(1, math.ceil(expires_at - time.monotonic()))
+
+    async def save(self, destination: str, code_hash: str, purpose: str, email: str, ttl: int) -> None:
+        self._sweep()
+        self._set(CODE_PREFIX + destination, {"hash": code_hash, "purpose": purpose, "email": email, "attempts": 0}, ttl)
+
+    async def verify(self, destination: str, code_hash: str, purpose: str, max_attempts: int) -> str:
+        self._sweep()
+        key = CODE_PREFIX + destination
+        stored = self._get(key)
+        if stored is None:
+            return MISSING
+        if not hmac.compare_digest(stored["hash"], code_hash):
+            stored["attempts"] += 1
+            if stored["attempts"] >= max_attempts:
+                del self._entries[key]
+                return LOCKED
+            return INVALID
+        if stored["purpose"] != purpose:
+            return PURPOSE_MISMATCH
+        return OK
+
+    async def discard(self, destination: str) -> None:
+        self._entries.pop(CODE_PREFIX + destination, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisOTPBackend:
+    """Shared backend; expiry is left to Redis key TTLs"""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def count_send(self, destination: str, window: int) -> Tuple[int, int]:
+        count, ttl = await self.redis.eval(_COUNT_SEND_SCRIPT, 1, SEND_PREFIX + destination, window)
+        return int(count), max(1, int(ttl))
+
+    async def save(self, destination: str, code_hash: str, purpose: str, email: str, ttl: int) -> None:
+        key = CODE_PREFIX + destination
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={"hash": code_hash, "purpose": purpose, "email": email, "attempts": 0})
+            pipe.expire(key, ttl)
+            await pipe.execute()
+
+    async def verify(self, destination: str, code_hash: str, purpose: str, max_attempts: int) -> str:
+        result = await self.redis.eval(_VERIFY_SCRIPT, 1, CODE_PREFIX + destination, code_hash, purpose, max_attempts)
+        return result.decode() if isinstance(result, bytes) else result
+
+    async def discard(self, destination: str) -> None:
+        await self.redis.delete(CODE_PREFIX + destination)
+
+
+class OTPStore:
+    """OTP codes and send throttling (Redis, or in-process without Redis)"""
+
+    def __init__(self, ttl: int, max_attempts: int, send_limit: int, send_window: int):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.send_limit = send_limit
+        self.send_window = send_window
+        self.memory = MemoryOTPBackend(wheel_slots=max(ttl, send_window) + 1)
+
+    async def _call(self, method: str, *args: Any) -> Any:
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                return await getattr(RedisOTPBackend(redis), method)(*args)
+            except Exception as e:
+                mark_redis_failed(e)
+        return await getattr(self.memory, method)(*args)
+
+    async def allow_send(self, destination: str) -> Tuple[bool, int]:
+        """
+        Count a send to this destination
+
+        Returns:
+            (allowed, seconds until the window resets)
+        """
+        count, retry_after = await self._call("count_send", _normalize(destination), self.send_window)
+        if count > self.send_limit:
+            logger.warning(f"OTP send limit reached for {destination} ({count - 1}/{self.send_limit})")
+            return False, retry_after
+        return True, retry_after
+
+    async def save(self, destination: str, code: str, purpose: str, email: str) -> None:
+        """Store a new code for the destination (replaces any previous one)"""
+        await self._call("save", _normalize(destination), hash_code(destination, code), purpose, email, self.ttl)
+
+    async def verify(self, destination: str, code: str, purpose: str) -> str:
+        """
+        Check a code; the code stays valid until `discard` (so a failed
+        registration step can be retried with it)
+
+        Returns:
+            OK, MISSING, INVALID, LOCKED or PURPOSE_MISMATCH
+        """
+        return await self._call(
+            "verify", _normalize(destination), hash_code(destination, code), purpose, self.max_attempts
+        )
+
+    async def discard(self, destination: str) -> None:
+        """Invalidate the destination's code (after successful use)"""
+        await self._call("discard", _normalize(destination))
+
+
+# Singleton instance
+otp_store = OTPStore(
+    ttl=settings.OTP_TTL_SECONDS,
+    max_attempts=settings.OTP_MAX_ATTEMPTS,
+    send_limit=settings.OTP_SEND_LIMIT,
+    send_window=settings.OTP_SEND_WINDOW_SECONDS,
+)
@@ -0,0 +1,66 @@
+"""
+Keyset (cursor) pagination on (created_at, id), newest first
+
+A cursor is an opaque url-safe token for the last row of a page; the next page
+is everything strictly older than it:
+
+    created_at < :created_at OR (created_at = :created_at AND id < :id)
+
+which an index on (..., created_at) resolves as a range scan, whatever the
+page depth (unlike OFFSET).
+"""
+import base64
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+# Sent with list responses whose body must stay a plain array
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Cursor pointing after the given row"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Parse a cursor
+
+    Raises:
+        ValueError: malformed cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def after_cursor(created_at_column: Any, id_column: Any, cursor: Tuple[datetime, int]) -> Any:
+    """WHERE clause selecting rows older than the cursor (DESC order)"""
+    created_at, row_id = cursor
+    return or_(
+        created_at_column < created_at,
+        and_(created_at_column == created_at, id_column < row_id),
+    )
+
+
+def split_page(
+    rows: List[Any],
+    limit: int,
+    key: Callable[[Any], Tuple[datetime, int]] = lambda row: (row.created_at, row.id),
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim a result fetched with LIMIT limit + 1
+
+    Returns:
+        (rows of this page, cursor of the next page or None on the last page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(*key(page[-1]))
@@ -0,0 +1,123 @@
+"""
+bcrypt off the event loop
+
+Hashing / verifying a password costs ~100-300 ms of CPU. Run inline it blocks
+every other request of the worker, so all password work goes through a
+dedicated thread pool (the bcrypt C extension releases the GIL, so threads run
+in parallel) sized to the CPU count.
+
+- `hash` / `verify` are awaitable; `verify` also returns a new hash when the
+  stored one was made with another cost factor (BCRYPT_ROUNDS), so logins
+  rehash transparently
+- `login_slot()` caps concurrent logins per worker; callers that cannot get a
+  slot within LOGIN_QUEUE_TIMEOUT_SECONDS get TimeoutError (-> 503) instead of
+  piling up behind a login burst
+- `get_stats()` exposes in-flight / queued hashes for monitoring
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.config import settings
+from app.models.auth_models import pwd_context
+
+
+class PasswordHasher:
+    """Bounded executor for bcrypt work plus a per-worker login limiter"""
+
+    def __init__(self, max_workers: int, max_concurrent_logins: int, login_queue_timeout: float):
+        self.max_workers = max_workers
+        self.max_concurrent_logins = max_concurrent_logins
+        self.login_queue_timeout = login_queue_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._login_semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self.stats: Dict[str, int] = {
+            "hashes": 0,
+            "verifications": 0,
+            "rehashes": 0,
+            "logins_rejected": 0,
+            "max_in_flight": 0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        self._in_flight += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self._in_flight)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        """bcrypt hash with the configured cost factor"""
+        self.stats["hashes"] += 1
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password against a stored hash
+
+        Returns:
+            (matches, new hash to store if the stored one uses an outdated
+            cost factor, else None)
+        """
+        if not hashed:
+            return False, None
+        self.stats["verifications"] += 1
+        ok, new_hash = await self._run(pwd_context.verify_and_update, password, hashed)
+        if ok and new_hash:
+            self.stats["rehashes"] += 1
+        return ok, (new_hash if ok else None)
+
+    @asynccontextmanager
+    async def login_slot(self):
+        """
+        Limit concurrent logins in this worker
+
+        Raises:
+            TimeoutError: No slot freed up within login_queue_timeout
+        """
+        if self._login_semaphore is None:
+            self._login_semaphore = asyncio.Semaphore(self.max_concurrent_logins)
+        try:
+            await asyncio.wait_for(self._login_semaphore.acquire(), timeout=self.login_queue_timeout)
+        except asyncio.TimeoutError:
+            self.stats["logins_rejected"] += 1
+            logger.warning(f"Login rejected: {self.max_concurrent_logins} logins already in progress")
+            raise TimeoutError("Too many concurrent logins")
+        try:
+            yield
+        finally:
+            self._login_semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool usage for monitoring"""
+        return {
+            **self.stats,
+            "workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "queued": max(0, self._in_flight - self.max_workers),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the pool (app shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_concurrent_logins=settings.LOGIN_MAX_CONCURRENCY,
+    login_queue_timeout=settings.LOGIN_QUEUE_TIMEOUT_SECONDS,
+)
@@ -7,6 +7,7 @@ from datetime import datetime
 from loguru import logger
 
 from app.config import settings
+from app.services.http_client import CircuitBreaker, send_request
 
 
 class PayOSService:
@@ -20,6 +21,11 @@ class PayOSService:
         self.checksum_key = settings.PAYOS_CHECKSUM_KEY
         self.return_url = settings.PAYOS_RETURN_URL
         self.cancel_url = settings.PAYOS_CANCEL_URL
+        self.breaker = CircuitBreaker(
+            "payos",
+            failure_threshold=settings.HTTP_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.HTTP_BREAKER_RESET_SECONDS,
+        )
     
     def _generate_signature(self, data: str) -> str:
         """Generate HMAC SHA256 signature for PayOS request"""
@@ -37,6 +43,12 @@ class PayOSService:
             "Content-Type": "application/json"
         }
     
+    async def _request(self, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        """PayOS API call on the shared client (None if PayOS is unreachable / circuit open)"""
+        return await send_request(
+            self.breaker, method, f"{self.BASE_URL}{path}", headers=self._get_headers(), **kwargs
+        )
+    
     async def create_payment_link(
         self,
         order_code: int,
@@ -95,26 +107,23 @@ class PayOSService:
             logger.debug(f"Signature data: {signature_data}")
             logger.debug(f"Signature: {signature}")
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.BASE_URL}/payment-requests",
-                    headers=self._get_headers(),
-                    json=payment_data
-                )
+            response = await self._request("POST", "/payment-requests", json=payment_data)
+            if response is None:
+                return None
+            
+            if response.status_code == 200:
+                result = response.json()
+                logger.info(f"PayOS payment link created successfully: {result}")
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    logger.info(f"PayOS payment link created successfully: {result}")
-                    
-                    # PayOS returns data in "data" field
-                    if result.get("code") == "00":
-                        return result.get("data")
-                    else:
-                        logger.error(f"PayOS returned error code: {result.get('code')} - {result.get('desc')}")
-                        return None
+                # PayOS returns data in "data" field
+                if result.get("code") == "00":
+                    return result.get("data")
                 else:
-                    logger.error(f"PayOS API error: {response.status_code} - {response.text}")
+                    logger.error(f"PayOS returned error code: {result.get('code')} - {result.get('desc')}")
                     return None
+            else:
+                logger.error(f"PayOS API error: {response.status_code} - {response.text}")
+                return None
                     
         except Exception as e:
             logger.error(f"Error creating PayOS payment link: {str(e)}")
@@ -131,23 +140,21 @@ class PayOSService:
             Payment information or None if failed
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/payment-requests/{order_code}",
-                    headers=self._get_headers()
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    # PayOS returns data in "data" field
-                    if result.get("code") == "00":
-                        return result.get("data")
-                    else:
-                        logger.error(f"PayOS returned error code: {result.get('code')} - {result.get('desc')}")
-                        return None
+            response = await self._request("GET", f"/payment-requests/{order_code}")
+            if response is None:
+                return None
+            
+            if response.status_code == 200:
+                result = response.json()
+                # PayOS returns data in "data" field
+                if result.get("code") == "00":
+                    return result.get("data")
                 else:
-                    logger.error(f"PayOS get payment info error: {response.status_code} - {response.text}")
+                    logger.error(f"PayOS returned error code: {result.get('code')} - {result.get('desc')}")
                     return None
+            else:
+                logger.error(f"PayOS get payment info error: {response.status_code} - {response.text}")
+                return None
                     
         except Exception as e:
             logger.error(f"Error getting PayOS payment info: {str(e)}")
@@ -165,14 +172,10 @@ class PayOSService:
             True if successful, False otherwise
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.put(
-                    f"{self.BASE_URL}/payment-requests/{order_code}/cancel",
-                    headers=self._get_headers(),
-                    json={"cancellationReason": reason}
-                )
-                
-                return response.status_code == 200
+            response = await self._request(
+                "PUT", f"/payment-requests/{order_code}/cancel", json={"cancellationReason": reason}
+            )
+            return response is not None and response.status_code == 200
                 
         except Exception as e:
             logger.error(f"Error cancelling PayOS payment: {str(e)}")
@@ -0,0 +1,100 @@
+"""
+Authenticated-user snapshots for get_current_user / get_optional_user
+
+A request only needs a handful of user fields (id, role, active / deleted
+flags, name and email for logs and payments), so instead of loading the User
+row on every request the auth dependencies use an immutable `Principal`,
+cached by user id in the in-process LRU and in Redis for a short TTL.
+
+Writes that change these fields (users update/delete, password changes) call
+`principal_cache.invalidate(user_id)`. Other workers may serve their local
+copy until PRINCIPAL_CACHE_TTL_SECONDS passes.
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.auth_models import Role, User
+from app.services.llm_cache import LLMResponseCache
+
+
+class Principal(BaseModel):
+    """Read-only snapshot of the authenticated user"""
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    name: Optional[str] = None
+    email: str
+    phone: Optional[str] = None
+    role_id: Optional[int] = None
+    role_name: Optional[str] = None
+    is_active: bool
+    deleted_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+
+class PrincipalCache:
+    """Two-tier cache of Principal snapshots keyed by user id"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.cache = LLMResponseCache(
+            max_entries=max_entries,
+            default_ttl=ttl,
+            key_prefix="principal:",
+        )
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[Principal]:
+        """
+        Snapshot of a user (also inactive / soft-deleted ones, so that their
+        rejection is cached too)
+
+        Returns:
+            Principal, or None if no such user exists
+        """
+        key = str(user_id)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return Principal.model_validate_json(cached)
+
+        result = await db.execute(
+            select(User, Role.name)
+            .outerjoin(Role, Role.id == User.role_id)
+            .where(User.id == user_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        user, role_name = row
+
+        principal = Principal(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            phone=user.phone,
+            role_id=user.role_id,
+            role_name=role_name,
+            is_active=user.is_active,
+            deleted_at=user.deleted_at,
+            created_at=user.created_at,
+        )
+        await self.cache.set(key, principal.model_dump_json())
+        return principal
+
+    async def invalidate(self, user_id: int) -> None:
+        """Forget a user's snapshot after a change to the users row"""
+        await self.cache.delete(str(user_id))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        return self.cache.get_stats()
+
+
+# Singleton instance
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -217,3 +217,109 @@ Total: 50 questions
 
 **NOW GENERATE ALL {num_questions} QUESTIONS - START WITH QUESTION 1 AND DON'T STOP UNTIL QUESTION {num_questions}!**
 """
+
+
+# ============================================
+# CHUNKED GENERATION (passage first, then question groups in parallel)
+# ============================================
+
+def get_reading_passage_prompt(topic: str, difficulty: str, num_questions: int):
+    """
+    Generate the IELTS Reading passage only (questions are generated separately)
+    
+    Args:
+        topic: Topic for the reading passage
+        difficulty: easy, medium, hard
+        num_questions: Total number of questions the passage must support
+    """
+    return f"""
+You are creating an IELTS Academic Reading test about: {topic}
+
+Write ONLY the reading passage. Questions will be written later from this passage, so it must
+support {num_questions} questions of different types (multiple choice, short answer, TRUE/FALSE/NOT GIVEN).
+
+**PASSAGE REQUIREMENTS:**
+- Length: 800-1000 words
+- Difficulty: {difficulty}
+- Style: Academic, formal, factual (like scientific articles, historical texts, or research papers)
+- Structure: Multiple well-organized paragraphs with clear topic sentences
+- Include specific facts, names, dates, numbers and opinions of the writer that can be tested
+
+**OUTPUT FORMAT (JSON):**
+Return ONLY a valid JSON object with this EXACT structure, no markdown formatting:
+
+{{
+  "passage": {{
+    "title": "Engaging Title Related to {topic}",
+    "introduction": "You should spend about 20 minutes on Questions 1-{num_questions}, which are based on Reading Passage 1 below.",
+    "content": "[Full passage text here, multiple paragraphs separated by \\n\\n]",
+    "topic": "{topic}",
+    "word_count": 900
+  }}
+}}
+"""
+
+
+def get_reading_question_group_prompt(
+    passage: dict,
+    difficulty: str,
+    question_type: str,
+    start_number: int,
+    end_number: int,
+):
+    """
+    Generate one IELTS Reading question group for an existing passage
+    
+    Args:
+        passage: Passage object produced by get_reading_passage_prompt
+        difficulty: easy, medium, hard
+        question_type: multiple_choice, short_text, yes_no_not_given, true_false_not_given
+        start_number: First question number of the group
+        end_number: Last question number of the group
+    """
+    count = end_number - start_number + 1
+    
+    return f"""
+You are writing questions for an IELTS Academic Reading test. The passage is:
+
+TITLE: {passage.get("title", "")}
+
+{passage.get("content", "")}
+
+Write EXACTLY {count} questions of type **{question_type}**, numbered {start_number} to {end_number}.
+Difficulty: {difficulty}. All questions must be answerable from the passage above.
+
+**QUESTION TYPE RULES:**
+- multiple_choice: "answers" array of 4 objects {{"answer_content", "is_correct", "feedback"}}, exactly ONE is_correct: true;
+  correct_answer = text of the correct option; instruction "Choose the correct letter, A, B, C or D.\\n\\nWrite the correct letter in boxes {start_number}-{end_number} on your answer sheet."
+- short_text: correct_answer = EXACT words from the passage (max 3 words); instruction "Answer the questions below.\\n\\nChoose NO MORE THAN TWO WORDS AND/OR A NUMBER from the passage for each answer.\\n\\nWrite your answers in boxes {start_number}-{end_number} on your answer sheet."
+- true_false_not_given: correct_answer exactly "TRUE", "FALSE" or "NOT GIVEN"; instruction "Do the following statements agree with the information given in Reading Passage 1?\\n\\nIn boxes {start_number}-{end_number} on your answer sheet, write\\n\\nTRUE if the statement agrees with the information\\nFALSE if it contradicts the information\\nNOT GIVEN if there is no information on this"
+- yes_no_not_given: correct_answer exactly "YES", "NO" or "NOT GIVEN"; instruction "Do the following statements agree with the views/claims of the writer?\\n\\nIn boxes {start_number}-{end_number} on your answer sheet, write\\n\\nYES if the statement agrees with the views of the writer\\nNO if the statement contradicts the views of the writer\\nNOT GIVEN if it is impossible to say what the writer thinks about this"
+
+Every question needs "explanation" (30-60 words, why the answer is correct) and "locate"
+(e.g. "Paragraph 3: 'specific text'"; for NOT GIVEN explain what is missing).
+
+**OUTPUT FORMAT (JSON):**
+Return ONLY a valid JSON object, no markdown formatting:
+
+{{
+  "question_groups": [
+    {{
+      "group_name": "Questions {start_number}-{end_number}",
+      "question_type": "{question_type}",
+      "instruction": "[instruction for this question type]",
+      "questions": [
+        {{
+          "question_number": {start_number},
+          "content": "[Question content]",
+          "answers": [],  // ONLY for multiple_choice
+          "correct_answer": "[Answer]",
+          "explanation": "[Explanation]",
+          "locate": "[Location in passage]",
+          "points": 1.0
+        }}
+      ]
+    }}
+  ]
+}}
+"""
@@ -144,6 +144,46 @@ class PromptLoader:
                 exam_type, skill, topic, difficulty, num_questions, question_types
             )
     
+    def supports_chunked_generation(self, exam_type: str, skill: str) -> bool:
+        """
+        Whether a skill can be generated in parallel chunks
+        
+        Reading: passage first, then question groups per chunk.
+        Listening: each part (own audio script) independently.
+        """
+        module = self._generation_modules.get(exam_type.upper(), {}).get(skill.lower())
+        if module is None:
+            return False
+        if skill.lower() == "reading":
+            return hasattr(module, "get_reading_passage_prompt")
+        return skill.lower() == "listening"
+    
+    def get_reading_passage_prompt(
+        self,
+        exam_type: str,
+        topic: str,
+        difficulty: str,
+        num_questions: int
+    ) -> str:
+        """Get prompt that generates only the Reading passage (chunked generation)"""
+        module = self._generation_modules[exam_type.upper()]["reading"]
+        return module.get_reading_passage_prompt(topic, difficulty, num_questions)
+    
+    def get_reading_question_group_prompt(
+        self,
+        exam_type: str,
+        passage: Dict[str, Any],
+        difficulty: str,
+        question_type: str,
+        start_number: int,
+        end_number: int
+    ) -> str:
+        """Get prompt that generates one question group for an existing passage (chunked generation)"""
+        module = self._generation_modules[exam_type.upper()]["reading"]
+        return module.get_reading_question_group_prompt(
+            passage, difficulty, question_type, start_number, end_number
+        )
+    
     def get_grading_prompt(
         self,
         exam_type: str,
@@ -0,0 +1,373 @@
+"""
+Concurrency limiter and adaptive rate governor for OpenAI calls
+
+- Priority semaphore: bounds concurrent calls per worker; waiting callers are
+  served by priority (interactive grading before bulk generation), then FIFO
+- Token buckets for requests/min and tokens/min, shared by all workers through
+  Redis (falls back to per-worker buckets without Redis)
+- Callers take rate budget before a concurrency slot, one at a time in
+  priority order, so calls sleeping for budget never hold a slot and an
+  interactive call is next in line even when bulk calls are already waiting
+- Limits adapt to the `x-ratelimit-*` response headers; a 429 or an exhausted
+  budget pauses every caller (in every worker) until the limit resets
+"""
+import asyncio
+import enum
+import heapq
+import itertools
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Mapping, Optional
+
+from loguru import logger
+
+from app.config import settings
+from app.services.redis_client import get_redis, mark_redis_failed
+
+BUCKET_PREFIX = "llm:rate:bucket:"
+PAUSE_KEY = "llm:rate:pause_until"
+
+# Longest single sleep while waiting for budget (re-checks pauses / new limits)
+MAX_BUDGET_SLEEP_SECONDS = 5.0
+
+# KEYS = request bucket, token bucket; ARGV = now, then (capacity, refill rate
+# per second, requested) for each bucket. Takes from both buckets or from
+# neither. Returns the seconds to wait (0 = granted and consumed)
+_TAKE_BUDGET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local levels = {}
+local wait = 0
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[i * 3 - 1])
+    local rate = tonumber(ARGV[i * 3])
+    local requested = tonumber(ARGV[i * 3 + 1])
+    local data = redis.call("HMGET", KEYS[i], "tokens", "ts")
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < requested then
+        wait = math.max(wait, (requested - tokens) / rate)
+    end
+    levels[i] = {tokens, requested}
+end
+for i = 1, 2 do
+    local tokens = levels[i][1]
+    if wait == 0 then
+        tokens = tokens - levels[i][2]
+    end
+    redis.call("HSET", KEYS[i], "tokens", tostring(tokens), "ts", tostring(now))
+    redis.call("EXPIRE", KEYS[i], 120)
+end
+return tostring(wait)
+"""
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class RequestPriority(int, enum.Enum):
+    """Queue priority for OpenAI calls (lower value = served first)"""
+    INTERACTIVE = 0  # Student-facing grading / feedback
+    BULK = 10  # Exam generation, TTS for whole tests
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse OpenAI reset durations like '20ms', '1s', '6m0s' into seconds"""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class PrioritySemaphore:
+    """Semaphore that wakes waiters in (priority, arrival) order"""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: List[Any] = []
+        self._counter = itertools.count()
+        self._watchers: List[Any] = []  # (priority, future) of wait_for_higher() callers
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    def _waiting_above(self, priority: int) -> bool:
+        return any(p < priority for p, _, fut in self._waiters if not fut.done())
+
+    async def wait_for_higher(self, priority: int, timeout: float) -> bool:
+        """
+        Sleep up to `timeout`, waking early when a caller with a higher priority
+        than `priority` starts waiting
+
+        Returns:
+            True if such a caller is waiting
+        """
+        if self._waiting_above(priority):
+            return True
+        fut = asyncio.get_running_loop().create_future()
+        watcher = (priority, fut)
+        self._watchers.append(watcher)
+        try:
+            await asyncio.wait({fut}, timeout=timeout)
+        finally:
+            self._watchers.remove(watcher)
+        return fut.done()
+
+    def ticket(self) -> int:
+        """Arrival number, to re-queue a caller at its original place"""
+        return next(self._counter)
+
+    async def acquire(self, priority: int, ticket: Optional[int] = None) -> None:
+        if self._value > 0 and not self.waiting:
+            self._value -= 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        order = ticket if ticket is not None else next(self._counter)
+        heapq.heappush(self._waiters, (priority, order, fut))
+        for watched, watcher in self._watchers:
+            if priority < watched and not watcher.done():
+                watcher.set_result(None)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed over right before cancellation; pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._value += 1
+
+
+class _LocalBucket:
+    """Per-worker token bucket used when Redis is unavailable"""
+
+    def __init__(self):
+        self.tokens: Optional[float] = None
+        self.updated_at = time.monotonic()
+
+    def refill(self, capacity: float, rate: float) -> float:
+        now = time.monotonic()
+        if self.tokens is None:
+            self.tokens = capacity
+        self.tokens = min(capacity, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+        return self.tokens
+
+
+class OpenAIRateGovernor:
+    """Bounds concurrency and paces OpenAI calls to stay under the account rate limits"""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        safety_factor: float,
+    ):
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.safety_factor = safety_factor
+        self._semaphore = PrioritySemaphore(max_concurrency)
+        # One caller at a time takes (or sleeps for) rate budget
+        self._budget_gate = PrioritySemaphore(1)
+        self._local_buckets = {"requests": _LocalBucket(), "tokens": _LocalBucket()}
+        self._pause_until = 0.0  # wall clock, comparable across workers
+        self._active = 0
+        self.stats: Dict[str, int] = {
+            "calls": 0,
+            "rate_limited": 0,
+            "budget_waits": 0,
+            "pauses": 0,
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: RequestPriority = RequestPriority.INTERACTIVE, tokens: int = 0):
+        """
+        Wait for a concurrency slot and rate budget, then run the wrapped API call
+
+        Args:
+            priority: Queue priority while waiting for a slot
+            tokens: Estimated tokens (prompt + max completion) counted against TPM
+        """
+        await self._wait_for_budget(int(priority), tokens)
+        await self._acquire_slot(int(priority))
+        self._active += 1
+        try:
+            self.stats["calls"] += 1
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    async def _wait_for_budget(self, priority: int, tokens: int) -> None:
+        """Take rate budget, queued by priority behind other callers of this worker"""
+        ticket = self._budget_gate.ticket()
+        await self._budget_gate.acquire(priority, ticket)
+        held = True
+        try:
+            while True:
+                wait = await self._pause_remaining()
+                if wait <= 0:
+                    wait = await self._take_budget(tokens)
+                if wait <= 0:
+                    return
+                self.stats["budget_waits"] += 1
+                if await self._budget_gate.wait_for_higher(priority, min(wait, MAX_BUDGET_SLEEP_SECONDS)):
+                    # A more urgent call is queued: let it take budget first
+                    self._budget_gate.release()
+                    held = False
+                    await self._budget_gate.acquire(priority, ticket)
+                    held = True
+        finally:
+            if held:
+                self._budget_gate.release()
+
+    async def _acquire_slot(self, priority: int) -> None:
+        """Concurrency slot; not held while calls are paused (429)"""
+        while True:
+            await self._semaphore.acquire(priority)
+            try:
+                wait = await self._pause_remaining()
+            except BaseException:
+                self._semaphore.release()
+                raise
+            if wait <= 0:
+                return
+            self._semaphore.release()
+            await asyncio.sleep(min(wait, MAX_BUDGET_SLEEP_SECONDS))
+
+    async def _take_budget(self, tokens: int) -> float:
+        """
+        Take one request and `tokens` tokens, or nothing if either budget is short
+
+        Returns:
+            Seconds to wait before trying again (0 = granted)
+        """
+        budgets = []
+        for bucket, per_minute, requested in (
+            ("requests", self.requests_per_minute, 1),
+            ("tokens", self.tokens_per_minute, tokens),
+        ):
+            capacity = float(per_minute)
+            # Oversized requests wait for a full bucket
+            budgets.append((bucket, capacity, capacity / 60.0, min(float(requested), capacity)))
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                keys = [BUCKET_PREFIX + bucket for bucket, _, _, _ in budgets]
+                args = [time.time()]
+                for _, capacity, rate, requested in budgets:
+                    args.extend((capacity, rate, requested))
+                wait = await redis.eval(_TAKE_BUDGET_SCRIPT, 2, *keys, *args)
+                return float(wait)
+            except Exception as e:
+                mark_redis_failed(e)
+
+        wait = 0.0
+        for bucket, capacity, rate, requested in budgets:
+            available = self._local_buckets[bucket].refill(capacity, rate)
+            if available < requested:
+                wait = max(wait, (requested - available) / rate)
+        if wait == 0:
+            for bucket, _, _, requested in budgets:
+                self._local_buckets[bucket].tokens -= requested
+        return wait
+
+    async def _pause_remaining(self) -> float:
+        pause_until = self._pause_until
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                shared = await redis.get(PAUSE_KEY)
+                if shared is not None:
+                    pause_until = max(pause_until, float(shared))
+            except Exception as e:
+                mark_redis_failed(e)
+        return pause_until - time.time()
+
+    async def pause(self, seconds: float) -> None:
+        """Stop issuing calls in every worker for `seconds`"""
+        if seconds <= 0:
+            return
+        pause_until = time.time() + seconds
+        if pause_until <= self._pause_until:
+            return
+        self._pause_until = pause_until
+        self.stats["pauses"] += 1
+        logger.warning(f"OpenAI rate limit reached, pausing calls for {seconds:.1f}s")
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                await redis.set(PAUSE_KEY, str(pause_until), px=int(seconds * 1000) + 1)
+            except Exception as e:
+                mark_redis_failed(e)
+
+    async def observe_headers(self, headers: Mapping[str, str]) -> None:
+        """Adapt limits from the `x-ratelimit-*` headers of an OpenAI response"""
+        limit_requests = headers.get("x-ratelimit-limit-requests")
+        limit_tokens = headers.get("x-ratelimit-limit-tokens")
+        if limit_requests and limit_requests.isdigit():
+            self.requests_per_minute = max(1, int(int(limit_requests) * self.safety_factor))
+        if limit_tokens and limit_tokens.isdigit():
+            self.tokens_per_minute = max(1, int(int(limit_tokens) * self.safety_factor))
+
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is not None and remaining.isdigit() and int(remaining) == 0:
+                reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                await self.pause(reset or 1.0)
+
+    async def on_rate_limited(self, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Handle a 429: pause everyone until the limit resets"""
+        self.stats["rate_limited"] += 1
+        headers = headers or {}
+        retry_after = None
+        if headers.get("retry-after-ms"):
+            retry_after = float(headers["retry-after-ms"]) / 1000
+        elif headers.get("retry-after"):
+            retry_after = parse_reset_duration(headers["retry-after"])
+        if retry_after is None:
+            retry_after = max(
+                parse_reset_duration(headers.get("x-ratelimit-reset-requests")) or 0,
+                parse_reset_duration(headers.get("x-ratelimit-reset-tokens")) or 0,
+            ) or 5.0
+        await self.pause(retry_after)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Limiter state for monitoring"""
+        return {
+            **self.stats,
+            "active": self._active,
+            "queued": self._semaphore.waiting,
+            "waiting_for_budget": self._budget_gate.waiting,
+            "max_concurrency": self.max_concurrency,
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "paused_for": max(0.0, round(self._pause_until - time.time(), 2)),
+        }
+
+
+# Singleton instance
+rate_governor = OpenAIRateGovernor(
+    max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+    requests_per_minute=settings.OPENAI_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.OPENAI_TOKENS_PER_MINUTE,
+    safety_factor=settings.OPENAI_RATE_LIMIT_SAFETY_FACTOR,
+)
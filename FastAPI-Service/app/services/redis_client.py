@@ -0,0 +1,90 @@
+"""
+Shared async Redis client
+
+Redis is optional for this service (caching, coordination between workers).
+Callers must treat `get_redis()` returning None as "Redis unavailable" and fall
+back to in-process behaviour instead of failing the request.
+"""
+import asyncio
+import time
+from typing import Optional, Set
+
+import redis.asyncio as aioredis
+from loguru import logger
+
+from app.config import settings
+
+# Wait this long before trying to reconnect after a failure
+RECONNECT_INTERVAL_SECONDS = 30.0
+
+_client: Optional[aioredis.Redis] = None
+_retry_after: float = 0.0
+# Close tasks of dropped clients (referenced so they are not garbage-collected)
+_closing: Set[asyncio.Task] = set()
+
+
+async def get_redis() -> Optional[aioredis.Redis]:
+    """
+    Get the shared Redis client (bytes in, bytes out)
+
+    Returns:
+        Connected client, or None if Redis is not configured / unreachable
+    """
+    global _client, _retry_after
+
+    if not settings.REDIS_URL:
+        return None
+    if _client is not None:
+        return _client
+    if time.monotonic() < _retry_after:
+        return None
+
+    try:
+        client = aioredis.from_url(settings.REDIS_URL, decode_responses=False)
+        await client.ping()
+    except Exception as e:
+        _retry_after = time.monotonic() + RECONNECT_INTERVAL_SECONDS
+        logger.warning(f"Redis unavailable ({settings.REDIS_URL}): {str(e)}")
+        return None
+
+    _client = client
+    logger.info("Connected to Redis")
+    return _client
+
+
+def mark_redis_failed(error: Exception) -> None:
+    """Drop the shared client after an operation failed so the next call reconnects later"""
+    global _client, _retry_after
+
+    logger.warning(f"Redis operation failed, falling back to in-process mode: {str(error)}")
+    old_client, _client = _client, None
+    _retry_after = time.monotonic() + RECONNECT_INTERVAL_SECONDS
+
+    # Release the dropped client's connection pool in the background
+    if old_client is not None:
+        try:
+            task = asyncio.get_running_loop().create_task(_close_client(old_client))
+            _closing.add(task)
+            task.add_done_callback(_closing.discard)
+        except RuntimeError:
+            # No running loop (sync caller): nothing to schedule on
+            pass
+
+
+async def _close_client(client: aioredis.Redis) -> None:
+    try:
+        await client.aclose()
+    except Exception as e:
+        logger.warning(f"Error closing Redis client: {str(e)}")
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client"""
+    global _client
+
+    if _client is not None:
+        try:
+            await _client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing Redis client: {str(e)}")
+        _client = None
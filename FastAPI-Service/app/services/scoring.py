@@ -0,0 +1,215 @@
+"""
+Set-based scoring engine for exam submissions
+
+Scores every answer of a submission in a single pass against a compiled answer
+key (see answer_key_cache) and builds the rows for one multi-row INSERT into
+user_exam_answers.
+
+A compiled question entry:
+    {
+        "section_id", "part", "question_text", "question_type", "points",
+        "accepted": frozenset of normalized accepted answers (empty = not auto-graded),
+        "correct_answer": display form (option letter for multiple choice),
+        "metadata": review metadata parsed from options (answers, locate, explanation)
+    }
+"""
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.exam_models import ExamQuestion
+
+# Question types graded by matching against correct_answer
+AUTO_GRADED_TYPES = {"multiple_choice", "fill_blank", "true_false", "yes_no", "yes_no_not_given"}
+
+# Types whose correct_answer is a fixed choice, never a list of alternative spellings
+CHOICE_TYPES = {"multiple_choice", "true_false", "yes_no", "yes_no_not_given"}
+
+# "colour | color": alternatives must be separated by a pipe with spaces around
+# it, so dates, fractions and ratios ("12/05/2020", "9/11", "3:2") stay whole
+ALTERNATIVE_SEPARATOR = re.compile(r"\s+\|\s+")
+
+
+def normalize_answer(text: Optional[str]) -> str:
+    """Case- and whitespace-insensitive form used for comparison"""
+    return " ".join((text or "").split()).lower()
+
+
+def _parse_options(question_id: int, options: Any) -> Any:
+    if not options:
+        return None
+    try:
+        return json.loads(options) if isinstance(options, str) else options
+    except (json.JSONDecodeError, TypeError) as e:
+        logger.warning(f"Failed to parse options for question {question_id}: {e}")
+        return None
+
+
+def _correct_option_key(options: Any, correct_answer: Optional[str]) -> Optional[str]:
+    """
+    Letter / key of the correct option
+
+    Options can be:
+    1. List of objects: [{"answer_content": "...", "is_correct": true/false}, ...] -> "A", "B", ...
+    2. Dict: {"A": "...", "B": "..."} -> key whose value matches correct_answer
+    """
+    if isinstance(options, list):
+        for idx, option in enumerate(options):
+            if isinstance(option, dict) and option.get("is_correct"):
+                return chr(65 + idx)  # 0→A, 1→B, ...
+    elif isinstance(options, dict) and correct_answer:
+        correct_normalized = str(correct_answer).strip().lower()
+        for key, value in options.items():
+            if str(value).strip().lower() == correct_normalized:
+                return key
+    return None
+
+
+def _review_metadata(options: Any, explanation: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Answers array with feedback, locate and explanation shown on the review page"""
+    metadata: Dict[str, Any] = {}
+    if isinstance(options, list):
+        metadata["answers"] = options
+    elif isinstance(options, dict):
+        if "answers" in options:
+            metadata["answers"] = options["answers"]
+        if "locate" in options:
+            metadata["locate"] = options["locate"]
+        if "metadata" in options and isinstance(options["metadata"], dict):
+            metadata.update(options["metadata"])
+        # Old structure where options contains the answers directly
+        if "options" in options:
+            metadata["answers"] = options["options"]
+
+    if explanation:
+        metadata["explanation"] = explanation
+
+    # Old format: locate stored on individual answer objects
+    if "locate" not in metadata and isinstance(metadata.get("answers"), list):
+        for answer_item in metadata["answers"]:
+            if isinstance(answer_item, dict) and "locate" in answer_item:
+                metadata["locate"] = answer_item.get("locate")
+                break
+
+    return metadata or None
+
+
+def _accepted_answers(
+    question_type: str,
+    correct_answer: Optional[str],
+    option_key: Optional[str],
+    options: Any = None,
+) -> frozenset:
+    """
+    Normalized answers counted as correct
+
+    Besides correct_answer itself, fill-in types accept explicit alternatives:
+    "colour | color" (pipe with surrounding spaces) or an "accepted_answers"
+    list in options. Any other text, e.g. "12/05/2020", must match whole.
+    """
+    if question_type not in AUTO_GRADED_TYPES or not correct_answer:
+        return frozenset()
+
+    accepted = {normalize_answer(correct_answer)}
+    if question_type not in CHOICE_TYPES:
+        variants = ALTERNATIVE_SEPARATOR.split(correct_answer)
+        if isinstance(options, dict) and isinstance(options.get("accepted_answers"), list):
+            variants.extend(str(v) for v in options["accepted_answers"] if v is not None)
+        accepted.update(normalize_answer(v) for v in variants)
+    if option_key:
+        accepted.add(normalize_answer(option_key))
+    accepted.discard("")
+    return frozenset(accepted)
+
+
+def compile_question(
+    question: ExamQuestion,
+    section_id: Optional[int] = None,
+    part: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Precompute everything scoring and review need for one question"""
+    options = _parse_options(question.id, question.options)
+    option_key = _correct_option_key(options, question.correct_answer)
+    return {
+        "section_id": section_id,
+        "part": part,
+        "question_text": question.question_text or "",
+        "question_type": question.question_type,
+        "points": question.points,
+        "accepted": _accepted_answers(question.question_type, question.correct_answer, option_key, options),
+        "correct_answer": option_key or question.correct_answer or "N/A",
+        "metadata": _review_metadata(options, question.explanation),
+    }
+
+
+async def load_answer_key(db: AsyncSession, question_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Compile entries for arbitrary questions in one IN query
+
+    Used for questions outside the submission's skill key.
+    """
+    ids = set(question_ids)
+    if not ids:
+        return {}
+
+    result = await db.execute(
+        select(ExamQuestion).where(
+            ExamQuestion.id.in_(ids),
+            ExamQuestion.deleted_at.is_(None),
+        )
+    )
+    return {question.id: compile_question(question) for question in result.scalars()}
+
+
+def score_answers(
+    submission_id: int,
+    answers: List[Any],
+    answer_key: Dict[int, Dict[str, Any]],
+    now: Optional[datetime] = None,
+) -> Tuple[List[Dict[str, Any]], float, float]:
+    """
+    Score submitted answers against an answer key
+
+    Args:
+        answers: Objects with question_id, answer_text, answer_audio
+        answer_key: {question_id: compiled entry}
+
+    Returns:
+        (rows for user_exam_answers, total_score, max_score); answers to
+        unknown questions are skipped
+    """
+    now = now or datetime.utcnow()
+    rows: List[Dict[str, Any]] = []
+    total_score = 0
+    max_score = 0
+
+    for answer in answers:
+        key = answer_key.get(answer.question_id)
+        if key is None:
+            continue
+
+        is_correct = None
+        score = None
+        if key["accepted"]:
+            is_correct = normalize_answer(answer.answer_text) in key["accepted"]
+            score = key["points"] if is_correct else 0
+            total_score += score
+
+        max_score += key["points"]
+        rows.append({
+            "submission_id": submission_id,
+            "question_id": answer.question_id,
+            "answer_text": answer.answer_text,
+            "answer_audio": answer.answer_audio,
+            "is_correct": is_correct,
+            "score": score,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    return rows, total_score, max_score
@@ -0,0 +1,140 @@
+"""
+Single-flight coalescing for expensive idempotent calls
+
+Concurrent callers that share a request fingerprint await one shared task
+instead of each issuing the same paid OpenAI round trip.
+
+- Within a worker: an in-flight registry of asyncio tasks keyed by fingerprint
+- Across uvicorn workers: a Redis lock (SET NX PX). The lock holder publishes
+  its result under a short-lived handoff key; other workers poll that key
+  instead of calling the API themselves.
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+from loguru import logger
+
+from app.config import settings
+from app.services.redis_client import get_redis, mark_redis_failed
+
+LOCK_PREFIX = "inflight:lock:"
+RESULT_PREFIX = "inflight:result:"
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """In-flight request registry with optional cross-worker coordination via Redis"""
+
+    def __init__(self, lock_ttl: float, poll_interval: float, result_ttl: int, namespace: str = "llm"):
+        self.namespace = namespace
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats: Dict[str, int] = {
+            "leaders": 0,
+            "coalesced": 0,
+            "remote_handoffs": 0,
+            "lock_timeouts": 0,
+        }
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `fn` once per key at a time and share its result with every concurrent caller
+
+        The shared work runs in its own task, so a caller that is cancelled
+        (e.g. client disconnected) does not cancel the call for the others.
+        Results must be JSON-serializable for the cross-worker handoff.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task)
+
+        self.stats["leaders"] += 1
+        task = asyncio.ensure_future(self._run_across_workers(key, fn))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t))
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _run_across_workers(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        redis = await get_redis()
+        if redis is None:
+            return await fn()
+
+        lock_key = f"{self.namespace}:{LOCK_PREFIX}{key}"
+        result_key = f"{self.namespace}:{RESULT_PREFIX}{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_ttl
+
+        while True:
+            try:
+                raw = await redis.get(result_key)
+                if raw is not None:
+                    self.stats["remote_handoffs"] += 1
+                    return json.loads(raw)
+                acquired = await redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+            except Exception as e:
+                mark_redis_failed(e)
+                return await fn()
+
+            if acquired:
+                return await self._run_as_lock_holder(redis, lock_key, result_key, token, fn)
+
+            if time.monotonic() >= deadline:
+                # Holder is stuck or died without releasing; stop waiting on it
+                self.stats["lock_timeouts"] += 1
+                logger.warning(f"Single-flight wait timed out for {key[:12]}, calling directly")
+                return await fn()
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def _run_as_lock_holder(
+        self,
+        redis,
+        lock_key: str,
+        result_key: str,
+        token: str,
+        fn: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        try:
+            result = await fn()
+            try:
+                await redis.set(result_key, json.dumps(result, ensure_ascii=False), ex=self.result_ttl)
+            except Exception as e:
+                mark_redis_failed(e)
+            return result
+        finally:
+            try:
+                await redis.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                mark_redis_failed(e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Coalescing counters for monitoring"""
+        return {**self.stats, "in_flight": len(self._inflight)}
+
+
+# Singleton instance for ChatGPT completions
+llm_singleflight = SingleFlight(
+    lock_ttl=settings.LLM_SINGLEFLIGHT_LOCK_TTL_SECONDS,
+    poll_interval=settings.LLM_SINGLEFLIGHT_POLL_INTERVAL_SECONDS,
+    result_ttl=settings.LLM_SINGLEFLIGHT_RESULT_TTL_SECONDS,
+)
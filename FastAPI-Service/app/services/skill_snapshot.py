@@ -0,0 +1,188 @@
+"""
+Serialized skill trees for GET /skills/{id}
+
+The skill → sections → question groups → questions tree is loaded with
+selectinload chains (a fixed number of queries, whatever the size of the
+test), built once, and stored as the final JSON response body. Entries are
+keyed by skill id and content version (see exam_content), so they are served
+as bytes until an edit bumps the version.
+"""
+import json
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.config import settings
+from app.models.exam_models import ExamQuestionGroup, ExamSection, ExamSkill, ExamTest
+from app.responses import dumps
+from app.services.llm_cache import LLMResponseCache
+
+
+def _audio_url(audio: Optional[str]) -> Optional[str]:
+    """Full URL for a section audio path"""
+    if not audio:
+        return None
+    if audio.startswith(('http://', 'https://')):
+        return audio
+    base_url = settings.BASE_URL.rstrip('/')
+    if audio.startswith('/'):
+        return f"{base_url}{audio}"
+    return f"{base_url}/uploads/audio/{audio}"
+
+
+def _question_payload(question) -> Dict[str, Any]:
+    parsed_metadata = None
+    parsed_options = None
+
+    if question.options:
+        try:
+            options_data = json.loads(question.options)
+            # Check if it's the new format with metadata
+            if isinstance(options_data, dict):
+                if "metadata" in options_data:
+                    parsed_metadata = options_data["metadata"]
+                    if "options" in options_data:
+                        parsed_options = options_data["options"]
+                elif "chart_data" in options_data or "time_minutes" in options_data:
+                    # Direct metadata format
+                    parsed_metadata = options_data
+                else:
+                    # Old format - just options array
+                    parsed_options = options_data
+            elif isinstance(options_data, list):
+                # Old format - array of options
+                parsed_options = options_data
+        except json.JSONDecodeError:
+            # If not JSON, treat as plain text
+            pass
+
+    question_dict = {
+        "id": question.id,
+        "content": question.question_text,
+        "answer_content": question.correct_answer,
+        "metadata": parsed_metadata
+    }
+    # Add options separately if they exist
+    if parsed_options:
+        question_dict["options"] = parsed_options
+    return question_dict
+
+
+def build_skill_payload(skill: ExamSkill, with_sections: bool) -> Dict[str, Any]:
+    """Response data of GET /skills/{id} from a loaded skill tree"""
+    exam_test = skill.exam_test
+    exam = exam_test.exam if exam_test else None
+    data = {
+        "id": skill.id,
+        "exam_test_id": skill.exam_test_id,
+        "name": skill.name,
+        "skill_type": skill.skill_type.value if hasattr(skill.skill_type, 'value') else skill.skill_type,
+        "time_limit": skill.time_limit,
+        "description": skill.description,
+        "is_active": skill.is_active,
+        "is_online": skill.is_online,
+        "created_at": skill.created_at,
+        "exam_test_name": exam_test.name if exam_test else None,
+        "exam_id": exam_test.exam_id if exam_test else None,
+        "exam_name": exam.name if exam else None,
+        "exam_type": exam.type if exam else None,
+    }
+    if not with_sections:
+        return data
+
+    sections_data = []
+    for section in sorted(skill.exam_sections, key=lambda s: s.id):
+        # Groups inherit the section audio
+        audio_url = _audio_url(section.audio)
+        sections_data.append({
+            "id": section.id,
+            "title": section.name,
+            "content": section.content,
+            "ui_layer": section.ui_layer,
+            "audio": section.audio,
+            "audio_url": audio_url,
+            "question_groups": [
+                {
+                    "id": group.id,
+                    "name": group.name,
+                    "question_type": group.question_type,
+                    "content": group.content,
+                    "audio_url": audio_url,
+                    "questions": [
+                        _question_payload(question)
+                        for question in sorted(group.questions, key=lambda q: q.id)
+                    ]
+                }
+                for group in sorted(section.question_groups, key=lambda g: g.id)
+            ]
+        })
+    data["sections"] = sections_data
+    return data
+
+
+async def load_skill_tree(db: AsyncSession, skill_id: int, with_sections: bool) -> Optional[ExamSkill]:
+    """Skill with test / exam and (optionally) its whole content tree, in at most 4 queries"""
+    options = [joinedload(ExamSkill.exam_test).joinedload(ExamTest.exam)]
+    if with_sections:
+        options.append(
+            selectinload(ExamSkill.exam_sections)
+            .selectinload(ExamSection.question_groups)
+            .selectinload(ExamQuestionGroup.questions)
+        )
+    result = await db.execute(
+        select(ExamSkill).options(*options).where(ExamSkill.id == skill_id)
+    )
+    return result.unique().scalar_one_or_none()
+
+
+class SkillSnapshotCache:
+    """Versioned cache of serialized GET /skills/{id} bodies"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.cache = LLMResponseCache(
+            max_entries=max_entries,
+            default_ttl=ttl,
+            key_prefix="skill_snapshot:",
+            binary=True,
+        )
+
+    async def get(
+        self,
+        db: AsyncSession,
+        skill_id: int,
+        with_sections: bool,
+        version: Optional[int],
+    ) -> Optional[bytes]:
+        """
+        Response body for a skill, or None if the skill does not exist
+
+        Args:
+            version: Current content version (exam_content.get_content_version)
+        """
+        if version is None:
+            return None
+        key = f"{skill_id}:{int(with_sections)}:{version}"
+
+        body = await self.cache.get(key)
+        if body is not None:
+            return body
+
+        skill = await load_skill_tree(db, skill_id, with_sections)
+        if skill is None:
+            return None
+        body = dumps({"success": True, "data": build_skill_payload(skill, with_sections)})
+        await self.cache.set(key, body)
+        return body
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        return self.cache.get_stats()
+
+
+# Singleton instance
+skill_snapshot_cache = SkillSnapshotCache(
+    max_entries=settings.SKILL_SNAPSHOT_CACHE_MAX_ENTRIES,
+    ttl=settings.SKILL_SNAPSHOT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,113 @@
+"""
+Admin submission listing (GET /submissions/admin/all)
+
+- Filters only touch exam_submissions columns: skill_type is copied from the
+  skill onto each submission, so (skill_type, user_id, created_at) and
+  (skill_type, created_at) indexes serve the filter combinations together with
+  keyset pagination (see pagination).
+- Search filters submissions by user_id IN (SELECT id FROM users WHERE email
+  / name LIKE 'term%'); the prefix match is served by the users.email and
+  users.name indexes, instead of a '%term%' scan over every user joined to
+  every submission. Every matching user is covered, however many there are.
+- The total is a plain COUNT(*) on the same conditions, cached for a short
+  TTL per filter combination, so paging does not recount the table.
+"""
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Select, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.auth_models import User
+from app.models.exam_models import ExamSubmission, SkillType
+from app.services.llm_cache import LLMResponseCache
+
+
+def _like_prefix(term: str) -> str:
+    """LIKE pattern 'term%' with wildcards in the term escaped"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def matching_user_ids(search: str) -> Select:
+    """
+    Subquery of users whose email or name starts with the search term
+    (case-insensitive with MySQL's default collation)
+    """
+    pattern = _like_prefix(search.strip())
+    return select(User.id).where(or_(
+        User.email.like(pattern, escape="\\"),
+        User.name.like(pattern, escape="\\"),
+    ))
+
+
+def submission_conditions(
+    user_id: Optional[int] = None,
+    skill_type: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    search: Optional[str] = None,
+) -> Optional[List[Any]]:
+    """
+    WHERE conditions on exam_submissions for the admin filters
+
+    Returns:
+        List of conditions, or None if nothing can match (unknown skill type)
+    """
+    conditions = [ExamSubmission.deleted_at.is_(None)]
+    if user_id:
+        conditions.append(ExamSubmission.user_id == user_id)
+    if skill_type:
+        try:
+            conditions.append(ExamSubmission.skill_type == SkillType(skill_type.lower()))
+        except ValueError:
+            return None
+    if status_filter:
+        conditions.append(ExamSubmission.status == status_filter)
+    if search and search.strip():
+        conditions.append(ExamSubmission.user_id.in_(matching_user_ids(search)))
+    return conditions
+
+
+class SubmissionCountCache:
+    """Short-lived cache of admin listing totals, per filter combination"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.cache = LLMResponseCache(
+            max_entries=max_entries,
+            default_ttl=ttl,
+            key_prefix="admin_submission_count:",
+        )
+
+    @staticmethod
+    def _key(filters: Dict[str, Any]) -> str:
+        raw = "|".join(f"{name}={filters[name]}" for name in sorted(filters))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def count(self, db: AsyncSession, conditions: List[Any], filters: Dict[str, Any]) -> int:
+        """
+        Number of submissions matching the conditions
+
+        Args:
+            filters: Raw filter values the conditions were built from (cache key)
+        """
+        key = self._key(filters)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return int(cached)
+
+        result = await db.execute(select(func.count()).select_from(ExamSubmission).where(*conditions))
+        total = result.scalar_one() or 0
+        await self.cache.set(key, str(total))
+        return total
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        return self.cache.get_stats()
+
+
+# Singleton instance
+submission_count_cache = SubmissionCountCache(
+    max_entries=settings.ADMIN_SUBMISSION_COUNT_CACHE_MAX_ENTRIES,
+    ttl=settings.ADMIN_SUBMISSION_COUNT_CACHE_TTL_SECONDS,
+)
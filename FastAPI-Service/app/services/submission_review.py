@@ -0,0 +1,201 @@
+"""
+Submission review assembly (GET /submissions/{id} and /submissions/admin/{id})
+
+A review is built from:
+1. one query for the submission with its skill, section and owner
+2. the skill's compiled answer key (answer_key_cache: question text, correct
+   answer / option letter and review metadata parsed once per question)
+3. one query for the user's answers
+
+Graded submissions are immutable, so the answers part of their review (the
+heavy part) is cached, keyed by submission id, submission.updated_at and the
+skill's content version: question edits bump the version, and saving AI
+feedback calls `touch_submission`. Submissions still waiting for grading are
+always built fresh.
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import orjson
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.auth_models import User
+from app.models.exam_models import ExamSection, ExamSkill, ExamSubmission, SubmissionStatus, UserExamAnswer
+from app.responses import dumps
+from app.services.answer_key_cache import answer_key_cache
+from app.services.exam_content import SKILL, get_content_version
+from app.services.llm_cache import LLMResponseCache
+
+
+async def _load_submission(db: AsyncSession, submission_id: int, user_id: Optional[int]):
+    query = (
+        select(ExamSubmission, ExamSkill.name, ExamSkill.skill_type, ExamSection.name, User.email, User.name)
+        .outerjoin(ExamSkill, ExamSkill.id == ExamSubmission.exam_skill_id)
+        .outerjoin(ExamSection, ExamSection.id == ExamSubmission.exam_section_id)
+        .outerjoin(User, User.id == ExamSubmission.user_id)
+        .where(
+            ExamSubmission.id == submission_id,
+            ExamSubmission.deleted_at.is_(None)
+        )
+    )
+    if user_id is not None:
+        query = query.where(ExamSubmission.user_id == user_id)
+    result = await db.execute(query)
+    return result.first()
+
+
+async def _build_answers(db: AsyncSession, submission: ExamSubmission) -> Dict[str, Any]:
+    """Every question of the skill merged with the user's answers"""
+    answer_key = await answer_key_cache.get(db, submission.exam_skill_id)
+
+    answers_result = await db.execute(
+        select(UserExamAnswer).where(
+            UserExamAnswer.submission_id == submission.id,
+            UserExamAnswer.deleted_at.is_(None)
+        )
+    )
+    user_answers = {ans.question_id: ans for ans in answers_result.scalars().all()}
+
+    answers_list = []
+    correct_count = 0
+    for question_number, question_id in enumerate(answer_key["question_ids"], 1):
+        entry = answer_key["questions"][question_id]
+        user_answer = user_answers.get(question_id)
+        is_correct = bool(user_answer and user_answer.is_correct)
+        if is_correct:
+            correct_count += 1
+
+        answers_list.append({
+            "question_id": question_id,
+            "question_number": question_number,
+            "part": entry["part"] or "Part 1",
+            "question_content": entry["question_text"],
+            "user_answer": user_answer.answer_text if user_answer and user_answer.answer_text else "",
+            "answer_audio": user_answer.answer_audio if user_answer and user_answer.answer_audio else None,
+            "correct_answer": entry["correct_answer"],  # Option letter for multiple choice
+            "is_correct": is_correct,
+            "score": user_answer.score if user_answer else None,
+            "ai_feedback": orjson.loads(user_answer.ai_feedback) if (user_answer and user_answer.ai_feedback) else None,
+            "has_ai_grading": bool(user_answer and user_answer.ai_feedback),  # Flag để frontend biết đã có AI grading
+            "metadata": entry["metadata"]  # Answers with feedback, locate, explanation
+        })
+
+    return {
+        "total_questions": len(answers_list),
+        "answered_questions": sum(1 for ans in answers_list if (ans["user_answer"] or ans["answer_audio"])),
+        "correct_answers": correct_count,
+        "answers": answers_list,
+    }
+
+
+class SubmissionReviewBuilder:
+    """Builds (and caches) submission reviews for both the user and the admin endpoint"""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.cache = LLMResponseCache(
+            max_entries=max_entries,
+            default_ttl=ttl,
+            key_prefix="submission_review:",
+            binary=True,
+        )
+
+    async def _answers(self, db: AsyncSession, submission: ExamSubmission) -> Dict[str, Any]:
+        if submission.status != SubmissionStatus.GRADED:
+            return await _build_answers(db, submission)
+        version = await get_content_version(SKILL, submission.exam_skill_id, db)
+        if version is None:
+            return await _build_answers(db, submission)
+
+        updated_at = submission.updated_at.isoformat() if submission.updated_at else ""
+        key = f"{submission.id}:{updated_at}:{version}"
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+
+        answers = await _build_answers(db, submission)
+        await self.cache.set(key, dumps(answers))
+        return answers
+
+    async def build(
+        self,
+        db: AsyncSession,
+        submission_id: int,
+        user_id: Optional[int] = None,
+        include_owner: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Review data of a submission
+
+        Args:
+            user_id: Only return the submission if it belongs to this user (None = admin)
+            include_owner: Add user_email / user_name (admin view)
+
+        Returns:
+            Response data, or None if the submission does not exist
+        """
+        row = await _load_submission(db, submission_id, user_id)
+        if row is None:
+            return None
+        submission, skill_name, skill_type, section_name, owner_email, owner_name = row
+
+        data = {
+            "id": submission.id,
+            "user_id": submission.user_id,
+        }
+        if include_owner:
+            # email is NOT NULL, so None means the owner row is gone
+            has_owner = owner_email is not None
+            data["user_email"] = owner_email if has_owner else ""
+            data["user_name"] = owner_name if has_owner else ""
+        data.update({
+            "exam_skill_id": submission.exam_skill_id,
+            "exam_section_id": submission.exam_section_id,
+            "status": submission.status.value if hasattr(submission.status, "value") else submission.status,
+            "started_at": submission.started_at.isoformat() if submission.started_at else None,
+            "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
+            "time_spent": submission.time_spent or 0,
+            "total_score": submission.total_score,
+            "max_score": submission.max_score,
+            "created_at": submission.created_at.isoformat() if submission.created_at else None,
+            "updated_at": submission.updated_at.isoformat() if submission.updated_at else None,
+            "skill": {
+                "name": skill_name,
+                "skill_type": skill_type.value if skill_type else None
+            },
+            "exam": None,
+            "section_name": section_name,
+        })
+
+        answers = await self._answers(db, submission)
+        data.update({
+            "total_questions": answers["total_questions"],
+            "answered_questions": answers["answered_questions"],
+            "correct_answers": answers["correct_answers"],
+            "teacher_score": getattr(submission, 'teacher_score', None),
+            "teacher_feedback": getattr(submission, 'teacher_feedback', None),
+            "answers": answers["answers"],
+        })
+        return data
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        return self.cache.get_stats()
+
+
+async def touch_submission(db: AsyncSession, submission_id: int) -> None:
+    """Mark a submission as changed (e.g. new AI feedback) so its cached review is rebuilt"""
+    await db.execute(
+        update(ExamSubmission)
+        .where(ExamSubmission.id == submission_id)
+        .values(updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Singleton instance
+submission_review_builder = SubmissionReviewBuilder(
+    max_entries=settings.SUBMISSION_REVIEW_CACHE_MAX_ENTRIES,
+    ttl=settings.SUBMISSION_REVIEW_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,240 @@
+"""
+Whisper transcription pipeline for Speaking answers
+
+- Transcripts are cached by SHA-256 of the audio bytes + language, so grading
+  the same recording again does not pay for a second Whisper call
+- Long recordings are split on silence (ffmpeg `silencedetect`) into segments
+  well under the 25MB API limit, transcribed concurrently and stitched back
+  together with timestamps shifted to the original timeline
+- Without ffmpeg on PATH the whole file is sent in one request (as before)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiofiles
+from loguru import logger
+from openai import AsyncOpenAI
+from tenacity import retry, stop_after_attempt, wait_random_exponential
+
+from app.config import settings
+from app.services.llm_cache import LLMResponseCache
+from app.services.rate_governor import rate_governor, RequestPriority
+
+WHISPER_MODEL = "whisper-1"
+WHISPER_MAX_FILE_BYTES = 25 * 1024 * 1024
+
+# Look this far around each target cut point for a pause to split on
+SILENCE_SEARCH_WINDOW_SECONDS = 15.0
+SILENCE_NOISE_THRESHOLD = "-30dB"
+SILENCE_MIN_DURATION_SECONDS = 0.4
+
+_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?\d+(?:\.\d+)?)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*(\d+(?:\.\d+)?)")
+
+
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    """Read a field from an SDK model or a plain dict"""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def plan_segments(
+    duration: float,
+    silences: List[Tuple[float, float]],
+    segment_seconds: float,
+) -> List[Tuple[float, float]]:
+    """
+    Choose (start, end) ranges of about `segment_seconds`, cutting in the middle
+    of the pause closest to each target point (hard cut if there is none nearby)
+    """
+    if duration <= segment_seconds * 1.5:
+        return [(0.0, duration)]
+
+    midpoints = [(start + end) / 2 for start, end in silences]
+    ranges: List[Tuple[float, float]] = []
+    start = 0.0
+    while duration - start > segment_seconds * 1.5:
+        target = start + segment_seconds
+        candidates = [
+            m for m in midpoints
+            if start + segment_seconds / 2 < m < duration and abs(m - target) <= SILENCE_SEARCH_WINDOW_SECONDS
+        ]
+        cut = min(candidates, key=lambda m: abs(m - target)) if candidates else target
+        ranges.append((start, cut))
+        start = cut
+    ranges.append((start, duration))
+    return ranges
+
+
+class TranscriptionService:
+    """Cached, segmented Whisper transcription"""
+
+    def __init__(self, segment_seconds: int, concurrency: int, cache_ttl: int):
+        self.segment_seconds = segment_seconds
+        self.concurrency = concurrency
+        self.cache = LLMResponseCache(
+            max_entries=512,
+            default_ttl=cache_ttl,
+            key_prefix="transcript:",
+        )
+        self.ffmpeg = shutil.which("ffmpeg")
+        if not self.ffmpeg:
+            logger.warning("ffmpeg not found, long recordings will be transcribed in a single request")
+
+    async def transcribe(
+        self,
+        client: AsyncOpenAI,
+        audio_file_path: str,
+        language: str = "en",
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Transcribe an audio file
+
+        Returns:
+            {"text", "segments": [{"start", "end", "text"}], "duration", "cached"}
+        """
+        digest = await asyncio.to_thread(_hash_file, audio_file_path)
+        cache_key = f"{WHISPER_MODEL}:{language}:{digest}"
+
+        if use_cache:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Transcript cache hit for {os.path.basename(audio_file_path)}")
+                return {**json.loads(cached), "cached": True}
+
+        result = await self._transcribe_uncached(client, audio_file_path, language)
+        await self.cache.set(cache_key, json.dumps(result, ensure_ascii=False))
+        return {**result, "cached": False}
+
+    async def _transcribe_uncached(
+        self,
+        client: AsyncOpenAI,
+        audio_file_path: str,
+        language: str,
+    ) -> Dict[str, Any]:
+        probe = await self._probe(audio_file_path) if self.ffmpeg else None
+        if probe is None:
+            if os.path.getsize(audio_file_path) > WHISPER_MAX_FILE_BYTES:
+                raise ValueError("Audio file exceeds the 25MB Whisper limit and ffmpeg is not available to split it")
+            return await self._transcribe_segment(client, audio_file_path, language, offset=0.0)
+
+        duration, silences = probe
+        ranges = plan_segments(duration, silences, self.segment_seconds)
+        if len(ranges) == 1 and os.path.getsize(audio_file_path) <= WHISPER_MAX_FILE_BYTES:
+            return await self._transcribe_segment(client, audio_file_path, language, offset=0.0)
+
+        logger.info(f"Splitting {duration:.0f}s recording into {len(ranges)} segments for transcription")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with tempfile.TemporaryDirectory(prefix="transcribe_") as tmp_dir:
+
+            async def run(index: int, start: float, end: float) -> Dict[str, Any]:
+                async with semaphore:
+                    segment_path = os.path.join(tmp_dir, f"segment_{index:03d}.mp3")
+                    await self._extract_segment(audio_file_path, segment_path, start, end)
+                    return await self._transcribe_segment(client, segment_path, language, offset=start)
+
+            parts = await asyncio.gather(*(run(i, s, e) for i, (s, e) in enumerate(ranges)))
+
+        return {
+            "text": " ".join(p["text"] for p in parts if p["text"]),
+            "segments": [seg for p in parts for seg in p["segments"]],
+            "duration": round(duration, 2),
+        }
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_random_exponential(multiplier=1, min=1, max=10),
+        reraise=True,
+    )
+    async def _transcribe_segment(
+        self,
+        client: AsyncOpenAI,
+        path: str,
+        language: str,
+        offset: float,
+    ) -> Dict[str, Any]:
+        async with aiofiles.open(path, "rb") as f:
+            data = await f.read()
+
+        async with rate_governor.slot(RequestPriority.INTERACTIVE):
+            response = await client.audio.transcriptions.create(
+                model=WHISPER_MODEL,
+                file=(os.path.basename(path), data),
+                language=language,
+                response_format="verbose_json",
+            )
+
+        segments = [
+            {
+                "start": round(float(_field(seg, "start", 0.0)) + offset, 2),
+                "end": round(float(_field(seg, "end", 0.0)) + offset, 2),
+                "text": (_field(seg, "text", "") or "").strip(),
+            }
+            for seg in (_field(response, "segments") or [])
+        ]
+        return {
+            "text": (_field(response, "text", "") or "").strip(),
+            "segments": segments,
+            "duration": round(float(_field(response, "duration", 0.0) or 0.0), 2),
+        }
+
+    async def _probe(self, path: str) -> Optional[Tuple[float, List[Tuple[float, float]]]]:
+        """Get duration and silent ranges in one ffmpeg pass (None if ffmpeg fails)"""
+        process = await asyncio.create_subprocess_exec(
+            self.ffmpeg, "-hide_banner", "-nostats", "-i", path,
+            "-af", f"silencedetect=noise={SILENCE_NOISE_THRESHOLD}:d={SILENCE_MIN_DURATION_SECONDS}",
+            "-f", "null", "-",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await process.communicate()
+        output = stderr.decode("utf-8", errors="replace")
+
+        match = _DURATION_RE.search(output)
+        if process.returncode != 0 or not match:
+            logger.warning(f"ffmpeg could not analyse {path}, transcribing as a single file")
+            return None
+
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        starts = [max(0.0, float(s)) for s in _SILENCE_START_RE.findall(output)]
+        ends = [float(e) for e in _SILENCE_END_RE.findall(output)]
+        return duration, list(zip(starts, ends))
+
+    async def _extract_segment(self, source: str, target: str, start: float, end: float) -> None:
+        """Cut [start, end) into a small mono MP3 (speech quality)"""
+        process = await asyncio.create_subprocess_exec(
+            self.ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+            "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", source,
+            "-ac", "1", "-ar", "16000", "-b:a", "48k", target,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to extract segment: {stderr.decode('utf-8', errors='replace')[-300:]}")
+
+
+# Singleton instance
+transcription_service = TranscriptionService(
+    segment_seconds=settings.TRANSCRIBE_SEGMENT_SECONDS,
+    concurrency=settings.TRANSCRIBE_CONCURRENCY,
+    cache_ttl=settings.TRANSCRIPT_CACHE_TTL_SECONDS,
+)
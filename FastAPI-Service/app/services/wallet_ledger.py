@@ -0,0 +1,173 @@
+"""
+Wallet ledger - atomic debits with reservation / refund
+
+Debits are a single conditional UPDATE (`balance >= cost` checked by MySQL),
+so parallel requests cannot overdraw a wallet and no row is read-modified-written
+in Python. A paid AI call is recorded as a HOLD transaction first, then either
+confirmed (call succeeded) or refunded (call failed):
+
+    reservation = await wallet_ledger.reserve(db, user_id, cost, "Chấm điểm AI - WRITING")
+    if reservation is None:
+        ...  # no wallet / insufficient balance
+    async with wallet_ledger.settle(db, reservation["transaction_id"]):
+        result = await chatgpt_service.grade_writing_answer(...)
+
+Confirm and refund only act on a transaction that is still on HOLD, so they are
+safe to repeat (e.g. a redelivered background job).
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.payment_models import UserWallet, WalletTransaction
+
+TX_HOLD = "AI_GRADING_HOLD"  # Đã trừ tiền, đang chờ kết quả chấm
+TX_CONFIRMED = "AI_GRADING"
+TX_REFUNDED = "AI_GRADING_REFUNDED"  # Bản ghi HOLD đã được hoàn tiền
+TX_REFUND = "REFUND"
+
+
+class WalletLedger:
+    """Atomic wallet operations"""
+
+    async def _get_balance(self, db: AsyncSession, user_id: int) -> Optional[int]:
+        result = await db.execute(select(UserWallet.balance).where(UserWallet.user_id == user_id))
+        return result.scalar_one_or_none()
+
+    async def reserve(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        amount: int,
+        description: str,
+        reference_id: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Debit `amount` and record a HOLD transaction (committed)
+
+        Returns:
+            {"transaction_id", "cost", "new_balance"}, or None if the wallet is
+            missing or the balance is too low (nothing is changed then)
+        """
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(UserWallet)
+            .where(UserWallet.user_id == user_id, UserWallet.balance >= amount)
+            .values(
+                balance=UserWallet.balance - amount,
+                total_spent=UserWallet.total_spent + amount,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            await db.rollback()
+            return None
+
+        # The row stays locked by our UPDATE until commit, so this read is consistent
+        balance_after = await self._get_balance(db, user_id)
+        transaction = WalletTransaction(
+            user_id=user_id,
+            amount=-amount,
+            transaction_type=TX_HOLD,
+            description=description,
+            reference_id=reference_id,
+            balance_before=balance_after + amount,
+            balance_after=balance_after,
+            created_at=now,
+        )
+        db.add(transaction)
+        await db.commit()
+
+        logger.info(f"Reserved {amount} OWL from user {user_id} (tx {transaction.id}). New balance: {balance_after}")
+        return {
+            "transaction_id": transaction.id,
+            "cost": amount,
+            "new_balance": balance_after,
+        }
+
+    async def confirm(self, db: AsyncSession, transaction_id: int, commit: bool = True) -> bool:
+        """
+        Turn a HOLD into a final charge
+
+        Args:
+            commit: False leaves the change in the caller's transaction (e.g. to
+                commit it together with a job status)
+        """
+        result = await db.execute(
+            update(WalletTransaction)
+            .where(WalletTransaction.id == transaction_id, WalletTransaction.transaction_type == TX_HOLD)
+            .values(transaction_type=TX_CONFIRMED)
+            .execution_options(synchronize_session=False)
+        )
+        if commit:
+            await db.commit()
+        return result.rowcount == 1
+
+    async def refund(self, db: AsyncSession, transaction_id: int, reason: str = "", commit: bool = True) -> bool:
+        """
+        Give a HOLD back to the user and record a REFUND transaction
+
+        Args:
+            commit: False leaves the change in the caller's transaction
+        """
+        result = await db.execute(
+            update(WalletTransaction)
+            .where(WalletTransaction.id == transaction_id, WalletTransaction.transaction_type == TX_HOLD)
+            .values(transaction_type=TX_REFUNDED)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            # Already confirmed or refunded
+            if commit:
+                await db.rollback()
+            return False
+
+        hold = await db.get(WalletTransaction, transaction_id)
+        amount = -hold.amount
+        now = datetime.utcnow()
+        await db.execute(
+            update(UserWallet)
+            .where(UserWallet.user_id == hold.user_id)
+            .values(
+                balance=UserWallet.balance + amount,
+                total_spent=UserWallet.total_spent - amount,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        balance_after = await self._get_balance(db, hold.user_id)
+        db.add(WalletTransaction(
+            user_id=hold.user_id,
+            amount=amount,
+            transaction_type=TX_REFUND,
+            description=f"Hoàn Trứng Cú - {hold.description}" if hold.description else "Hoàn Trứng Cú",
+            reference_id=str(transaction_id),
+            balance_before=balance_after - amount,
+            balance_after=balance_after,
+            created_at=now,
+        ))
+        if commit:
+            await db.commit()
+
+        logger.warning(f"Refunded {amount} OWL to user {hold.user_id} (tx {transaction_id}): {reason}")
+        return True
+
+    @asynccontextmanager
+    async def settle(self, db: AsyncSession, transaction_id: int):
+        """Confirm the HOLD if the block succeeds, refund it if the block raises"""
+        try:
+            yield
+        except BaseException as e:
+            await db.rollback()
+            await self.refund(db, transaction_id, reason=str(e) or type(e).__name__)
+            raise
+        await self.confirm(db, transaction_id)
+
+
+# Singleton instance
+wallet_ledger = WalletLedger()
@@ -0,0 +1,63 @@
+"""
+Celery worker for background AI jobs
+
+Run with:
+    celery -A app.worker worker --loglevel=info --concurrency=4
+"""
+import asyncio
+
+from celery import Celery
+from loguru import logger
+
+from app.config import settings
+from app.services.grading_jobs import run_grading_job, mark_dead_letter, retry_countdown
+
+celery_app = Celery(
+    "owlenglish",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    task_default_queue="grading",
+    # Ack only after the task finished, so a crashed worker's job is redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    # Fail fast when publishing to a dead broker; the web process then runs the job itself
+    broker_connection_timeout=3,
+    broker_transport_options={"max_retries": 0, "socket_connect_timeout": 2},
+)
+
+# One event loop per worker process: the async DB engine and OpenAI client
+# keep connections bound to the loop they were created on
+_loop = None
+
+
+def _run(coro):
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+@celery_app.task(
+    bind=True,
+    name="grading.run_job",
+    max_retries=settings.GRADING_JOB_MAX_RETRIES,
+    ignore_result=True,  # Status and result are persisted in grading_jobs
+)
+def run_grading_job_task(self, job_id: str) -> None:
+    """Grade one Writing/Speaking answer"""
+    try:
+        _run(run_grading_job(job_id))
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            _run(mark_dead_letter(job_id, str(e)))
+            return
+        countdown = retry_countdown(self.request.retries)
+        logger.warning(f"Retrying grading job {job_id} in {countdown:.0f}s")
+        raise self.retry(exc=e, countdown=countdown)
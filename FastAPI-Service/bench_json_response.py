@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serialization share of GET /submissions/{id} (40-question detail)
+
+Compares the default FastAPI path (jsonable_encoder + json.dumps) with
+FastJSONResponse (orjson, no jsonable_encoder) on a payload shaped like the
+real submission detail response, through the full ASGI stack (no database).
+
+    python bench_json_response.py [iterations]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import httpx
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.responses import FastJSONResponse, dumps
+
+
+def build_submission_detail(n_questions: int = 40) -> dict:
+    """Payload with the same shape as get_submission_detail"""
+    now = datetime.utcnow()
+    answers = []
+    for i in range(1, n_questions + 1):
+        options = [
+            {
+                "answer_content": f"Option {chr(65 + k)} for question {i}: " + "lorem ipsum dolor sit amet " * 3,
+                "is_correct": k == i % 4,
+                "feedback": "Đáp án này sai vì đoạn văn nói rõ điều ngược lại. " * 2,
+                "locate": f"Paragraph {k + 1}, line {i}",
+            }
+            for k in range(4)
+        ]
+        answers.append({
+            "question_id": 1000 + i,
+            "question_number": i,
+            "part": f"Passage {(i - 1) // 13 + 1}",
+            "question_content": f"Question {i}: " + "What does the writer say about the research? " * 2,
+            "user_answer": chr(65 + (i * 7) % 4),
+            "answer_audio": None,
+            "correct_answer": chr(65 + i % 4),
+            "is_correct": (i * 7) % 4 == i % 4,
+            "score": 1 if (i * 7) % 4 == i % 4 else 0,
+            "ai_feedback": None,
+            "has_ai_grading": False,
+            "metadata": {
+                "answers": options,
+                "locate": f"Paragraph {i % 5 + 1}",
+                "explanation": "Giải thích: thông tin nằm ở đoạn thứ hai, câu cuối. " * 4,
+            },
+        })
+    return {
+        "success": True,
+        "data": {
+            "id": 123,
+            "user_id": 45,
+            "exam_skill_id": 6,
+            "exam_section_id": None,
+            "status": "graded",
+            "started_at": (now - timedelta(minutes=60)).isoformat(),
+            "submitted_at": now.isoformat(),
+            "time_spent": 3600,
+            "total_score": 27,
+            "max_score": 40,
+            "created_at": now,
+            "updated_at": now,
+            "skill": {"name": "Reading", "skill_type": "reading"},
+            "exam": None,
+            "section_name": "Passage 1",
+            "total_questions": n_questions,
+            "answered_questions": n_questions,
+            "correct_answers": 27,
+            "teacher_score": None,
+            "teacher_feedback": None,
+            "answers": answers,
+        },
+    }
+
+
+PAYLOAD = build_submission_detail()
+
+app = FastAPI()
+
+
+@app.get("/default", response_class=JSONResponse)
+async def default_detail():
+    return PAYLOAD
+
+
+@app.get("/fast")
+async def fast_detail():
+    return FastJSONResponse(PAYLOAD)
+
+
+def time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+async def time_requests(client: httpx.AsyncClient, path: str, iterations: int) -> float:
+    await client.get(path)  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await client.get(path)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+async def main(iterations: int):
+    default_render = JSONResponse(None).render
+    serialize_default = lambda: default_render(jsonable_encoder(PAYLOAD))
+    serialize_fast = lambda: dumps(PAYLOAD)
+
+    assert json.loads(serialize_default()) == json.loads(serialize_fast()), "outputs differ"
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        request_default = await time_requests(client, "/default", iterations)
+        request_fast = await time_requests(client, "/fast", iterations)
+
+    ser_default = time_per_call(serialize_default, iterations)
+    ser_fast = time_per_call(serialize_fast, iterations)
+
+    print(f"Payload: 40 questions, {len(serialize_fast()) / 1024:.1f} KiB, {iterations} iterations")
+    print(f"{'':<12}{'request ms':>12}{'serialize ms':>14}{'share':>8}")
+    print(f"{'default':<12}{request_default:>12.3f}{ser_default:>14.3f}{ser_default / request_default:>8.0%}")
+    print(f"{'orjson':<12}{request_fast:>12.3f}{ser_fast:>14.3f}{ser_fast / request_fast:>8.0%}")
+    print(f"Serialization speed-up: {ser_default / ser_fast:.1f}x, request speed-up: {request_default / request_fast:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Test tìm kiếm nội dung: từ khóa nào đi vào truy vấn FULLTEXT (boolean mode)
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.content_search import boolean_query, search_terms
+
+
+def test_every_indexed_word_is_required_as_prefix():
+    assert boolean_query(search_terms("Environmental Reading")) == "+environmental* +reading*"
+
+
+def test_short_words_and_stopwords_are_left_out():
+    """Từ ngắn hơn innodb_ft_min_token_size và stopword không có trong index"""
+    assert boolean_query(search_terms("Reading Test 1")) == "+reading* +test*"
+    assert boolean_query(search_terms("Part 2 of the test")) == "+part* +test*"
+
+
+def test_no_indexed_word_gives_empty_query():
+    """Chỉ còn từ ngắn: tìm bằng LIKE"""
+    assert boolean_query(search_terms("1 2")) == ""
+    assert boolean_query(search_terms("the")) == ""
+
+
+def test_operators_are_dropped():
+    assert search_terms('+reading -"test" (part)*') == ["reading", "test", "part"]
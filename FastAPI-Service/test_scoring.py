@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Test chấm điểm tự động: đáp án thay thế (alternatives) trong correct_answer
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.scoring import _accepted_answers
+
+
+def test_dates_fractions_and_ratios_match_whole():
+    """Dấu "/" và ":" không tách đáp án"""
+    accepted = _accepted_answers("fill_blank", "12/05/2020", None)
+    assert accepted == {"12/05/2020"}
+    assert "12" not in accepted
+
+    assert _accepted_answers("fill_blank", "9/11", None) == {"9/11"}
+    assert _accepted_answers("fill_blank", "3:2", None) == {"3:2"}
+    assert _accepted_answers("fill_blank", "colour|color", None) == {"colour|color"}
+
+
+def test_explicit_alternatives():
+    """" | " có khoảng trắng hoặc danh sách accepted_answers trong options"""
+    assert _accepted_answers("fill_blank", "colour | color", None) == {"colour | color", "colour", "color"}
+
+    options = {"accepted_answers": ["Fifteen", "15 "]}
+    assert _accepted_answers("fill_blank", "15", None, options) == {"15", "fifteen"}
+
+
+def test_choice_types_are_not_split():
+    """Câu trắc nghiệm chỉ nhận đáp án và chữ cái của lựa chọn đúng"""
+    assert _accepted_answers("multiple_choice", "A | B", "c") == {"a | b", "c"}
+
+
+if __name__ == "__main__":
+    test_dates_fractions_and_ratios_match_whole()
+    test_explicit_alternatives()
+    test_choice_types_are_not_split()
+    print("✅ All scoring tests passed")